@@ -3,13 +3,13 @@ import json
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 import time
+import tracemalloc
 import pandas as pd
-import mysql.connector
-from mysql.connector import Error
 import hashlib
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.mime.application import MIMEApplication
 import os
 import threading
 import schedule
@@ -19,7 +19,20 @@ import pytz
 import re
 from urllib.parse import urljoin, urlparse
 import random
+import itertools
+import csv
+import gzip
+import zlib
+import glob
+import io
+import contextlib
+from collections import defaultdict
+import uuid
+import xml.etree.ElementTree as ET
+from html import escape
 from dotenv import load_dotenv
+from storage_backends import (PLAN_CHECK_MIN_ROWS, SEARCH_INDEX, STORAGE_ERRORS, MySQLBackend, check_query_plans,
+                              create_backend)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -34,8 +47,365 @@ logging.basicConfig(
     ]
 )
 
+# Digest email markup - styles are shared through classes instead of repeated on every cell
+DIGEST_CSS = """
+table.digest { border-collapse: collapse; width: 100%; font-family: Arial, sans-serif; }
+table.digest th { border: 1px solid #ddd; padding: 12px; text-align: left; background-color: #f2f2f2; }
+table.digest td { border: 1px solid #ddd; padding: 8px; }
+table.digest tr.alt { background-color: #f9f9f9; }
+table.digest a { color: #0066cc; }
+p.footer { font-size: 12px; color: #666; }
+"""
+
+DIGEST_TABLE_HEAD = (
+    '<table class="digest"><thead><tr>'
+    '<th>#</th><th>Article Heading</th><th>Source</th><th>Keyword</th><th>Published Date</th><th>Link</th>'
+    '</tr></thead><tbody>\n'
+)
+
+DIGEST_ROW_TEMPLATE = (
+    '<tr{row_class}><td>{index}</td><td>{heading}</td><td>{source}</td><td>{keyword}</td>'
+    '<td>{date}</td><td><a href="{link}" target="_blank">Read Article</a></td></tr>\n'
+)
+
+DIGEST_TABLE_TAIL = '</tbody></table>'
+
+# Precomputed article counts per day x keyword x source x sent flag, maintained alongside articles
+STATS_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS article_stats (
+    stat_date DATE NOT NULL,
+    keyword VARCHAR(100) NOT NULL,
+    source VARCHAR(200) NOT NULL,
+    is_sent BOOLEAN NOT NULL,
+    article_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (stat_date, keyword, source, is_sent),
+    INDEX idx_stats_keyword (keyword, article_count),
+    INDEX idx_stats_source (source, article_count),
+    INDEX idx_stats_sent (is_sent, article_count)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# Key columns of article_stats; rows are upserted with storage.upsert_increment(..., 'article_count')
+STATS_KEYS = ['stat_date', 'keyword', 'source', 'is_sent']
+
+STATS_RECOUNT = """
+SELECT DATE(date_created), keyword, source, is_sent, COUNT(*)
+FROM articles
+GROUP BY DATE(date_created), keyword, source, is_sent
+"""
+
+# Retention: months past the window are written to gzip CSV files and removed from articles;
+# hashes of their headings and links stay in archived_article_keys for duplicate detection
+ARCHIVE_COLUMNS = [
+    'id', 'article_heading', 'article_link', 'keyword', 'source',
+    'published_date', 'is_sent', 'date_created', 'date_updated'
+]
+
+ARCHIVE_KEYS_DDL = """
+CREATE TABLE IF NOT EXISTS archived_article_keys (
+    key_hash CHAR(64) NOT NULL PRIMARY KEY,
+    archive_month CHAR(7) NOT NULL,
+    INDEX idx_archive_month (archive_month)
+) ENGINE=InnoDB DEFAULT CHARSET=ascii
+"""
+
+# Delivery state of each digest batch: claimed -> sending -> delivered -> sent (or released).
+# Only batches still 'claimed' (never handed to the mail queue) are reclaimed automatically
+# once stale; 'delivered' batches are finished by marking them sent, and 'sending' batches
+# need an operator (manual operation 11) because their digest may or may not have gone out.
+DIGEST_BATCHES_DDL = """
+CREATE TABLE IF NOT EXISTS digest_batches (
+    batch_id CHAR(36) NOT NULL PRIMARY KEY,
+    state VARCHAR(10) NOT NULL,
+    claimed_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    INDEX idx_batch_state (state, claimed_at)
+) ENGINE=InnoDB DEFAULT CHARSET=ascii
+"""
+
+# Claims unsent, unclaimed articles for a batch; stale rows are taken over only when their
+# batch is unknown (claimed before digest_batches existed) or still 'claimed'
+CLAIM_BATCH_UPDATE = """
+UPDATE articles
+SET send_batch_id = %s, send_batch_claimed_at = {utc_now}
+WHERE is_sent = FALSE
+  AND (send_batch_id IS NULL
+       OR (send_batch_claimed_at < {stale_before}
+           AND NOT EXISTS (SELECT 1 FROM digest_batches
+                           WHERE digest_batches.batch_id = articles.send_batch_id
+                             AND digest_batches.state <> 'claimed')))
+"""
+
+# Monthly RANGE partitioning needs date_created in every unique key, so the link loses its
+# UNIQUE constraint (save_to_database checks links explicitly) and the primary key widens
+PARTITION_KEY_CHANGES = """
+ALTER TABLE articles
+    MODIFY date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY, ADD PRIMARY KEY (id, date_created),
+    DROP INDEX article_link, ADD INDEX idx_article_link (article_link(255))
+"""
+
+PARTITION_TEMPLATE = "PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP('{bound:%Y-%m-%d %H:%M:%S}'))"
+PARTITION_MAX = "PARTITION pmax VALUES LESS THAN MAXVALUE"
+
+# Duplicate check before every insert; partitioned tables cannot keep the link UNIQUE, so it is checked too
+DEDUP_QUERY = """
+SELECT article_heading, article_link
+FROM articles
+WHERE article_heading = %s OR article_link = %s
+LIMIT 1
+"""
+
+# Hot queries below are module constants so that hot_queries EXPLAINs exactly what runs
+ARCHIVED_KEY_QUERY = """
+SELECT archive_month FROM archived_article_keys
+WHERE key_hash IN (%s, %s)
+LIMIT 1
+"""
+
+UNSENT_COUNT = "SELECT COUNT(*) FROM articles WHERE is_sent = FALSE"
+
+# Keyset pages of iter_unsent_articles: {where} comes from unsent_filter, {after} is empty on the
+# first page and the matching *_AFTER predicate once a cursor row is known. The redundant leading
+# bound is what lets the index range start at the cursor; the OR chain alone is not sargable and
+# every page would rescan earlier rows.
+UNSENT_COLUMNS = "id, article_heading, article_link, keyword, source, published_date, is_sent, date_created, date_updated"
+UNSENT_PAGE_PUBLISHED = """
+SELECT {columns} FROM {table}
+WHERE {where} AND published_date IS NOT NULL{after}
+ORDER BY published_date DESC, date_created DESC, id DESC
+LIMIT %s
+"""
+UNSENT_AFTER_PUBLISHED = """
+  AND published_date <= %s
+  AND (published_date < %s
+       OR (published_date = %s AND date_created < %s)
+       OR (published_date = %s AND date_created = %s AND id < %s))"""
+UNSENT_PAGE_UNDATED = """
+SELECT {columns} FROM {table}
+WHERE {where} AND published_date IS NULL{after}
+ORDER BY date_created DESC, id DESC
+LIMIT %s
+"""
+UNSENT_AFTER_UNDATED = """
+  AND date_created <= %s
+  AND (date_created < %s OR (date_created = %s AND id < %s))"""
+
+BATCH_KEYWORD_COUNTS = """
+SELECT COALESCE(LOWER(keyword), ''), COUNT(*)
+FROM articles
+WHERE is_sent = FALSE AND send_batch_id = %s
+GROUP BY COALESCE(LOWER(keyword), '')
+"""
+
+RETENTION_MONTH_IDS = "SELECT id FROM articles WHERE date_created >= %s AND date_created < %s ORDER BY id LIMIT %s"
+
+# Dashboard figures, all read from the precomputed article_stats groups ({days_ago} is the backend's days_ago_sql)
+STATS_BY_SENT = "SELECT is_sent, SUM(article_count) FROM article_stats GROUP BY is_sent"
+STATS_BY_KEYWORD = """
+SELECT keyword, SUM(article_count) AS n FROM article_stats
+GROUP BY keyword HAVING n > 0 ORDER BY keyword
+"""
+STATS_BY_SOURCE = """
+SELECT source, SUM(article_count) AS n FROM article_stats
+GROUP BY source HAVING n > 0 ORDER BY source
+"""
+STATS_LAST_DAYS = """
+SELECT stat_date, SUM(article_count) AS n FROM article_stats
+WHERE stat_date >= {days_ago}
+GROUP BY stat_date HAVING n > 0 ORDER BY stat_date
+"""
+
+# Index set designed around the hot queries (see hot_queries and check_query_plans).
+# ensure_schema_migrations adds missing ones; the indexes they supersede are only dropped by
+# drop_superseded_indexes (manual operation 12), since a drop cannot be undone without a rebuild.
+INDEX_MIGRATIONS = {
+    'articles': {
+        'idx_article_heading': "article_heading",  # duplicate check by heading
+        'idx_unsent_order': "is_sent, published_date, date_created",  # unsent articles, newest first
+        'idx_stats_cover': "date_created, keyword, source, is_sent",  # stats recount, retention month ranges
+        'idx_date_updated': "date_updated",  # analytics fingerprint and incremental refresh
+        'idx_analytics_cover': "keyword, source, published_date, date_created, is_sent",  # analytics cube
+    },
+    'article_stats': {
+        'idx_stats_keyword': "keyword, article_count",
+        'idx_stats_source': "source, article_count",
+        'idx_stats_sent': "is_sent, article_count",
+    },
+}
+
+SUPERSEDED_INDEXES = {
+    'articles': ['idx_keyword', 'idx_is_sent', 'idx_published_date', 'idx_date_created', 'idx_sent_published'],
+}
+
+
+class DownloadTooLargeError(requests.RequestException):
+    """Raised when a streamed download exceeds its byte or compression ratio cap"""
+
+
+class SearchIndexMissingError(RuntimeError):
+    """Raised by search_articles when the full-text heading index has not been created"""
+
+
+class MailQueue:
+    """Outbound mail queue with a durable on-disk spool and a reusable SMTP session.
+    
+    Messages are written to spool_dir before any delivery attempt, sent over one
+    authenticated connection that is kept open between flushes, and retried with
+    exponential backoff. Messages that keep failing are moved to spool_dir/failed.
+    With spool_dir=None messages are sent directly and failures raise.
+    
+    enqueue accepts latency marks ({label: [epoch seconds]}, e.g. when the articles were
+    inserted); the queue logs their age at the moment the message is actually sent.
+    """
+    
+    def __init__(self, email_config, spool_dir=None, max_attempts=5, base_backoff=30, idle_timeout=240):
+        self.email_config = email_config
+        self.spool_dir = spool_dir
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.last_used = 0
+        self.lock = threading.Lock()
+        
+        if self.spool_dir:
+            os.makedirs(os.path.join(self.spool_dir, 'failed'), exist_ok=True)
+    
+    def connect(self):
+        """Return an open, authenticated SMTP connection, reusing the current one while it is alive"""
+        if self.server is not None:
+            try:
+                if time.monotonic() - self.last_used < self.idle_timeout and self.server.noop()[0] == 250:
+                    return self.server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        
+        server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'], timeout=30)
+        if self.email_config.get('smtp_use_tls', True):
+            server.starttls()
+        if self.email_config.get('sender_password'):
+            server.login(self.email_config['sender_email'], self.email_config['sender_password'])
+        
+        self.server = server
+        self.last_used = time.monotonic()
+        return server
+    
+    def close(self):
+        """Close the SMTP connection if one is open"""
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+    
+    def send_now(self, sender, recipients, message_bytes):
+        """Send one message over the shared connection, reconnecting once if the server dropped it"""
+        for attempt in range(2):
+            server = self.connect()
+            try:
+                server.sendmail(sender, recipients, message_bytes)
+                self.last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self.server = None
+                if attempt:
+                    raise
+    
+    def log_delivery_latency(self, meta):
+        """Log the age of a just-sent message's latency marks (see enqueue)"""
+        sent_at = time.time()
+        latencies = [
+            f"{label}-to-delivery max {sent_at - min(marks):.0f}s (avg {sum(sent_at - m for m in marks) / len(marks):.0f}s)"
+            for label, marks in meta.get('marks', {}).items() if marks
+        ]
+        if latencies:
+            logging.info(f"Delivered '{meta.get('subject')}': {', '.join(latencies)}")
+    
+    def enqueue(self, msg, recipients, marks=None):
+        """Spool a message for delivery (or send it directly when there is no spool)"""
+        sender = self.email_config['sender_email']
+        message_bytes = msg.as_bytes()
+        meta = {'sender': sender, 'recipients': recipients, 'attempts': 0, 'next_attempt': 0,
+                'subject': msg['Subject'], 'marks': marks or {}}
+        
+        if not self.spool_dir:
+            with self.lock:
+                self.send_now(sender, recipients, message_bytes)
+            self.log_delivery_latency(meta)
+            return
+        
+        name = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}_{uuid.uuid4().hex[:8]}"
+        # Write the body before its metadata so flush never sees a half-spooled message
+        for suffix, payload in (('.eml', message_bytes), ('.json', json.dumps(meta).encode('utf-8'))):
+            path = os.path.join(self.spool_dir, name + suffix)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(payload)
+            os.replace(path + '.tmp', path)
+    
+    def pending(self):
+        """Names of spooled messages in delivery order"""
+        if not self.spool_dir:
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.spool_dir) if name.endswith('.json'))
+    
+    def flush(self):
+        """Deliver every due spooled message, returns (sent, deferred, failed) counts"""
+        sent = deferred = failed = 0
+        start = time.perf_counter()
+        
+        with self.lock:
+            for name in self.pending():
+                meta_path = os.path.join(self.spool_dir, name + '.json')
+                eml_path = os.path.join(self.spool_dir, name + '.eml')
+                
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta['next_attempt'] > time.time():
+                    deferred += 1
+                    continue
+                
+                try:
+                    with open(eml_path, 'rb') as f:
+                        self.send_now(meta['sender'], meta['recipients'], f.read())
+                    os.remove(eml_path)
+                    os.remove(meta_path)
+                    sent += 1
+                    self.log_delivery_latency(meta)
+                    
+                except (smtplib.SMTPException, OSError) as e:
+                    meta['attempts'] += 1
+                    meta['last_error'] = str(e)
+                    self.close()
+                    
+                    if meta['attempts'] >= self.max_attempts:
+                        logging.error(f"Giving up on spooled message {name} after {meta['attempts']} attempts: {e}")
+                        failed_dir = os.path.join(self.spool_dir, 'failed')
+                        os.replace(eml_path, os.path.join(failed_dir, name + '.eml'))
+                        with open(os.path.join(failed_dir, name + '.json'), 'w', encoding='utf-8') as f:
+                            json.dump(meta, f)
+                        os.remove(meta_path)
+                        failed += 1
+                    else:
+                        backoff = self.base_backoff * 2 ** (meta['attempts'] - 1)
+                        meta['next_attempt'] = time.time() + backoff
+                        with open(meta_path, 'w', encoding='utf-8') as f:
+                            json.dump(meta, f)
+                        logging.warning(f"Delivery of {name} failed ({e}), retrying in {backoff}s")
+                        deferred += 1
+        
+        elapsed = time.perf_counter() - start
+        if sent or failed:
+            rate = sent / elapsed if elapsed > 0 else float('inf')
+            logging.info(f"Mail queue: {sent} sent, {deferred} deferred, {failed} failed "
+                         f"in {elapsed:.2f}s ({rate:.1f} messages/sec)")
+        return sent, deferred, failed
+
+
 class NewsFetcher:
-    def __init__(self, newsapi_keys, mysql_config=None, email_config=None):
+    def __init__(self, newsapi_keys, mysql_config=None, email_config=None, storage=None):
         # Support multiple API keys (pass as list or single string)
         if isinstance(newsapi_keys, str):
             self.newsapi_keys = [newsapi_keys]
@@ -47,11 +417,14 @@ class NewsFetcher:
         self.api_key_last_success = {key: datetime.now() for key in self.newsapi_keys}
         
         self.mysql_config = mysql_config
+        # Where articles live: MySQL by default, or e.g. a SQLiteBackend for local runs
+        self.storage = storage or MySQLBackend(mysql_config or {})
         
         # Email configuration - now uses passed config or raises error
         if email_config is None:
             raise ValueError("Email configuration must be provided when initializing NewsFetcher")
         self.email_config = email_config
+        self.mail_queue = MailQueue(self.email_config)
         
         # Regular keywords (unlimited articles per run)
         self.keywords = [
@@ -74,6 +447,7 @@ class NewsFetcher:
         self.custom_sources = {
             'Economic Times Policy': {
                 'url': "https://economictimes.indiatimes.com/news/economy/policy",
+                'news_sitemap': "https://economictimes.indiatimes.com/etstatic/sitemaps/et/news/news-sitemap.xml",
                 'selectors': {
                     'article_container': ['div[data-nid]', 'div.story-box', 'div.eachStory'],
                     'title': ['h3', 'h2', 'h4', 'div.story-box h4', '.title'],
@@ -101,6 +475,7 @@ class NewsFetcher:
             },
             'Business Standard': {
                 'url': "https://www.business-standard.com",
+                'news_sitemap': "https://www.business-standard.com/news-sitemap.xml",
                 'selectors': {
                     'article_container': ['div.listingstyle', 'div.cardlist', 'article', '.story-card'],
                     'title': ['h2', 'h3', '.headline', 'a.headline'],
@@ -110,6 +485,7 @@ class NewsFetcher:
             },
             'Livemint': {
                 'url': "https://www.livemint.com/",
+                'news_sitemap': "https://www.livemint.com/news-sitemap.xml",
                 'selectors': {
                     'article_container': ['div.listView', 'div.story', 'article'],
                     'title': ['h3', 'h2', '.headline'],
@@ -146,6 +522,7 @@ class NewsFetcher:
             },
             'The Hindu': {
                 'url': "https://www.thehindubusinessline.com/",
+                'news_sitemap': "https://www.thehindubusinessline.com/news-sitemap.xml",
                 'selectors': {
                     'article_container': ['div.story-card', 'article', '.element'],
                     'title': ['h3', 'h2', '.story-title'],
@@ -155,6 +532,7 @@ class NewsFetcher:
             },
             'Financial Express': {
                 'url': "https://www.financialexpress.com/",
+                'news_sitemap': "https://www.financialexpress.com/news-sitemap.xml",
                 'selectors': {
                     'article_container': ['div.story-box', 'article', '.news-item'],
                     'title': ['h3', 'h2', '.story-title'],
@@ -167,10 +545,69 @@ class NewsFetcher:
         # India timezone
         self.timezone = pytz.timezone('Asia/Kolkata')
         
+        # Newest sitemap publication date seen per source (naive UTC)
+        self.sitemap_last_seen = {}
+        
         # Track last email sent times
         self.last_morning_email = None
         self.last_evening_email = None
         
+        # Download limits - a source config may override with 'max_bytes'
+        self.max_download_bytes = 5 * 1024 * 1024
+        self.max_compression_ratio = 100
+        
+        # Per-cycle time budget for fetch_all_news (seconds, None disables)
+        self.fetch_time_budget = 80 * 60
+        self.run_deadline = None
+        self.budget_skipped = []
+        
+        # Persisted runtime state (see load_state/save_state); None disables persistence
+        self.state_file = None
+        self.fetch_interval_minutes = 90
+        self.cycle_started = None
+        self.last_fetch_completed = None
+        self.cycle_done = set()
+        self.cycle_articles = []
+        
+        # Digest size limits: 'inline' puts everything in one message, 'attach' keeps the top
+        # digest_max_inline articles inline and attaches the rest, 'split' sends several messages
+        self.digest_mode = 'attach'
+        self.digest_max_inline = 200
+        self.digest_max_bytes = 5 * 1024 * 1024
+        self.digest_attachment_format = 'csv'
+        
+        # Priority keywords are alerted as soon as they are saved instead of waiting for the digest.
+        # Alerts are debounced: a burst is sent once no new alert arrived for alert_debounce_seconds,
+        # or alert_max_delay_seconds after the first pending alert, whichever comes first.
+        self.priority_keywords = ['SEBI', 'Press Note']
+        self.alert_debounce_seconds = 120
+        self.alert_max_delay_seconds = 600
+        # Without a mail spool a failed alert is re-queued up to alert_max_attempts times; spooled
+        # alerts are retried by MailQueue and end up in its failed/ directory instead
+        self.alert_max_attempts = 5
+        self.pending_alerts = []
+        self.alert_first_pending = None
+        self.alert_timer = None
+        self.alert_lock = threading.Lock()
+        
+        # Per-subscriber keyword digests (see load_subscriptions); empty sends one digest to everyone
+        self.subscriptions = {}
+        
+        # Retention (see run_retention): months kept in the live articles table, 0 keeps everything.
+        # Older months are archived to archive_dir; partitioned tables keep partitions ready ahead.
+        self.retention_months = 0
+        self.archive_dir = 'archive'
+        self.partition_months_ahead = 3
+        self.retention_delete_chunk = 5000
+        
+        # Tables whose full-text heading index is known to exist (see search_articles)
+        self.search_ready = {}
+        
+        # Keyword/source spike signals from the analytics trend engine, listed at the top of
+        # scheduled digests when enabled (see load_trend_signals)
+        self.trend_signals_in_digest = False
+        self.digest_signals = []
+        
         # Enhanced user agents for better scraping
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -205,7 +642,7 @@ class NewsFetcher:
                 return self.rotate_api_key()
             else:
                 logging.error("Only one API key available and it's rate limited. Waiting before retry...")
-                time.sleep(60)  # Wait 1 minute before retry
+                self.budget_sleep(60)  # Wait 1 minute before retry
         
         return api_key
 
@@ -231,6 +668,167 @@ class NewsFetcher:
             self.limited_keyword_usage[keyword] = self.limited_keyword_usage.get(keyword, 0) + 1
             logging.info(f"Limited keyword '{keyword}' used: {self.limited_keyword_usage[keyword]}/1")
 
+    def match_keyword(self, title):
+        """Return the first keyword found in title, honouring limited keyword usage"""
+        for keyword in self.keywords + self.limited_keywords:
+            pattern = r"\b" + re.escape(keyword) + r"\b"
+            if re.search(pattern, title, re.IGNORECASE):
+                if keyword in self.limited_keywords:
+                    if not self.can_use_limited_keyword(keyword):
+                        logging.debug(f"Skipping article for limited keyword '{keyword}' - already used")
+                        continue
+                    self.use_limited_keyword(keyword)
+                return keyword
+        return None
+
+    def start_run_budget(self):
+        """Start the time budget for a fetch cycle"""
+        self.budget_skipped = []
+        if self.fetch_time_budget:
+            self.run_deadline = time.monotonic() + self.fetch_time_budget
+        else:
+            self.run_deadline = None
+
+    def budget_remaining(self):
+        """Seconds left in the current cycle's budget, or None when unbounded"""
+        if self.run_deadline is None:
+            return None
+        return max(0.0, self.run_deadline - time.monotonic())
+
+    def budget_exhausted(self, skipped_item=None):
+        """Check the cycle budget, recording skipped_item if it has run out"""
+        remaining = self.budget_remaining()
+        if remaining is None or remaining > 0:
+            return False
+        if skipped_item:
+            self.budget_skipped.append(skipped_item)
+        return True
+
+    def budget_sleep(self, seconds):
+        """Sleep for up to seconds without overrunning the cycle budget"""
+        remaining = self.budget_remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def budget_timeout(self, timeout):
+        """Cap a request timeout to the time left in the cycle budget"""
+        remaining = self.budget_remaining()
+        if remaining is None:
+            return timeout
+        return max(1, min(timeout, remaining))
+
+    def api_key_id(self, api_key):
+        """Stable non-secret identifier for an API key, used in the state file"""
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+
+    def save_state(self):
+        """Checkpoint runtime state to the state file (atomic replace)"""
+        if not self.state_file:
+            return
+        
+        def to_iso(value):
+            return value.isoformat() if value else None
+        
+        state = {
+            'current_api_key_id': self.api_key_id(self.get_current_api_key()),
+            'api_keys': {
+                self.api_key_id(key): {
+                    'failures': self.api_key_failures.get(key, 0),
+                    'last_success': to_iso(self.api_key_last_success.get(key))
+                }
+                for key in self.newsapi_keys
+            },
+            'last_morning_email': to_iso(self.last_morning_email),
+            'last_evening_email': to_iso(self.last_evening_email),
+            'sitemap_last_seen': {name: to_iso(ts) for name, ts in self.sitemap_last_seen.items()},
+            'cycle_started': to_iso(self.cycle_started),
+            'last_fetch_completed': to_iso(self.last_fetch_completed),
+            'limited_keyword_usage': self.limited_keyword_usage,
+            'cycle_done': sorted(self.cycle_done),
+            'cycle_articles': [
+                dict(article, published_date=to_iso(article.get('published_date')))
+                for article in self.cycle_articles
+            ]
+        }
+        
+        try:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            logging.error(f"Error saving state to {self.state_file}: {e}")
+
+    def load_state(self):
+        """Restore runtime state saved by a previous run, returns True if state was loaded"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return False
+        
+        def from_iso(value):
+            return datetime.fromisoformat(value) if value else None
+        
+        try:
+            with open(self.state_file, encoding='utf-8') as f:
+                state = json.load(f)
+            
+            keys_by_id = {self.api_key_id(key): key for key in self.newsapi_keys}
+            for key_id, key_state in state.get('api_keys', {}).items():
+                key = keys_by_id.get(key_id)
+                if key:
+                    self.api_key_failures[key] = key_state.get('failures', 0)
+                    if key_state.get('last_success'):
+                        self.api_key_last_success[key] = from_iso(key_state['last_success'])
+            
+            current_key = keys_by_id.get(state.get('current_api_key_id'))
+            if current_key:
+                self.current_api_key_index = self.newsapi_keys.index(current_key)
+            
+            self.last_morning_email = from_iso(state.get('last_morning_email'))
+            self.last_evening_email = from_iso(state.get('last_evening_email'))
+            self.sitemap_last_seen = {
+                name: from_iso(ts) for name, ts in state.get('sitemap_last_seen', {}).items() if ts
+            }
+            self.cycle_started = from_iso(state.get('cycle_started'))
+            self.last_fetch_completed = from_iso(state.get('last_fetch_completed'))
+            self.limited_keyword_usage = state.get('limited_keyword_usage', {})
+            self.cycle_done = set(state.get('cycle_done', []))
+            self.cycle_articles = [
+                dict(article, published_date=from_iso(article.get('published_date')))
+                for article in state.get('cycle_articles', [])
+            ]
+            
+            logging.info(f"Loaded runtime state from {self.state_file}")
+            return True
+            
+        except (OSError, ValueError, TypeError) as e:
+            logging.error(f"Error loading state from {self.state_file}: {e}")
+            return False
+
+    def has_unfinished_cycle(self):
+        """Check if a fetch cycle was interrupted recently enough to resume"""
+        if not self.cycle_started:
+            return False
+        if self.last_fetch_completed and self.last_fetch_completed >= self.cycle_started:
+            return False
+        return datetime.now() - self.cycle_started < timedelta(minutes=self.fetch_interval_minutes)
+
+    def fetch_is_due(self):
+        """Check if a fetch should run now rather than wait for the next scheduled cycle"""
+        if self.has_unfinished_cycle() or not self.last_fetch_completed:
+            return True
+        return datetime.now() - self.last_fetch_completed >= timedelta(minutes=self.fetch_interval_minutes)
+
+    def checkpoint_cycle(self, item, articles):
+        """Record a finished unit of work in the current cycle and persist it"""
+        discovered_at = time.time()
+        for article in articles:
+            article.setdefault('discovered_at', discovered_at)
+        self.cycle_done.add(item)
+        self.cycle_articles.extend(articles)
+        self.save_state()
+
     def normalize_heading(self, heading):
         """Normalize heading for duplicate detection"""
         if not heading:
@@ -254,20 +852,17 @@ class NewsFetcher:
         """Verify that the articles table exists"""
         connection = None
         try:
-            connection = mysql.connector.connect(**self.mysql_config)
+            connection = self.storage.connect()
             cursor = connection.cursor()
             
-            cursor.execute("SHOW TABLES LIKE 'articles'")
-            result = cursor.fetchone()
-            
-            if result:
+            if self.storage.table_exists(cursor, 'articles'):
                 logging.info("Articles table exists")
                 return True
             else:
                 logging.error("Articles table does not exist")
                 return False
                 
-        except Error as e:
+        except STORAGE_ERRORS as e:
             logging.error(f"Error verifying table: {e}")
             return False
         finally:
@@ -275,6 +870,115 @@ class NewsFetcher:
                 cursor.close()
                 connection.close()
 
+    def ensure_schema_migrations(self):
+        """Add columns, tables and indexes introduced after the original schema to existing databases"""
+        if self.storage.creates_schema:
+            return self.create_search_index()
+        
+        migrations = {
+            'send_batch_id': [
+                "ALTER TABLE articles ADD COLUMN send_batch_id CHAR(36) NULL, "
+                "ADD COLUMN send_batch_claimed_at DATETIME NULL",
+                "CREATE INDEX idx_send_batch ON articles (send_batch_id)",
+                "CREATE INDEX idx_sent_batch_claimed ON articles (is_sent, send_batch_id, send_batch_claimed_at)"
+            ]
+        }
+        
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            existing_columns = self.storage.column_names(cursor, 'articles')
+            
+            for column, statements in migrations.items():
+                if column in existing_columns:
+                    continue
+                logging.info(f"Migrating articles table: adding {column}")
+                for statement in statements:
+                    cursor.execute(statement)
+            
+            stats_missing = not self.storage.table_exists(cursor, 'article_stats')
+            cursor.execute(STATS_TABLE_DDL)
+            cursor.execute(ARCHIVE_KEYS_DDL)
+            cursor.execute(DIGEST_BATCHES_DDL)
+            connection.commit()
+            
+            for table, indexes in INDEX_MIGRATIONS.items():
+                existing_indexes = self.storage.index_names(cursor, table)
+                for name, columns in indexes.items():
+                    if name not in existing_indexes:
+                        logging.info(f"Migrating {table} table: adding index {name} ({columns})")
+                        cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+                superseded = [name for name in SUPERSEDED_INDEXES.get(table, []) if name in existing_indexes]
+                if superseded:
+                    logging.info(f"{table} still has superseded indexes {', '.join(superseded)}; "
+                                 f"drop them with manual operation 12 once the new plans are confirmed")
+            
+            if stats_missing:
+                logging.info("Created article_stats, backfilling from a full recount")
+                self.rebuild_stats()
+            return self.create_search_index()
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error applying schema migrations: {e}")
+            return False
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def drop_superseded_indexes(self):
+        """Drop the indexes listed in SUPERSEDED_INDEXES that still exist; returns the dropped names"""
+        dropped = []
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            for table, names in SUPERSEDED_INDEXES.items():
+                existing_indexes = self.storage.index_names(cursor, table)
+                for name in names:
+                    if name in existing_indexes:
+                        logging.info(f"Dropping superseded index {name} on {table}")
+                        cursor.execute(f"DROP INDEX {name} ON {table}")
+                        dropped.append(f"{table}.{name}")
+            return dropped
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error dropping superseded indexes after dropping {dropped}: {e}")
+            return dropped
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def create_search_index(self, table='articles'):
+        """Create the full-text heading index used by search_articles if it is missing.
+        
+        On MySQL this rebuilds the table once, so it runs with the schema migrations rather than
+        on a search. Partitioned tables cannot carry the index and are left to LIKE matching.
+        """
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            if self.storage.partition_names(cursor, table) or self.storage.has_search_index(cursor, table):
+                return True
+            
+            logging.info(f"Migrating {table} table: adding full-text index {SEARCH_INDEX} on article_heading")
+            start = time.perf_counter()
+            self.storage.ensure_search_index(connection, table)
+            logging.info(f"Built the search index on {table} in {time.perf_counter() - start:.1f}s")
+            return True
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error creating the search index on {table}: {e}")
+            return False
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
     def save_to_database(self, articles):
         """Save articles to MySQL database with detailed logging and duplicate heading detection"""
         if not articles:
@@ -283,7 +987,7 @@ class NewsFetcher:
         
         connection = None
         try:
-            connection = mysql.connector.connect(**self.mysql_config)
+            connection = self.storage.connect()
             cursor = connection.cursor()
             
             insert_query = """
@@ -293,7 +997,14 @@ class NewsFetcher:
             
             inserted_count = 0
             skipped_duplicate_heading = 0
+            skipped_archived = 0
             error_count = 0
+            priority_articles = []
+            stats_deltas = defaultdict(int)
+            
+            # Archived months no longer have rows in articles; their keys are only checked once some exist
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM archived_article_keys)")
+            check_archive = bool(cursor.fetchone()[0])
             
             for article in articles:
                 try:
@@ -313,12 +1024,9 @@ class NewsFetcher:
                         error_count += 1
                         continue
                     
-                    # Check if article with similar heading already exists
-                    cursor.execute("""
-                        SELECT article_heading, article_link 
-                        FROM articles 
-                        WHERE article_heading = %s
-                    """, (title,))
+                    # Check if article with similar heading (or the same link) already exists.
+                    # The link is checked explicitly because partitioned tables cannot keep it UNIQUE.
+                    cursor.execute(DEDUP_QUERY, (title, url))
                     
                     existing = cursor.fetchone()
                     
@@ -329,6 +1037,15 @@ class NewsFetcher:
                         logging.debug(f"  New:      {url[:80]}...")
                         continue
                     
+                    if check_archive:
+                        cursor.execute(ARCHIVED_KEY_QUERY,
+                                       (self.archive_key('heading', title), self.archive_key('link', url)))
+                        archived = cursor.fetchone()
+                        if archived:
+                            skipped_archived += 1
+                            logging.debug(f"Duplicate of an article archived in {archived[0]}: '{title[:60]}...'")
+                            continue
+                    
                     # Insert the new article
                     cursor.execute(insert_query, (
                         title,
@@ -340,14 +1057,36 @@ class NewsFetcher:
                     ))
                     
                     inserted_count += 1
+                    stats_deltas[(article['keyword'], article['source'])] += 1
                     logging.info(f"✓ Inserted: {title[:60]}... from {article['source']}")
+                    
+                    if self.is_priority_keyword(article['keyword']):
+                        priority_articles.append({
+                            'id': cursor.lastrowid,
+                            'article_heading': title,
+                            'article_link': url,
+                            'keyword': article['keyword'],
+                            'source': article['source'],
+                            'published_date': article.get('published_date'),
+                            'discovered_at': article.get('discovered_at'),
+                            'inserted_at': time.time()
+                        })
                         
-                except Error as e:
+                except STORAGE_ERRORS as e:
                     error_count += 1
                     logging.error(f"✗ Error inserting article '{article.get('title', 'Unknown')[:50]}...': {e}")
                     logging.error(f"  URL: {article.get('url', 'Unknown')[:100]}")
                     continue
             
+            # Count the new rows in article_stats within the same transaction (date_created is today)
+            if stats_deltas:
+                cursor.execute(f"SELECT {self.storage.today_sql}")
+                today = cursor.fetchone()[0]
+                cursor.executemany(self.storage.upsert_increment('article_stats', STATS_KEYS, 'article_count'), [
+                    (today, keyword, source, False, count)
+                    for (keyword, source), count in stats_deltas.items()
+                ])
+            
             connection.commit()
             
             # Comprehensive logging
@@ -355,168 +1094,1223 @@ class NewsFetcher:
             logging.info(f"Database operation completed:")
             logging.info(f"  ✓ {inserted_count} new articles inserted")
             logging.info(f"  ⊘ {skipped_duplicate_heading} articles skipped (duplicate headings)")
+            logging.info(f"  ⊘ {skipped_archived} articles skipped (already archived)")
             logging.info(f"  ✗ {error_count} errors encountered")
             logging.info(f"  = {len(articles)} total articles processed")
             logging.info(f"=" * 70)
             
-        except Error as e:
-            logging.error(f"Database connection error: {e}")
+            if priority_articles:
+                self.queue_priority_alerts(priority_articles)
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Database connection error: {e}")
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def unsent_filter(self, batch_id=None, keywords=None, exclude_keywords=None):
+        """WHERE clause and params selecting unsent articles, optionally of one batch.
+        
+        keywords keeps only articles whose lowercased keyword is in the set, exclude_keywords
+        drops them (articles without a keyword count as the keyword '').
+        """
+        where = "is_sent = FALSE"
+        params = []
+        if batch_id:
+            where += " AND send_batch_id = %s"
+            params.append(batch_id)
+        if keywords is not None:
+            where += f" AND LOWER(keyword) IN ({', '.join(['%s'] * len(keywords))})"
+            params += sorted(keywords)
+        if exclude_keywords:
+            where += f" AND COALESCE(LOWER(keyword), '') NOT IN ({', '.join(['%s'] * len(exclude_keywords))})"
+            params += sorted(exclude_keywords)
+        return where, params
+
+    def iter_unsent_articles(self, chunk_size=500, batch_id=None, table='articles', keywords=None,
+                             exclude_keywords=None):
+        """Yield unsent articles newest first, paging with a keyset cursor so memory stays constant.
+        
+        Rows are ordered by published_date DESC, date_created DESC, id DESC. Articles with a
+        published_date are paged first, then those without one (MySQL sorts NULLs last in DESC).
+        Pass batch_id to restrict the scan to articles claimed by a digest batch, and keywords or
+        exclude_keywords to filter by keyword (see unsent_filter).
+        """
+        base_filter, base_params = self.unsent_filter(batch_id, keywords, exclude_keywords)
+        
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor(dictionary=True)
+            
+            start = time.perf_counter()
+            total_rows = 0
+            pages = 0
+            
+            # Phase 1: articles with a published_date, keyset on (published_date, date_created, id)
+            last = None
+            while True:
+                params = list(base_params)
+                if last:
+                    params += [last['published_date'], last['published_date'], last['published_date'],
+                               last['date_created'], last['published_date'], last['date_created'], last['id']]
+                params.append(chunk_size)
+                
+                cursor.execute(UNSENT_PAGE_PUBLISHED.format(columns=UNSENT_COLUMNS, table=table, where=base_filter,
+                                                            after=UNSENT_AFTER_PUBLISHED if last else ""), params)
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                pages += 1
+                total_rows += len(rows)
+                yield from rows
+                if len(rows) < chunk_size:
+                    break
+                last = rows[-1]
+            
+            # Phase 2: articles without a published_date, keyset on (date_created, id)
+            last = None
+            while True:
+                params = list(base_params)
+                if last:
+                    params += [last['date_created'], last['date_created'], last['date_created'], last['id']]
+                params.append(chunk_size)
+                
+                cursor.execute(UNSENT_PAGE_UNDATED.format(columns=UNSENT_COLUMNS, table=table, where=base_filter,
+                                                          after=UNSENT_AFTER_UNDATED if last else ""), params)
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                pages += 1
+                total_rows += len(rows)
+                yield from rows
+                if len(rows) < chunk_size:
+                    break
+                last = rows[-1]
+            
+            logging.info(f"Streamed {total_rows} unsent articles in {pages} page(s) "
+                         f"of up to {chunk_size} in {time.perf_counter() - start:.2f}s")
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error fetching unsent articles: {e}")
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def benchmark_unsent_paging(self, rows=1000000, chunk_size=500, offset_samples=40):
+        """Compare keyset paging (iter_unsent_articles) with LIMIT/OFFSET paging and a single full fetch.
+        
+        Uses a synthetic table of rows unsent articles, dropped afterwards. A full OFFSET pass is
+        quadratic, so only offset_samples pages spread evenly over the table are read and its
+        seconds are extrapolated to every page. Returns
+        {method: {'rows', 'seconds', 'peak_mb', 'slowest_page_ms'}}.
+        """
+        table = 'articles_paging_benchmark'
+        columns = "id, article_heading, article_link, keyword, source, published_date, is_sent, date_created, date_updated"
+        order = "ORDER BY published_date IS NULL, published_date DESC, date_created DESC, id DESC"
+        
+        def pages(fetch_page):
+            # Yields rows while recording the slowest page, like iter_unsent_articles' consumers see them
+            while True:
+                start = time.perf_counter()
+                page = fetch_page()
+                slowest[0] = max(slowest[0], time.perf_counter() - start)
+                if not page:
+                    return
+                yield from page
+        
+        def offset_rows(connection):
+            cursor = connection.cursor(dictionary=True)
+            page_count = -(-rows // chunk_size)
+            offsets = iter(sorted({page * page_count // offset_samples * chunk_size for page in range(offset_samples)}
+                                  | {(page_count - 1) * chunk_size}))
+            
+            def fetch_page():
+                offset = next(offsets, None)
+                if offset is None:
+                    return []
+                cursor.execute(f"SELECT {columns} FROM {table} WHERE is_sent = FALSE {order} LIMIT %s OFFSET %s",
+                               (chunk_size, offset))
+                return cursor.fetchall()
+            
+            yield from pages(fetch_page)
+            cursor.close()
+        
+        def full_fetch(connection):
+            cursor = connection.cursor(dictionary=True)
+            
+            def fetch_once():
+                if fetched:
+                    return []
+                fetched.append(True)
+                cursor.execute(f"SELECT {columns} FROM {table} WHERE is_sent = FALSE {order}")
+                return cursor.fetchall()
+            
+            fetched = []
+            yield from pages(fetch_once)
+            cursor.close()
+        
+        def keyset(connection):
+            iterator = self.iter_unsent_articles(chunk_size=chunk_size, table=table)
+            yield from pages(lambda: list(itertools.islice(iterator, chunk_size)))
+        
+        connection = self.storage.connect()
+        results = {}
+        try:
+            start = time.perf_counter()
+            self.storage.create_synthetic_articles(connection, table, rows)
+            cursor = connection.cursor()
+            cursor.execute(f"UPDATE {table} SET is_sent = FALSE")
+            if 'idx_unsent_order' not in self.storage.index_names(cursor, table):
+                cursor.execute(f"CREATE INDEX idx_{table}_unsent ON {table} (is_sent, published_date, date_created)")
+            connection.commit()
+            cursor.close()
+            logging.info(f"Created {rows} synthetic unsent articles in {time.perf_counter() - start:.1f}s")
+            
+            for label, method in (('keyset', keyset), ('offset', offset_rows), ('full fetch', full_fetch)):
+                slowest = [0.0]
+                tracemalloc.start()
+                start = time.perf_counter()
+                count = sum(1 for _ in method(connection))
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                if label == 'offset' and count < rows:
+                    # Sampled pages only: scale to the full pass, pages cost roughly linear in their offset
+                    elapsed *= rows / max(count, 1)
+                    label = 'offset (est.)'
+                results[label] = {'rows': count, 'seconds': elapsed, 'peak_mb': peak / 1024 ** 2,
+                                  'slowest_page_ms': slowest[0] * 1000}
+                logging.info(f"Unsent paging ({label}): {count} rows in {elapsed:.1f}s, "
+                             f"peak {peak / 1024 ** 2:.1f} MB, slowest page {slowest[0] * 1000:.0f} ms")
+            return results
+        finally:
+            cursor = connection.cursor()
+            self.storage.drop_table(cursor, table)
+            connection.commit()
+            cursor.close()
+            connection.close()
+
+    def is_priority_keyword(self, keyword):
+        """Check if a keyword belongs to the priority alert class"""
+        return (keyword or '').lower() in {k.lower() for k in self.priority_keywords}
+
+    def queue_priority_alerts(self, articles):
+        """Add newly saved priority articles to the pending alert and (re)arm the debounce timer"""
+        with self.alert_lock:
+            now = time.time()
+            if not self.pending_alerts:
+                self.alert_first_pending = now
+            self.pending_alerts.extend(articles)
+            
+            # Restart the quiet-period timer, but never push the alert past the max delay
+            delay = min(self.alert_debounce_seconds,
+                        max(0, self.alert_first_pending + self.alert_max_delay_seconds - now))
+            if self.alert_timer:
+                self.alert_timer.cancel()
+            self.alert_timer = threading.Timer(delay, self.flush_priority_alerts)
+            self.alert_timer.daemon = True
+            self.alert_timer.start()
+        
+        logging.info(f"Queued {len(articles)} priority alert(s), sending in {delay:.0f}s unless more arrive")
+
+    def flush_priority_alerts(self):
+        """Hand all pending priority alerts to the mail queue as one message.
+        
+        The queue logs insert- and discovery-to-delivery latency when the alert is actually sent,
+        which for a spooled alert may be a later flush. Returns True once the alert is handed off.
+        """
+        with self.alert_lock:
+            if self.alert_timer:
+                self.alert_timer.cancel()
+                self.alert_timer = None
+            alerts, self.pending_alerts = self.pending_alerts, []
+        
+        if not alerts:
+            return False
+        
+        label = f"Priority Alert: {', '.join(sorted({a['keyword'] for a in alerts}))}"
+        marks = {
+            'insert': [a['inserted_at'] for a in alerts],
+            'discovery': [a['discovered_at'] for a in alerts if a.get('discovered_at')],
+        }
+        try:
+            self.deliver_messages(self.build_digest_messages(alerts, label, len(alerts)), marks)
+        except Exception as e:
+            # Only reached without a spool: nothing was handed off, so retry from memory
+            for alert in alerts:
+                alert['alert_attempts'] = alert.get('alert_attempts', 0) + 1
+            retry = [a for a in alerts if a['alert_attempts'] < self.alert_max_attempts]
+            logging.error(f"Error sending priority alert, returning {len(retry)} article(s) to the queue: {e}")
+            if len(retry) < len(alerts):
+                logging.error(f"Gave up alerting {len(alerts) - len(retry)} article(s) after "
+                              f"{self.alert_max_attempts} attempts, they are still in the next digest")
+            if retry:
+                self.queue_priority_alerts(retry)
+            return False
+        
+        logging.info(f"Priority alert for {len(alerts)} article(s) handed to the mail queue")
+        return True
+
+    def get_unsent_articles(self):
+        """Get all articles with is_sent = FALSE as a list (use iter_unsent_articles for large backlogs)"""
+        articles = list(self.iter_unsent_articles())
+        logging.info(f"Found {len(articles)} unsent articles")
+        return articles
+
+    def count_unsent_articles(self):
+        """Count articles with is_sent = FALSE"""
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            cursor.execute(UNSENT_COUNT)
+            return cursor.fetchone()[0]
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error counting unsent articles: {e}")
+            return 0
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def count_batch_keywords(self, batch_id):
+        """{lowercased keyword: unsent article count} for a digest batch, None on a database error"""
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            cursor.execute(BATCH_KEYWORD_COUNTS, (batch_id,))
+            return dict(cursor.fetchall())
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error counting keywords of batch {batch_id}: {e}")
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def update_sent_status(self, article_ids, status=True):
+        """Update is_sent status for given article IDs"""
+        if not article_ids:
+            return
+        
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            placeholders = ','.join(['%s'] * len(article_ids))
+            self.move_sent_stats(cursor, f"id IN ({placeholders})", list(article_ids), status)
+            query = f"UPDATE articles SET is_sent = %s WHERE id IN ({placeholders})"
+            
+            cursor.execute(query, [status] + article_ids)
+            connection.commit()
+            
+            logging.info(f"Updated is_sent status to {status} for {len(article_ids)} articles")
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error updating is_sent status: {e}")
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def move_sent_stats(self, cursor, where, params, status):
+        """Move the counts of rows about to change is_sent between sent buckets in article_stats.
+        
+        Must run in the transaction of the UPDATE; the rows are locked so the counts cannot drift.
+        """
+        self.storage.begin_write(cursor)
+        cursor.execute(f"""
+            SELECT DATE(date_created), keyword, source, COUNT(*)
+            FROM articles
+            WHERE {where} AND is_sent <> %s
+            GROUP BY DATE(date_created), keyword, source{self.storage.for_update}
+        """, list(params) + [bool(status)])
+        groups = cursor.fetchall()
+        if not groups:
+            return
+        
+        cursor.executemany(self.storage.upsert_increment('article_stats', STATS_KEYS, 'article_count'), [
+            row
+            for stat_date, keyword, source, count in groups
+            for row in ((stat_date, keyword, source, bool(status), count),
+                        (stat_date, keyword, source, not status, -count))
+        ])
+
+    def rebuild_stats(self):
+        """Replace article_stats with a full recount of the articles table"""
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            start = time.perf_counter()
+            cursor.execute("DELETE FROM article_stats")
+            cursor.execute(f"INSERT INTO article_stats (stat_date, keyword, source, is_sent, article_count) {STATS_RECOUNT}")
+            connection.commit()
+            
+            logging.info(f"Rebuilt article_stats with {cursor.rowcount} groups in {time.perf_counter() - start:.2f}s")
+            return True
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error rebuilding article_stats: {e}")
+            return False
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def verify_stats(self):
+        """Reconcile article_stats against a full recount of articles.
+        
+        Returns a list of (stat_date, keyword, source, is_sent, stored, actual) mismatches,
+        or None when the check could not run.
+        """
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            # Dates are compared as text: SQLite returns DATE() results as strings
+            cursor.execute(STATS_RECOUNT)
+            actual = {(str(d), k, s, bool(sent)): count for d, k, s, sent, count in cursor.fetchall()}
+            
+            cursor.execute("SELECT stat_date, keyword, source, is_sent, article_count FROM article_stats")
+            stored = {(str(d), k, s, bool(sent)): count for d, k, s, sent, count in cursor.fetchall()}
+            
+            mismatches = [
+                key + (stored.get(key, 0), actual.get(key, 0))
+                for key in sorted(set(actual) | set(stored), key=str)
+                if stored.get(key, 0) != actual.get(key, 0)
+            ]
+            
+            logging.info(f"Verified article_stats: {len(stored)} groups stored, {len(actual)} recounted, "
+                         f"{len(mismatches)} mismatches")
+            return mismatches
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error verifying article_stats: {e}")
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    @staticmethod
+    def archive_key(kind, value):
+        """Hash under which an archived heading or link is kept in archived_article_keys"""
+        return hashlib.sha256(f"{kind}:{value}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def month_start(value, offset=0):
+        """Midnight on the first day of the month offset months after the month of value"""
+        index = value.year * 12 + value.month - 1 + offset
+        return datetime(index // 12, index % 12 + 1, 1)
+
+    def month_range(self, first, last):
+        """Month starts from first to last inclusive"""
+        months = []
+        month = self.month_start(first)
+        while month <= last:
+            months.append(month)
+            month = self.month_start(month, 1)
+        return months
+
+    def partition_clauses(self, months):
+        """Partition definitions for the given months followed by the catch-all pmax partition"""
+        return [
+            PARTITION_TEMPLATE.format(name=f"p{month:%Y%m}", bound=self.month_start(month, 1))
+            for month in months
+        ] + [PARTITION_MAX]
+
+    def list_partitions(self, cursor):
+        """Month starts of the monthly articles partitions, or None when articles is not partitioned"""
+        names = self.storage.partition_names(cursor, 'articles')
+        if not names:
+            return None
+        return sorted(datetime.strptime(name, 'p%Y%m') for name in names if name != 'pmax')
+
+    def partition_articles(self):
+        """Convert articles to monthly RANGE partitions on date_created.
+        
+        One-off migration that rebuilds the table (run it in a quiet period): the primary key
+        becomes (id, date_created) and article_link is no longer UNIQUE, see PARTITION_KEY_CHANGES.
+        """
+        if not self.storage.supports_partitions:
+            logging.error(f"{self.storage.describe()} does not support table partitioning")
+            return False
+        
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            if self.list_partitions(cursor) is not None:
+                logging.info("Articles table is already partitioned")
+                return True
+            
+            cursor.execute("SELECT MIN(date_created) FROM articles")
+            first = cursor.fetchone()[0] or datetime.now()
+            months = self.month_range(first, self.month_start(datetime.now(), self.partition_months_ahead))
+            
+            start = time.perf_counter()
+            # InnoDB cannot partition a table with a FULLTEXT index; search falls back to LIKE afterwards
+            if SEARCH_INDEX in self.storage.index_names(cursor, 'articles'):
+                cursor.execute(f"ALTER TABLE articles DROP INDEX {SEARCH_INDEX}")
+                self.search_ready.pop('articles', None)
+            cursor.execute(PARTITION_KEY_CHANGES)
+            cursor.execute(
+                "ALTER TABLE articles PARTITION BY RANGE (UNIX_TIMESTAMP(date_created)) "
+                f"({', '.join(self.partition_clauses(months))})"
+            )
+            logging.info(f"Partitioned articles into {len(months)} monthly partitions "
+                         f"in {time.perf_counter() - start:.1f}s")
+            return True
+        
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error partitioning articles table: {e}")
+            return False
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def ensure_partitions(self):
+        """Split pmax so a partitioned articles table has partitions partition_months_ahead months ahead"""
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            months = self.list_partitions(cursor)
+            if not months:
+                return False
+            
+            missing = self.month_range(self.month_start(months[-1], 1),
+                                       self.month_start(datetime.now(), self.partition_months_ahead))
+            if missing:
+                cursor.execute(
+                    "ALTER TABLE articles REORGANIZE PARTITION pmax "
+                    f"INTO ({', '.join(self.partition_clauses(missing))})"
+                )
+                logging.info(f"Added article partitions {missing[0]:%Y-%m} to {missing[-1]:%Y-%m}")
+            return True
+        
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error maintaining article partitions: {e}")
+            return False
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def archive_month(self, connection, month, partitioned):
+        """Archive one month of articles to a gzip CSV file, then remove it from the live tables.
+        
+        The file is read back to record heading and link hashes (and to check the row count)
+        before any row is removed. Partitioned tables drop the month's partition; others delete
+        it in small committed chunks so no long-running lock is held. Returns the archived row count.
+        """
+        label = f"{month:%Y-%m}"
+        next_month = self.month_start(month, 1)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"articles_{month:%Y_%m}_{datetime.now():%Y%m%d%H%M%S}.csv.gz")
+        
+        # A rerun after an interrupted run must not archive the same rows twice
+        archived_ids = set()
+        for existing in glob.glob(os.path.join(self.archive_dir, f"articles_{month:%Y_%m}_*.csv.gz")):
+            with gzip.open(existing, 'rt', encoding='utf-8', newline='') as f:
+                archived_ids.update(int(row['id']) for row in csv.DictReader(f))
+        
+        if partitioned:
+            source, where, params = f"articles PARTITION (p{month:%Y%m})", "", ()
+        else:
+            source, where, params = "articles", " WHERE date_created >= %s AND date_created < %s", (month, next_month)
+        
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM {source}{where} ORDER BY id", params)
+        written = 0
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(ARCHIVE_COLUMNS)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                rows = [row for row in rows if row[0] not in archived_ids]
+                writer.writerows(rows)
+                written += len(rows)
+        cursor.close()
+        
+        if not written:
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+            
+            cursor = connection.cursor()
+            key_query = (f"{self.storage.insert_ignore} INTO archived_article_keys (key_hash, archive_month) "
+                         "VALUES (%s, %s)")
+            read, keys = 0, []
+            with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    keys.append((self.archive_key('heading', row['article_heading']), label))
+                    keys.append((self.archive_key('link', row['article_link']), label))
+                    read += 1
+                    if len(keys) >= 2000:
+                        cursor.executemany(key_query, keys)
+                        keys = []
+            if keys:
+                cursor.executemany(key_query, keys)
+            if read != written:
+                connection.rollback()
+                raise OSError(f"Archive {path} holds {read} rows, expected {written}")
+            connection.commit()
+            cursor.close()
+        
+        cursor = connection.cursor()
+        if partitioned:
+            cursor.execute(f"ALTER TABLE articles DROP PARTITION p{month:%Y%m}")
+            removed = "partition dropped"
+        else:
+            deleted = 0
+            while True:
+                cursor.execute(RETENTION_MONTH_IDS, (month, next_month, self.retention_delete_chunk))
+                ids = [row[0] for row in cursor.fetchall()]
+                if ids:
+                    cursor.execute(f"DELETE FROM articles WHERE id IN ({','.join(['%s'] * len(ids))})", ids)
+                    connection.commit()
+                    deleted += len(ids)
+                if len(ids) < self.retention_delete_chunk:
+                    break
+            removed = f"{deleted} rows deleted"
+        
+        # stat_date is DATE(date_created), so the month's groups line up exactly with the removed rows
+        cursor.execute("DELETE FROM article_stats WHERE stat_date < %s", (next_month.date(),))
+        connection.commit()
+        cursor.close()
+        
+        logging.info(f"Archived {written} articles from {label} to {path} ({removed})" if written
+                     else f"No new articles to archive for {label} ({removed})")
+        return written
+
+    def run_retention(self):
+        """Keep partitions ready ahead and archive every month older than retention_months.
+        
+        Returns the number of archived articles. Archived months stay visible to duplicate checks
+        (archived_article_keys) and to the analytics script (ARCHIVE_DIR).
+        """
+        self.ensure_partitions()
+        if not self.retention_months:
+            return 0
+        
+        cutoff = self.month_start(datetime.now(), -self.retention_months)
+        archived = 0
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            partitions = self.list_partitions(cursor)
+            if partitions is not None:
+                months = [month for month in partitions if month < cutoff]
+            else:
+                cursor.execute("SELECT date_created FROM articles WHERE date_created < %s "
+                               "ORDER BY date_created LIMIT 1", (cutoff,))
+                first = cursor.fetchone()
+                months = self.month_range(first[0], self.month_start(cutoff, -1)) if first else []
+            cursor.close()
+            
+            for month in months:
+                archived += self.archive_month(connection, month, partitioned=partitions is not None)
+            
+            if months:
+                logging.info(f"Retention: archived {archived} articles older than {cutoff:%Y-%m-%d} "
+                             f"from {len(months)} month(s)")
+            return archived
+        
+        except STORAGE_ERRORS + (OSError,) as e:
+            logging.error(f"Retention run failed after archiving {archived} articles: {e}")
+            return archived
+        finally:
+            if connection and connection.is_connected():
+                connection.close()
+
+    def claim_unsent_batch(self, stale_after_minutes=60):
+        """Stamp a new batch id on all unsent, unclaimed articles in one statement.
+        
+        Rows of a batch that never started sending are reclaimed after stale_after_minutes;
+        batches that reached 'sending' or 'delivered' are never reclaimed (see DIGEST_BATCHES_DDL).
+        Returns (batch_id, claimed_count), batch_id is None when nothing was claimed.
+        """
+        batch_id = str(uuid.uuid4())
+        utc_now = self.storage.utc_now_sql
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            start = time.perf_counter()
+            cursor.execute(f"INSERT INTO digest_batches (batch_id, state, claimed_at, updated_at) "
+                           f"VALUES (%s, 'claimed', {utc_now}, {utc_now})", (batch_id,))
+            cursor.execute(CLAIM_BATCH_UPDATE.format(utc_now=utc_now, stale_before=self.storage.utc_minutes_ago_sql),
+                           (batch_id, stale_after_minutes))
+            claimed_count = cursor.rowcount
+            if claimed_count:
+                # Stale batches that were still only claimed have just lost their rows for good
+                cursor.execute(f"UPDATE digest_batches SET state = 'released', updated_at = {utc_now} "
+                               f"WHERE state = 'claimed' AND batch_id <> %s "
+                               f"AND claimed_at < {self.storage.utc_minutes_ago_sql}",
+                               (batch_id, stale_after_minutes))
+            else:
+                cursor.execute("DELETE FROM digest_batches WHERE batch_id = %s", (batch_id,))
+            connection.commit()
+            
+            logging.info(f"Claimed {claimed_count} articles into batch {batch_id} "
+                         f"in {time.perf_counter() - start:.2f}s")
+            return (batch_id if claimed_count else None), claimed_count
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error claiming unsent batch: {e}")
+            return None, 0
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def mark_batch_sent(self, batch_id, max_retries=3):
+        """Mark every article in a batch as sent; safe to retry because only unsent rows are touched"""
+        for attempt in range(1, max_retries + 1):
+            connection = None
+            try:
+                connection = self.storage.connect()
+                cursor = connection.cursor()
+                
+                start = time.perf_counter()
+                self.move_sent_stats(cursor, "send_batch_id = %s", [batch_id], True)
+                cursor.execute(
+                    "UPDATE articles SET is_sent = TRUE WHERE send_batch_id = %s AND is_sent = FALSE",
+                    (batch_id,)
+                )
+                marked_count = cursor.rowcount
+                cursor.execute(f"UPDATE digest_batches SET state = 'sent', updated_at = {self.storage.utc_now_sql} "
+                               f"WHERE batch_id = %s", (batch_id,))
+                connection.commit()
+                
+                logging.info(f"Marked {marked_count} articles in batch {batch_id} as sent "
+                             f"in {time.perf_counter() - start:.2f}s")
+                return True
+                
+            except STORAGE_ERRORS as e:
+                logging.error(f"Error marking batch {batch_id} as sent (attempt {attempt}/{max_retries}): {e}")
+                if attempt < max_retries:
+                    time.sleep(2 ** attempt)
+            finally:
+                if connection and connection.is_connected():
+                    cursor.close()
+                    connection.close()
+        
+        return False
+
+    def release_batch(self, batch_id):
+        """Release a batch's unsent articles so the next digest can claim them"""
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            
+            cursor.execute(
+                "UPDATE articles SET send_batch_id = NULL, send_batch_claimed_at = NULL "
+                "WHERE send_batch_id = %s AND is_sent = FALSE",
+                (batch_id,)
+            )
+            released_count = cursor.rowcount
+            cursor.execute(f"UPDATE digest_batches SET state = 'released', updated_at = {self.storage.utc_now_sql} "
+                           f"WHERE batch_id = %s AND state <> 'sent'", (batch_id,))
+            connection.commit()
+            logging.info(f"Released {released_count} unsent articles from batch {batch_id}")
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error releasing batch {batch_id}: {e}")
         finally:
             if connection and connection.is_connected():
                 cursor.close()
                 connection.close()
 
-    def get_unsent_articles(self):
-        """Get all articles with is_sent = FALSE"""
+    def set_batch_state(self, batch_id, state):
+        """Record a digest batch's delivery state; False when it could not be stored"""
         connection = None
         try:
-            connection = mysql.connector.connect(**self.mysql_config)
-            cursor = connection.cursor(dictionary=True)
-            
-            query = """
-            SELECT id, article_heading, article_link, keyword, source, published_date, is_sent, date_created, date_updated
-            FROM articles 
-            WHERE is_sent = FALSE
-            ORDER BY published_date DESC, date_created DESC
-            """
-            
-            cursor.execute(query)
-            articles = cursor.fetchall()
-            
-            logging.info(f"Found {len(articles)} unsent articles")
-            return articles
-            
-        except Error as e:
-            logging.error(f"Error fetching unsent articles: {e}")
-            return []
+            connection = self.storage.connect()
+            cursor = connection.cursor()
+            cursor.execute(f"UPDATE digest_batches SET state = %s, updated_at = {self.storage.utc_now_sql} "
+                           f"WHERE batch_id = %s", (state, batch_id))
+            connection.commit()
+            return True
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error recording batch {batch_id} as {state}: {e}")
+            return False
         finally:
             if connection and connection.is_connected():
                 cursor.close()
                 connection.close()
 
-    def update_sent_status(self, article_ids, status=True):
-        """Update is_sent status for given article IDs"""
-        if not article_ids:
-            return
-        
+    def batches_in_state(self, state):
+        """[(batch_id, claimed_at, unsent article count)] of the digest batches in a state"""
         connection = None
         try:
-            connection = mysql.connector.connect(**self.mysql_config)
+            connection = self.storage.connect()
             cursor = connection.cursor()
-            
-            placeholders = ','.join(['%s'] * len(article_ids))
-            query = f"UPDATE articles SET is_sent = %s WHERE id IN ({placeholders})"
-            
-            cursor.execute(query, [status] + article_ids)
-            connection.commit()
-            
-            logging.info(f"Updated is_sent status to {status} for {len(article_ids)} articles")
-            
-        except Error as e:
-            logging.error(f"Error updating is_sent status: {e}")
+            cursor.execute("""
+                SELECT b.batch_id, b.claimed_at, COUNT(a.id)
+                FROM digest_batches b
+                LEFT JOIN articles a ON a.send_batch_id = b.batch_id AND a.is_sent = FALSE
+                WHERE b.state = %s
+                GROUP BY b.batch_id, b.claimed_at
+                ORDER BY b.claimed_at
+            """, (state,))
+            return cursor.fetchall()
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error listing {state} batches: {e}")
+            return []
         finally:
             if connection and connection.is_connected():
                 cursor.close()
                 connection.close()
 
+    def finish_delivered_batches(self):
+        """Mark batches that were delivered but never marked sent (e.g. the database failed after SMTP)"""
+        for batch_id, claimed_at, unsent_count in self.batches_in_state('delivered'):
+            logging.warning(f"Batch {batch_id} (claimed {claimed_at}) was delivered but not marked sent, "
+                            f"marking its {unsent_count} articles now")
+            self.mark_batch_sent(batch_id, max_retries=1)
+        
+        stuck = self.batches_in_state('sending')
+        if stuck:
+            logging.warning(f"{len(stuck)} digest batch(es) stopped while sending and hold "
+                            f"{sum(count for _, _, count in stuck)} articles; resolve them with manual operation 11")
+
+    def send_batch(self, email_label):
+        """Claim, send and mark one digest batch; returns the number of articles sent"""
+        self.finish_delivered_batches()
+        batch_id, claimed_count = self.claim_unsent_batch()
+        if not batch_id:
+            return 0
+        
+        # From here on the digest may reach recipients, so the batch is never reclaimed automatically
+        if not self.set_batch_state(batch_id, 'sending'):
+            self.release_batch(batch_id)
+            return 0
+        
+        start = time.perf_counter()
+        if self.subscriptions:
+            sent = self.send_subscriber_digests(batch_id, email_label)
+        else:
+            sent = self.send_email(self.iter_unsent_articles(batch_id=batch_id), email_label,
+                                   article_count=claimed_count)
+        if not sent:
+            self.release_batch(batch_id)
+            return 0
+        logging.info(f"Sent batch {batch_id} in {time.perf_counter() - start:.2f}s")
+        
+        self.set_batch_state(batch_id, 'delivered')
+        if not self.mark_batch_sent(batch_id):
+            logging.error(f"Batch {batch_id} was emailed but could not be marked as sent; "
+                          f"the next digest run marks it before claiming new articles.")
+        return claimed_count
+
+    def render_digest_row(self, index, article):
+        """Render one digest table row, escaping all article fields"""
+        published_date = article.get('published_date')
+        return DIGEST_ROW_TEMPLATE.format(
+            row_class=' class="alt"' if index % 2 == 0 else '',
+            index=index,
+            heading=escape(article['article_heading'] or ''),
+            source=escape(article['source'] or ''),
+            keyword=escape(article['keyword'] or ''),
+            date=published_date.strftime('%Y-%m-%d %H:%M') if published_date else 'N/A',
+            link=escape(article['article_link'] or '', quote=True)
+        )
+
+    def iter_html_table(self, articles, start_index=1):
+        """Yield the digest table as HTML chunks, one per article, escaping all article fields"""
+        rendered_any = False
+        
+        for i, article in enumerate(articles, start_index):
+            if not rendered_any:
+                rendered_any = True
+                yield DIGEST_TABLE_HEAD
+            yield self.render_digest_row(i, article)
+        
+        if rendered_any:
+            yield DIGEST_TABLE_TAIL
+        else:
+            yield "<p>No articles found.</p>"
+
     def create_html_table(self, articles):
         """Create HTML table for email"""
-        if not articles:
-            return "<p>No articles found.</p>"
-        
-        html = """
-        <table style="border-collapse: collapse; width: 100%; font-family: Arial, sans-serif;">
-            <thead>
-                <tr style="background-color: #f2f2f2;">
-                    <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">#</th>
-                    <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Article Heading</th>
-                    <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Source</th>
-                    <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Keyword</th>
-                    <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Published Date</th>
-                    <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Link</th>
-                </tr>
-            </thead>
-            <tbody>
+        return ''.join(self.iter_html_table(articles))
+
+    def iter_digest_html(self, articles, email_type, article_count, note=None):
+        """Yield the complete digest email body as HTML chunks"""
+        yield from self.iter_digest_page(self.iter_html_table(articles), email_type, article_count, note)
+
+    def iter_digest_page(self, table_chunks, email_type, article_count, note=None):
+        """Wrap pre-rendered table chunks in the digest email page"""
+        yield (
+            f"<html><head><style>{DIGEST_CSS}</style></head><body>\n"
+            f"<h2>News Articles Report ({escape(email_type)})</h2>\n"
+            f"<p>Total articles: <strong>{article_count}</strong></p>\n"
+            f"<p>Generated on: <strong>{datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S IST')}</strong></p>\n"
+        )
+        if note:
+            yield f"<p>{escape(note)}</p>\n"
+        if self.digest_signals:
+            yield "<p><strong>Coverage spikes:</strong></p>\n<ul>\n"
+            yield ''.join(f"<li>{escape(signal)}</li>\n" for signal in self.digest_signals)
+            yield "</ul>\n"
+        yield "<br>\n"
+        yield from table_chunks
+        yield (
+            '<br>\n<p class="footer">This is an automated email from the News Fetcher system.</p>\n'
+            '</body></html>'
+        )
+
+    def benchmark_digest_render(self, rows=10000):
+        """Time rendering a synthetic digest of the given size; returns (seconds, bytes)"""
+        now = datetime.now()
+        articles = [
+            {
+                'article_heading': f"GST Council <update> {i} on input tax credit & refunds",
+                'article_link': f"https://example.com/news/{i}?a=1&b=2",
+                'keyword': 'GST',
+                'source': 'NewsAPI - Economic Times',
+                'published_date': now - timedelta(minutes=i)
+            }
+            for i in range(rows)
+        ]
+        
+        start = time.perf_counter()
+        body = ''.join(self.iter_digest_html(articles, "Benchmark", rows))
+        elapsed = time.perf_counter() - start
+        
+        size = len(body.encode('utf-8'))
+        logging.info(f"Rendered {rows} digest rows in {elapsed * 1000:.1f} ms ({size / 1024:.0f} KiB)")
+        return elapsed, size
+
+    def get_email_recipients(self):
+        """Return (primary recipient, list of CC recipients) from the email configuration"""
+        cc_emails = []
+        if 'cc_email' in self.email_config and self.email_config['cc_email']:
+            cc_email = self.email_config['cc_email']
+            if isinstance(cc_email, str):
+                cc_emails = [cc_email.strip()]
+            elif isinstance(cc_email, list):
+                cc_emails = [email.strip() for email in cc_email if email.strip()]
+        return self.email_config['recipient_email'], cc_emails
+
+    def build_email_message(self, subject, html_content, attachment=None, recipients=None):
+        """Build a digest MIME message.
+        
+        attachment is an optional (filename, bytes) pair and recipients an optional
+        (to, cc_list) pair that defaults to the configured recipient and CC list.
+        """
+        recipient, cc_emails = recipients or self.get_email_recipients()
+        
+        msg = MIMEMultipart('mixed' if attachment else 'alternative')
+        msg['From'] = self.email_config['sender_email']
+        msg['To'] = recipient
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+        msg['Subject'] = subject
+        
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        if attachment:
+            filename, payload = attachment
+            part = MIMEApplication(payload, Name=filename)
+            part['Content-Disposition'] = f'attachment; filename="{filename}"'
+            msg.attach(part)
+        
+        return msg
+
+    def deliver_messages(self, messages, marks=None):
+        """Queue MIME messages and deliver them over the mail queue's shared SMTP session.
+        
+        With a spool directory configured, messages that cannot be delivered right away
+        stay spooled and are retried by the scheduler, so they count as handed off.
+        Envelope recipients are taken from each message's To and Cc headers, and marks are
+        passed to MailQueue.enqueue. Returns the (sent, deferred, failed) counts of the flush.
+        """
+        for msg in messages:
+            recipients = [address.strip() for header in ('To', 'Cc') if msg[header]
+                          for address in msg[header].split(',') if address.strip()]
+            self.mail_queue.enqueue(msg, recipients, marks)
+            logging.info(f"Queued '{msg['Subject']}' for {', '.join(recipients)} "
+                         f"({len(msg.as_bytes()) / 1024:.0f} KiB)")
+        
+        sent, deferred, failed = self.mail_queue.flush()
+        if deferred or failed:
+            logging.warning(f"{deferred} message(s) deferred and {failed} failed, see {self.mail_queue.spool_dir}")
+        return sent, deferred, failed
+
+    def rank_inline_articles(self, candidates, limit):
+        """Pick up to limit articles round-robin across keywords, busiest keyword first"""
+        queues = sorted(candidates.values(), key=len, reverse=True)
+        inline = []
+        depth = 0
+        while len(inline) < limit and any(depth < len(queue) for queue in queues):
+            for queue in queues:
+                if depth < len(queue) and len(inline) < limit:
+                    inline.append(queue[depth])
+            depth += 1
+        
+        inline.sort(key=lambda a: (a.get('published_date') or a.get('date_created') or datetime.min), reverse=True)
+        return inline
+
+    def write_digest_attachment(self, articles, label):
+        """Write articles to a compressed CSV (or Parquet) attachment, returns (filename, bytes, row_count)"""
+        columns = ['id', 'article_heading', 'article_link', 'keyword', 'source', 'published_date', 'date_created']
+        stamp = datetime.now(self.timezone).strftime('%Y%m%d_%H%M')
+        slug = re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+        
+        if self.digest_attachment_format == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                logging.warning(f"Parquet attachment unavailable ({e}), falling back to CSV")
+            else:
+                timestamp = pa.timestamp('us')
+                schema = pa.schema([
+                    ('id', pa.int64()), ('article_heading', pa.string()), ('article_link', pa.string()),
+                    ('keyword', pa.string()), ('source', pa.string()), ('published_date', timestamp),
+                    ('date_created', timestamp)
+                ])
+                buffer = io.BytesIO()
+                row_count = 0
+                articles = iter(articles)
+                # One row group per 10000 articles, so only that many rows are held at once
+                with pq.ParquetWriter(buffer, schema) as writer:
+                    while True:
+                        rows = list(itertools.islice(articles, 10000))
+                        if not rows:
+                            break
+                        writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                        row_count += len(rows)
+                return f"{slug}_{stamp}.parquet", buffer.getvalue(), row_count
+        
+        buffer = io.BytesIO()
+        row_count = 0
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
+            text = io.TextIOWrapper(gz, encoding='utf-8', newline='')
+            writer = csv.DictWriter(text, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            for article in articles:
+                writer.writerow(article)
+                row_count += 1
+            text.flush()
+            text.detach()
+        
+        return f"{slug}_{stamp}.csv.gz", buffer.getvalue(), row_count
+
+    def build_attachment_digest(self, articles, email_type, article_count, recipients=None):
+        """Inline the top-ranked articles per keyword and attach the remainder"""
+        candidates = defaultdict(list)
+        selection = {}
+        
+        def overflow():
+            # Articles arrive newest first; only the first digest_max_inline per keyword can rank inline
+            for article in articles:
+                keyword_candidates = candidates[article['keyword']]
+                if len(keyword_candidates) < self.digest_max_inline:
+                    keyword_candidates.append(article)
+                else:
+                    yield article
+            
+            inline = self.rank_inline_articles(candidates, self.digest_max_inline)
+            selection['inline'] = inline
+            inline_ids = {article['id'] for article in inline}
+            for keyword_candidates in candidates.values():
+                for article in keyword_candidates:
+                    if article['id'] not in inline_ids:
+                        yield article
+        
+        filename, payload, attached_count = self.write_digest_attachment(overflow(), email_type)
+        inline = selection.get('inline', [])
+        
+        note = (f"Showing the top {len(inline)} articles across keywords. "
+                f"The remaining {attached_count} are in the attached file {filename}.")
+        html_content = ''.join(self.iter_digest_html(inline, email_type, article_count, note))
+        subject = f"News Articles Report ({email_type}) - {article_count} Articles"
+        
+        logging.info(f"Digest attachment {filename}: {attached_count} articles, {len(payload) / 1024:.0f} KiB")
+        return [self.build_email_message(subject, html_content, (filename, payload), recipients)]
+
+    def build_split_digest(self, articles, email_type, article_count, recipients=None):
+        """Split the digest across several messages no larger than digest_max_bytes.
+        
+        Rows are packed by rendered size into what is left of the budget after the page
+        chrome; a part whose finished message still exceeds the cap is halved and rebuilt.
         """
+        # Chrome of the widest part label, so the measurement is an upper bound
+        chrome = ''.join(self.iter_digest_page([DIGEST_TABLE_HEAD, DIGEST_TABLE_TAIL],
+                                               f"{email_type} - Part 9999 of 9999", article_count))
+        # Leave headroom for MIME headers and transfer encoding (base64 grows the body by a third)
+        part_budget = max(int(self.digest_max_bytes * 0.7) - len(chrome.encode('utf-8')), 1)
+        parts = []
+        rows = []
+        rows_bytes = 0
         
         for i, article in enumerate(articles, 1):
-            published_date = article.get('published_date')
-            date_str = published_date.strftime('%Y-%m-%d %H:%M') if published_date else 'N/A'
-            
-            html += f"""
-                <tr style="{'background-color: #f9f9f9;' if i % 2 == 0 else ''}">
-                    <td style="border: 1px solid #ddd; padding: 8px;">{i}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{article['article_heading']}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{article['source']}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{article['keyword']}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">{date_str}</td>
-                    <td style="border: 1px solid #ddd; padding: 8px;">
-                        <a href="{article['article_link']}" target="_blank" style="color: #0066cc;">Read Article</a>
-                    </td>
-                </tr>
-            """
+            row = self.render_digest_row(i, article)
+            row_bytes = len(row.encode('utf-8'))
+            if rows and rows_bytes + row_bytes > part_budget:
+                parts.append(rows)
+                rows, rows_bytes = [], 0
+            rows.append(row)
+            rows_bytes += row_bytes
+        if rows:
+            parts.append(rows)
         
-        html += "</tbody></table>"
-        return html
+        while True:
+            messages = []
+            for part_number, part_rows in enumerate(parts, 1):
+                label = f"{email_type} - Part {part_number} of {len(parts)}"
+                table_chunks = itertools.chain([DIGEST_TABLE_HEAD], part_rows, [DIGEST_TABLE_TAIL])
+                html_content = ''.join(self.iter_digest_page(table_chunks, label, article_count))
+                subject = f"News Articles Report ({label}) - {article_count} Articles"
+                messages.append(self.build_email_message(subject, html_content, recipients=recipients))
+            
+            sizes = [len(msg.as_bytes()) for msg in messages]
+            oversized = [i for i, size in enumerate(sizes) if size > self.digest_max_bytes and len(parts[i]) > 1]
+            if not oversized:
+                break
+            for i in reversed(oversized):
+                half = len(parts[i]) // 2
+                parts[i:i + 1] = [parts[i][:half], parts[i][half:]]
+        
+        if any(size > self.digest_max_bytes for size in sizes):
+            logging.warning(f"A single digest row exceeds digest_max_bytes ({self.digest_max_bytes}), "
+                            f"largest part is {max(sizes)} bytes")
+        return messages
 
-    def send_email(self, articles, email_type="Regular"):
-        """Send email with articles in tabular format with CC support"""
-        if not articles:
+    def build_digest_messages(self, articles, email_type, article_count, recipients=None):
+        """Render a digest into one or more messages according to digest_mode"""
+        start = time.perf_counter()
+        if self.digest_mode == 'attach' and article_count > self.digest_max_inline:
+            messages = self.build_attachment_digest(articles, email_type, article_count, recipients)
+        elif self.digest_mode == 'split':
+            messages = self.build_split_digest(articles, email_type, article_count, recipients)
+        else:
+            subject = f"News Articles Report ({email_type}) - {article_count} Articles"
+            html_content = ''.join(self.iter_digest_html(articles, email_type, article_count))
+            messages = [self.build_email_message(subject, html_content, recipients=recipients)]
+        logging.info(f"Rendered digest of {article_count} articles into {len(messages)} message(s) "
+                     f"in {time.perf_counter() - start:.2f}s")
+        return messages
+
+    def load_subscriptions(self, path):
+        """Load subscriber keyword sets from a JSON file.
+        
+        Format: {"Legal": {"recipients": ["legal@example.com"], "keywords": ["Patent", "Trademark"]}}
+        A keyword of "*" subscribes to every article.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                subscriptions = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading subscriptions from {path}: {e}")
+            return False
+        
+        self.subscriptions = {
+            name: {
+                'recipients': [email.strip() for email in sub.get('recipients', []) if email.strip()],
+                'keywords': {keyword.lower() for keyword in sub.get('keywords', [])}
+            }
+            for name, sub in subscriptions.items()
+        }
+        logging.info(f"Loaded {len(self.subscriptions)} digest subscription(s) from {path}")
+        return True
+
+    def send_subscriber_digests(self, batch_id, email_type):
+        """Send each subscriber a digest of their keywords from a claimed digest batch.
+        
+        One grouped query counts the batch per keyword; each subscriber's digest (the union of
+        their keyword lists) is then streamed with a keyword-filtered keyset scan, so only a page
+        of articles is in memory at a time. Articles no subscriber matched go to the configured
+        recipient and CC list, including those of subscribers without recipients. All messages
+        are delivered over one SMTP session. Returns True only once a digest was handed off.
+        """
+        start = time.perf_counter()
+        keyword_counts = self.count_batch_keywords(batch_id)
+        if keyword_counts is None:
+            return False
+        subscribed_keywords = set().union(*(sub['keywords'] for sub in self.subscriptions.values()
+                                            if sub['recipients']))
+        wildcard = '*' in subscribed_keywords
+        
+        # (label, keywords, exclude_keywords, article_count, recipients); keywords None means every article
+        digests = []
+        for name, sub in self.subscriptions.items():
+            if not sub['recipients']:
+                continue
+            keywords = None if '*' in sub['keywords'] else sub['keywords'] & keyword_counts.keys()
+            article_count = sum(count for keyword, count in keyword_counts.items()
+                                if keywords is None or keyword in keywords)
+            if article_count:
+                digests.append((f"{email_type} - {name}", keywords, None, article_count,
+                                (sub['recipients'][0], sub['recipients'][1:])))
+        
+        if not wildcard:
+            unrouted_count = sum(count for keyword, count in keyword_counts.items()
+                                 if keyword not in subscribed_keywords)
+            if unrouted_count:
+                digests.append((email_type, None, subscribed_keywords, unrouted_count,
+                                self.get_email_recipients()))
+        
+        logging.info(f"Counted {sum(keyword_counts.values())} articles in {len(keyword_counts)} keyword(s) "
+                     f"for {len(digests)} digest(s) in {time.perf_counter() - start:.2f}s")
+        if not digests:
+            logging.info(f"Batch {batch_id} has no unsent articles, no subscriber digest sent")
+            return False
+        
+        try:
+            messages = []
+            for label, keywords, exclude_keywords, article_count, recipients in digests:
+                articles = self.iter_unsent_articles(batch_id=batch_id, keywords=keywords,
+                                                     exclude_keywords=exclude_keywords)
+                messages.extend(self.build_digest_messages(articles, label, article_count, recipients))
+            self.deliver_messages(messages)
+            return True
+        except Exception as e:
+            logging.error(f"Error sending subscriber digests: {e}")
+            return False
+
+    def send_email(self, articles, email_type="Regular", article_count=None):
+        """Send email with articles in tabular format with CC support.
+        
+        articles may be a list or any iterable (e.g. iter_unsent_articles) when article_count is given.
+        Digests larger than digest_max_inline articles are attached or split according to digest_mode.
+        """
+        if article_count is None:
+            articles = list(articles)
+            article_count = len(articles)
+        
+        if not article_count:
             logging.info("No articles to send via email")
             return False
         
         try:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.email_config['sender_email']
-            msg['To'] = self.email_config['recipient_email']
-            
-            cc_emails = []
-            if 'cc_email' in self.email_config and self.email_config['cc_email']:
-                cc_email = self.email_config['cc_email']
-                if isinstance(cc_email, str):
-                    cc_emails = [cc_email.strip()]
-                elif isinstance(cc_email, list):
-                    cc_emails = [email.strip() for email in cc_email if email.strip()]
-            
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-            
-            msg['Subject'] = f"News Articles Report ({email_type}) - {len(articles)} Articles"
-            
-            html_table = self.create_html_table(articles)
-            html_content = f"""
-            <html>
-                <head></head>
-                <body>
-                    <h2>News Articles Report ({email_type})</h2>
-                    <p>Total articles: <strong>{len(articles)}</strong></p>
-                    <p>Generated on: <strong>{datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S IST')}</strong></p>
-                    <br>
-                    {html_table}
-                    <br>
-                    <p style="font-size: 12px; color: #666;">
-                        This is an automated email from the News Fetcher system.
-                    </p>
-                </body>
-            </html>
-            """
-            
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
-            server.starttls()
-            server.login(self.email_config['sender_email'], self.email_config['sender_password'])
-            
-            recipients = [self.email_config['recipient_email']] + cc_emails
-            
-            text = msg.as_string()
-            server.sendmail(self.email_config['sender_email'], recipients, text)
-            server.quit()
-            
-            logging.info(f"Email sent successfully to {self.email_config['recipient_email']}")
-            if cc_emails:
-                logging.info(f"CC sent to: {', '.join(cc_emails)}")
+            self.deliver_messages(self.build_digest_messages(articles, email_type, article_count))
             return True
             
         except Exception as e:
@@ -547,24 +2341,49 @@ class NewsFetcher:
             logging.info(f"Skipping {email_type} email - not the right time or already sent today")
             return
         
-        unsent_articles = self.get_unsent_articles()
-        
-        if not unsent_articles:
-            logging.info(f"No unsent articles for {email_type} email")
-            return
-        
         email_label = "Morning Report" if email_type == "morning" else "Evening Report"
-        if self.send_email(unsent_articles, email_label):
-            article_ids = [article['id'] for article in unsent_articles]
-            self.update_sent_status(article_ids, True)
-            logging.info(f"Marked {len(article_ids)} articles as sent after {email_type} email")
+        self.digest_signals = self.load_trend_signals() if self.trend_signals_in_digest else []
+        try:
+            sent_count = self.send_batch(email_label)
+        finally:
+            self.digest_signals = []
+        
+        if sent_count:
+            logging.info(f"Sent {sent_count} articles in {email_type} email")
             
             if email_type == "morning":
                 self.last_morning_email = datetime.now(self.timezone)
             else:
                 self.last_evening_email = datetime.now(self.timezone)
+            self.save_state()
         else:
-            logging.error(f"Failed to send {email_type} email. Articles remain marked as unsent.")
+            logging.info(f"No {email_type} email sent. Any unsent articles remain marked as unsent.")
+
+    def load_trend_signals(self):
+        """Latest-day keyword/source spike signals from the analytics trend engine ([] when unavailable).
+        
+        The trends are built from a pushdown cube, so only grouped counts are read from the database.
+        """
+        try:
+            from Regulatory_watch_analytics import NewsDataAnalyzer
+        except ImportError as e:
+            logging.warning(f"Trend signals unavailable, analytics dependencies missing: {e}")
+            return []
+        
+        analyzer = NewsDataAnalyzer(self.mysql_config, pushdown=True, archive_dir=self.archive_dir,
+                                    storage=self.storage)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if not analyzer.connect_and_fetch_data():
+                    return []
+                analyzer.build_trends()
+            signals = analyzer.trend_signals()
+        except Exception as e:
+            logging.warning(f"Could not compute trend signals: {e}")
+            return []
+        
+        logging.info(f"Trend signals for the digest: {len(signals)}")
+        return signals
 
     def parse_article_date(self, date_string, source_name):
         """Parse article date from various formats"""
@@ -572,8 +2391,12 @@ class NewsFetcher:
             return None
         
         try:
-            date_string = re.sub(r'[^\w\s:,-/]', '', str(date_string))
-            parsed_date = parser.parse(date_string)
+            try:
+                # ISO 8601 / W3C dates (sitemaps, NewsAPI) keep their offset, e.g. +05:30
+                parsed_date = parser.isoparse(str(date_string).strip())
+            except ValueError:
+                date_string = re.sub(r'[^\w\s:,./+-]', '', str(date_string))
+                parsed_date = parser.parse(date_string)
             
             if parsed_date.tzinfo is None:
                 parsed_date = self.timezone.localize(parsed_date)
@@ -597,6 +2420,68 @@ class NewsFetcher:
             'Cache-Control': 'max-age=0'
         }
 
+    def iter_bounded_content(self, response, max_bytes, label, chunk_size=16384):
+        """Yield decoded response chunks, aborting once max_bytes or the compression ratio cap is exceeded"""
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            response.close()
+            raise DownloadTooLargeError(f"{label}: Content-Length {content_length} exceeds cap of {max_bytes} bytes")
+        
+        if response.headers.get('Content-Encoding', '').lower() == 'gzip' and hasattr(response.raw, 'stream'):
+            chunks = self.iter_gunzipped(response.raw, chunk_size)
+        else:
+            chunks = ((chunk, response.raw.tell() if hasattr(response.raw, 'tell') else 0)
+                      for chunk in response.iter_content(chunk_size=chunk_size))
+        
+        bytes_read = 0
+        for chunk, wire_bytes in chunks:
+            # Both counters are checked before any chunk is handed on: decoded and wire bytes
+            # against the cap, and their ratio from the first full chunk on (decompression bombs)
+            bytes_read += len(chunk)
+            if bytes_read > max_bytes or wire_bytes > max_bytes:
+                response.close()
+                raise DownloadTooLargeError(f"{label}: aborted after {bytes_read} bytes (cap {max_bytes})")
+            
+            if wire_bytes and bytes_read >= chunk_size and bytes_read / wire_bytes > self.max_compression_ratio:
+                response.close()
+                raise DownloadTooLargeError(
+                    f"{label}: compression ratio {bytes_read / wire_bytes:.0f}x exceeds {self.max_compression_ratio}x"
+                )
+            
+            yield chunk
+        
+        logging.info(f"{label}: read {bytes_read} bytes (cap {max_bytes})")
+
+    def iter_gunzipped(self, raw, chunk_size):
+        """Inflate a gzip body in chunk_size pieces, yielding (decoded chunk, compressed bytes consumed).
+        
+        urllib3 reads compressed data ahead of what it has decoded, so raw.tell() overstates the
+        wire bytes behind a chunk; inflating here keeps both counters exact for the ratio check.
+        """
+        inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        consumed = 0
+        for data in raw.stream(chunk_size, decode_content=False):
+            while data:
+                try:
+                    chunk = inflater.decompress(data, chunk_size)
+                except zlib.error as e:
+                    raise requests.exceptions.ContentDecodingError(f"Invalid gzip body: {e}")
+                consumed += len(data) - len(inflater.unconsumed_tail)
+                data = inflater.unconsumed_tail
+                if chunk:
+                    yield chunk, consumed
+        tail = inflater.flush()
+        if tail:
+            yield tail, consumed
+
+    def download_bounded(self, session, url, label, max_bytes=None, timeout=15):
+        """Stream a URL into memory with a hard byte cap and return the body"""
+        max_bytes = max_bytes or self.max_download_bytes
+        with session.get(url, timeout=self.budget_timeout(timeout), stream=True) as response:
+            response.raise_for_status()
+            logging.info(f"Response status: {response.status_code} for {label}")
+            return b''.join(self.iter_bounded_content(response, max_bytes, label))
+
     def clean_title(self, title):
         """Clean article title"""
         if not title:
@@ -699,21 +2584,7 @@ class NewsFetcher:
                         continue
                     
                     # Check against all keywords
-                    all_keywords = self.keywords + self.limited_keywords
-                    matching_keyword = None
-                    
-                    for keyword in all_keywords:
-                        pattern = r"\b" + re.escape(keyword) + r"\b"
-                        if re.search(pattern, title, re.IGNORECASE):
-                            if keyword in self.limited_keywords:
-                                if not self.can_use_limited_keyword(keyword):
-                                    logging.info(f"Skipping article for limited keyword '{keyword}' - already used")
-                                    continue
-                                else:
-                                    self.use_limited_keyword(keyword)
-                            
-                            matching_keyword = keyword
-                            break
+                    matching_keyword = self.match_keyword(title)
                     
                     if matching_keyword:
                         published_date = None
@@ -749,12 +2620,9 @@ class NewsFetcher:
             session.headers.update(headers)
             
             logging.info(f"Fetching {source_name} from {url}")
-            response = session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            logging.info(f"Response status: {response.status_code}, Content length: {len(response.content)} bytes")
+            content = self.download_bounded(session, url, source_name, source_config.get('max_bytes'))
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             
             # Try primary extraction method
             articles = self.extract_articles_with_selectors(soup, source_config, source_name, url)
@@ -862,20 +2730,7 @@ class NewsFetcher:
                             continue
                         
                         # Check keywords
-                        all_keywords = self.keywords + self.limited_keywords
-                        matching_keyword = None
-                        
-                        for keyword in all_keywords:
-                            pattern = r"\b" + re.escape(keyword) + r"\b"
-                            if re.search(pattern, title, re.IGNORECASE):
-                                if keyword in self.limited_keywords:
-                                    if not self.can_use_limited_keyword(keyword):
-                                        continue
-                                    else:
-                                        self.use_limited_keyword(keyword)
-                                
-                                matching_keyword = keyword
-                                break
+                        matching_keyword = self.match_keyword(title)
                         
                         if matching_keyword:
                             article_data = {
@@ -924,11 +2779,11 @@ class NewsFetcher:
         articles = []
         
         try:
-            headers = self.get_random_headers()
-            response = requests.get(rss_url, headers=headers, timeout=10)
-            response.raise_for_status()
+            session = requests.Session()
+            session.headers.update(self.get_random_headers())
+            content = self.download_bounded(session, rss_url, f"{source_name} RSS", timeout=10)
             
-            soup = BeautifulSoup(response.content, 'xml')
+            soup = BeautifulSoup(content, 'xml')
             items = soup.find_all('item')[:10]
             
             for item in items:
@@ -940,20 +2795,7 @@ class NewsFetcher:
                     title = self.clean_title(title_elem.get_text())
                     url = link_elem.get_text().strip()
                     
-                    all_keywords = self.keywords + self.limited_keywords
-                    matching_keyword = None
-                    
-                    for keyword in all_keywords:
-                        pattern = r"\b" + re.escape(keyword) + r"\b"
-                        if re.search(pattern, title, re.IGNORECASE):
-                            if keyword in self.limited_keywords:
-                                if not self.can_use_limited_keyword(keyword):
-                                    continue
-                                else:
-                                    self.use_limited_keyword(keyword)
-                            
-                            matching_keyword = keyword
-                            break
+                    matching_keyword = self.match_keyword(title)
                     
                     if matching_keyword:
                         published_date = None
@@ -973,12 +2815,114 @@ class NewsFetcher:
         
         return articles
 
+    def parse_news_sitemap(self, sitemap_url, source_name, since=None, max_bytes=None):
+        """Stream and incrementally parse a Google News sitemap, stopping at entries older than since"""
+        articles = []
+        newest = since
+        sitemap_ns = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+        news_ns = '{http://www.google.com/schemas/sitemap-news/0.9}'
+        
+        try:
+            headers = self.get_random_headers()
+            with requests.get(sitemap_url, headers=headers, timeout=self.budget_timeout(15), stream=True) as response:
+                response.raise_for_status()
+                
+                pull_parser = ET.XMLPullParser(events=('end',))
+                entries_read = 0
+                reached_seen = False
+                
+                chunks = self.iter_bounded_content(
+                    response, max_bytes or self.max_download_bytes, f"{source_name} sitemap"
+                )
+                for chunk in chunks:
+                    pull_parser.feed(chunk)
+                    
+                    for _, elem in pull_parser.read_events():
+                        if elem.tag != f'{sitemap_ns}url':
+                            continue
+                        
+                        entries_read += 1
+                        url = (elem.findtext(f'{sitemap_ns}loc') or '').strip()
+                        title = self.clean_title(elem.findtext(f'{news_ns}news/{news_ns}title') or '')
+                        published_date = self.parse_article_date(
+                            elem.findtext(f'{news_ns}news/{news_ns}publication_date'),
+                            source_name
+                        )
+                        elem.clear()
+                        
+                        # News sitemaps list newest first, so everything after this is already seen
+                        if since and published_date and published_date <= since:
+                            reached_seen = True
+                            break
+                        
+                        if published_date and (newest is None or published_date > newest):
+                            newest = published_date
+                        
+                        if not title or not url.startswith('http'):
+                            continue
+                        
+                        matching_keyword = self.match_keyword(title)
+                        if matching_keyword:
+                            articles.append({
+                                'title': title,
+                                'url': url,
+                                'keyword': matching_keyword,
+                                'source': f"{source_name} (Sitemap)",
+                                'published_date': published_date
+                            })
+                    
+                    if reached_seen:
+                        chunks.close()
+                        break
+                
+                logging.info(f"Sitemap {source_name}: read {entries_read} entries, "
+                             f"{len(articles)} keyword matches{' (stopped at last seen entry)' if reached_seen else ''}")
+        
+        except (requests.RequestException, ET.ParseError) as e:
+            logging.warning(f"Error parsing news sitemap {sitemap_url}: {e}")
+            return articles, since
+        
+        return articles, newest
+
+    def fetch_sitemap_sources(self):
+        """Fetch articles from custom sources that publish a news sitemap"""
+        all_articles = []
+        
+        for source_name, source_config in self.custom_sources.items():
+            sitemap_url = source_config.get('news_sitemap')
+            if not sitemap_url:
+                continue
+            
+            if f"sitemap:{source_name}" in self.cycle_done:
+                continue
+            
+            if self.budget_exhausted(f"Sitemap '{source_name}'"):
+                continue
+            
+            logging.info(f"Reading news sitemap for {source_name}...")
+            since = self.sitemap_last_seen.get(source_name)
+            articles, newest = self.parse_news_sitemap(
+                sitemap_url, source_name, since, source_config.get('max_bytes')
+            )
+            if newest:
+                self.sitemap_last_seen[source_name] = newest
+            all_articles.extend(articles)
+            self.checkpoint_cycle(f"sitemap:{source_name}", articles)
+        
+        return all_articles
+
     def fetch_newsapi_articles(self):
         """Fetch articles from NewsAPI with automatic API key rotation and rate limit handling"""
         articles = []
         all_keywords = self.keywords + self.limited_keywords
         
         for keyword in all_keywords:
+            if f"newsapi:{keyword}" in self.cycle_done:
+                continue
+            
+            if self.budget_exhausted(f"NewsAPI keyword '{keyword}'"):
+                continue
+            
             if keyword in self.limited_keywords and not self.can_use_limited_keyword(keyword):
                 logging.info(f"Skipping NewsAPI search for limited keyword '{keyword}' - already used")
                 continue
@@ -993,19 +2937,22 @@ class NewsFetcher:
                 'apiKey': self.get_current_api_key()
             }
             
+            keyword_start = len(articles)
             max_retries = len(self.newsapi_keys)
             retry_count = 0
             success = False
             
-            while retry_count < max_retries and not success:
+            # A keyword whose retries are cut short by the budget is reported as skipped
+            while (retry_count < max_retries and not success
+                   and not self.budget_exhausted(f"NewsAPI keyword '{keyword}'")):
                 try:
-                    response = requests.get(url, params=params, timeout=10)
+                    response = requests.get(url, params=params, timeout=self.budget_timeout(10))
                     
                     if response.status_code == 429:
                         logging.warning(f"Rate limit hit for keyword '{keyword}' with API key {self.get_current_api_key()[:8]}***")
                         params['apiKey'] = self.handle_api_key_failure(self.get_current_api_key(), 429)
                         retry_count += 1
-                        time.sleep(2)
+                        self.budget_sleep(2)
                         continue
                     
                     response.raise_for_status()
@@ -1052,7 +2999,7 @@ class NewsFetcher:
                     if hasattr(e.response, 'status_code') and e.response.status_code == 429:
                         params['apiKey'] = self.handle_api_key_failure(self.get_current_api_key(), 429)
                         retry_count += 1
-                        time.sleep(2)
+                        self.budget_sleep(2)
                     else:
                         break
                 except Exception as e:
@@ -1062,7 +3009,10 @@ class NewsFetcher:
             if not success and retry_count >= max_retries:
                 logging.error(f"Failed to fetch articles for keyword '{keyword}' after trying all API keys")
             
-            time.sleep(1.5)
+            if success:
+                self.checkpoint_cycle(f"newsapi:{keyword}", articles[keyword_start:])
+            
+            self.budget_sleep(1.5)
         
         return articles
 
@@ -1071,26 +3021,49 @@ class NewsFetcher:
         all_articles = []
         
         for source_name, source_config in self.custom_sources.items():
+            if f"scrape:{source_name}" in self.cycle_done:
+                continue
+            
+            if self.budget_exhausted(f"Scraping '{source_name}'"):
+                continue
+            
             logging.info(f"Scraping {source_name}...")
             articles = self.scrape_website_enhanced(source_name, source_config)
             all_articles.extend(articles)
-            time.sleep(random.uniform(2, 5))
+            self.checkpoint_cycle(f"scrape:{source_name}", articles)
+            self.budget_sleep(random.uniform(2, 5))
         
         return all_articles
 
     def fetch_all_news(self):
         """Fetch news from both NewsAPI and custom sources with enhanced duplicate tracking"""
         logging.info("Starting news fetch process...")
-        self.reset_limited_keyword_usage()
+        if self.has_unfinished_cycle():
+            logging.info(f"Resuming cycle started at {self.cycle_started:%Y-%m-%d %H:%M:%S} "
+                         f"({len(self.cycle_done)} steps done, {len(self.cycle_articles)} articles carried over)")
+        else:
+            self.reset_limited_keyword_usage()
+            self.cycle_started = datetime.now()
+            self.cycle_done = set()
+            self.cycle_articles = []
+            self.save_state()
+        resumed_articles = list(self.cycle_articles)
+        self.start_run_budget()
+        if self.run_deadline is not None:
+            logging.info(f"Fetch time budget: {self.fetch_time_budget / 60:.0f} minutes")
         
         logging.info("Fetching news from NewsAPI...")
         newsapi_articles = self.fetch_newsapi_articles()
         
+        logging.info("Fetching news from news sitemaps...")
+        sitemap_articles = self.fetch_sitemap_sources()
+        
         logging.info("Fetching news from custom sources...")
         custom_articles = self.fetch_custom_sources()
         
-        all_articles = newsapi_articles + custom_articles
-        logging.info(f"Total articles scraped: {len(all_articles)} (NewsAPI: {len(newsapi_articles)}, Custom: {len(custom_articles)})")
+        all_articles = resumed_articles + newsapi_articles + sitemap_articles + custom_articles
+        logging.info(f"Total articles scraped: {len(all_articles)} (NewsAPI: {len(newsapi_articles)}, "
+                     f"Sitemap: {len(sitemap_articles)}, Custom: {len(custom_articles)})")
         
         # Remove duplicates based on normalized headings within this scraping run
         seen_headings = {}
@@ -1135,6 +3108,12 @@ class NewsFetcher:
             for keyword, count in self.limited_keyword_usage.items():
                 logging.info(f"  {keyword}: {count}/1")
         
+        # Report work dropped because the cycle ran out of time
+        if self.budget_skipped:
+            logging.warning(f"Time budget exhausted - skipped {len(self.budget_skipped)} item(s):")
+            for item in self.budget_skipped:
+                logging.warning(f"  {item}")
+        
         # Save to database (will check for duplicate headings in database)
         if unique_articles:
             logging.info(f"Saving {len(unique_articles)} unique articles to database...")
@@ -1142,6 +3121,11 @@ class NewsFetcher:
         else:
             logging.warning("No unique articles found to save!")
         
+        self.last_fetch_completed = datetime.now()
+        self.cycle_done = set()
+        self.cycle_articles = []
+        self.save_state()
+        
         logging.info(f"Fetch completed. Processed {len(unique_articles)} unique articles")
         return unique_articles
 
@@ -1149,33 +3133,34 @@ class NewsFetcher:
         """Get database statistics"""
         connection = None
         try:
-            connection = mysql.connector.connect(**self.mysql_config)
+            connection = self.storage.connect()
             cursor = connection.cursor()
             
-            cursor.execute("SELECT COUNT(*) FROM articles")
-            total_articles = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM articles WHERE is_sent = TRUE")
-            sent_articles = cursor.fetchone()[0]
+            # All figures come from the precomputed article_stats groups, not the articles rows
+            cursor.execute(STATS_BY_SENT)
+            by_status = {bool(sent): int(count) for sent, count in cursor.fetchall()}
+            sent_articles = by_status.get(True, 0)
+            unsent_articles = by_status.get(False, 0)
             
-            cursor.execute("SELECT COUNT(*) FROM articles WHERE is_sent = FALSE")
-            unsent_articles = cursor.fetchone()[0]
+            cursor.execute(STATS_BY_KEYWORD)
+            keyword_stats = [(keyword, int(count)) for keyword, count in cursor.fetchall()]
             
-            cursor.execute("SELECT keyword, COUNT(*) FROM articles GROUP BY keyword")
-            keyword_stats = cursor.fetchall()
+            cursor.execute(STATS_BY_SOURCE)
+            source_stats = [(source, int(count)) for source, count in cursor.fetchall()]
             
-            cursor.execute("SELECT source, COUNT(*) FROM articles GROUP BY source")
-            source_stats = cursor.fetchall()
+            cursor.execute(STATS_LAST_DAYS.format(days_ago=self.storage.days_ago_sql), (6,))
+            daily_stats = [(stat_date, int(count)) for stat_date, count in cursor.fetchall()]
             
             return {
-                'total_articles': total_articles,
+                'total_articles': sent_articles + unsent_articles,
                 'sent_articles': sent_articles,
                 'unsent_articles': unsent_articles,
                 'keyword_stats': keyword_stats,
-                'source_stats': source_stats
+                'source_stats': source_stats,
+                'daily_stats': daily_stats
             }
             
-        except Error as e:
+        except STORAGE_ERRORS as e:
             logging.error(f"Error getting database stats: {e}")
             return None
         finally:
@@ -1183,19 +3168,221 @@ class NewsFetcher:
                 cursor.close()
                 connection.close()
 
+    @staticmethod
+    def search_terms(query):
+        """Lowercased word terms of a search query; punctuation separates terms"""
+        return re.findall(r'\w+', query.lower())
+
+    def search_articles(self, query, keywords=None, sources=None, since=None, until=None,
+                        page=1, page_size=20, table='articles'):
+        """Search article headings for every term in query, best matches first.
+        
+        Terms are matched through the full-text heading index (see create_search_index); terms
+        shorter than the index token size, and partitioned tables that cannot carry the index,
+        use LIKE. Raises SearchIndexMissingError when an unpartitioned table has no index yet.
+        keywords filters on exact keywords, sources on source name substrings, since/until on
+        the published date (date_created when unknown), until being inclusive for plain dates.
+        Returns {'total', 'page', 'page_size', 'results'} or None on a database error.
+        """
+        page = max(1, int(page))
+        terms = self.search_terms(query or '')
+        connection = None
+        try:
+            connection = self.storage.connect()
+            cursor = connection.cursor(dictionary=True)
+            
+            if table not in self.search_ready:
+                if self.storage.partition_names(cursor, table):
+                    logging.warning(f"No full-text index on {table} (partitioned), searching with LIKE")
+                    self.search_ready[table] = False
+                elif self.storage.has_search_index(cursor, table):
+                    self.search_ready[table] = True
+                else:
+                    raise SearchIndexMissingError(
+                        f"The full-text index on {table}.article_heading is missing; create it by restarting "
+                        f"the fetcher (schema migrations) or with create_search_index('{table}')")
+            
+            indexed = []
+            if self.search_ready[table]:
+                indexed = [term for term in terms if len(term) >= self.storage.search_min_term]
+            join, conditions, params = "", [], []
+            score, score_params = "0", []
+            if indexed:
+                join, match, match_params, score, score_params = self.storage.fulltext_clauses(table, indexed)
+                conditions.append(match)
+                params.extend(match_params)
+            for term in terms:
+                if term not in indexed:
+                    conditions.append("a.article_heading LIKE %s")
+                    params.append(f"%{term}%")
+            
+            if keywords:
+                conditions.append(f"a.keyword IN ({', '.join(['%s'] * len(keywords))})")
+                params.extend(keywords)
+            if sources:
+                conditions.append("(" + " OR ".join(["a.source LIKE %s"] * len(sources)) + ")")
+                params.extend(f"%{source}%" for source in sources)
+            effective = "COALESCE(a.published_date, a.date_created)"
+            if since:
+                if not isinstance(since, datetime):
+                    since = datetime.combine(since, datetime.min.time())
+                conditions.append(f"{effective} >= %s")
+                params.append(since)
+            if until:
+                if not isinstance(until, datetime):
+                    until = datetime.combine(until, datetime.min.time()) + timedelta(days=1)
+                conditions.append(f"{effective} < %s")
+                params.append(until)
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            
+            start = time.perf_counter()
+            cursor.execute(f"SELECT COUNT(*) AS total FROM {table} a{join}{where}", params)
+            total = cursor.fetchone()['total']
+            
+            cursor.execute(f"""
+                SELECT a.id, a.article_heading, a.article_link, a.keyword, a.source,
+                       a.published_date, a.date_created, a.is_sent, {score} AS score
+                FROM {table} a{join}{where}
+                ORDER BY score DESC, {effective} DESC, a.id DESC
+                LIMIT %s OFFSET %s
+            """, score_params + params + [page_size, (page - 1) * page_size])
+            results = cursor.fetchall()
+            
+            logging.info(f"Search {query!r}: {total} matches, page {page} in "
+                         f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            return {'total': total, 'page': page, 'page_size': page_size, 'results': results}
+            
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error searching articles: {e}")
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def benchmark_search(self, rows=1000000, repeats=5):
+        """Time article searches on a synthetic table of the given size, which is dropped afterwards.
+        
+        Returns {'index_seconds', 'queries': {label: (median ms, total matches)}}.
+        """
+        table = 'articles_search_benchmark'
+        queries = {
+            'one term': dict(query='steel'),
+            'two terms': dict(query='solar glass'),
+            'rare term': dict(query='(4242)'),
+            'term + keyword': dict(query='guidelines', keywords=['RBI']),
+            'term + source + dates': dict(query='mutual funds', sources=['Mint'],
+                                          since=datetime.now() - timedelta(days=30), until=datetime.now()),
+            'deep page': dict(query='imports', page=50),
+            'short term (LIKE)': dict(query='ev'),
+        }
+        connection = self.storage.connect()
+        try:
+            start = time.perf_counter()
+            self.storage.create_synthetic_articles(connection, table, rows)
+            logging.info(f"Created {rows} synthetic articles in {time.perf_counter() - start:.1f}s")
+            
+            # Building the index is part of what is measured, so it is created explicitly here
+            start = time.perf_counter()
+            self.search_ready.pop(table, None)
+            self.storage.ensure_search_index(connection, table)
+            index_seconds = time.perf_counter() - start
+            logging.info(f"Built the search index on {rows} rows in {index_seconds:.1f}s")
+            
+            results = {}
+            for label, kwargs in queries.items():
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    found = self.search_articles(table=table, **kwargs)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                results[label] = (timings[len(timings) // 2], found['total'] if found else None)
+            return {'index_seconds': index_seconds, 'queries': results}
+        finally:
+            cursor = connection.cursor()
+            self.storage.drop_table(cursor, table)
+            connection.commit()
+            cursor.close()
+            connection.close()
+            self.search_ready.pop(table, None)
+
+    def hot_queries(self):
+        """The fetcher's frequent queries as (label, query, params, expected access) for check_query_plans.
+        
+        Every query is built from the same constants (and unsent_filter) the fetcher executes.
+        """
+        now = datetime.now()
+        unsent, unsent_params = self.unsent_filter()
+        batch, batch_params = self.unsent_filter(batch_id='')
+        published_cursor = [now, now, now, now, now, now, 0]
+        undated_cursor = [now, now, now, 0]
+        return [
+            ('duplicate check', DEDUP_QUERY, ('', ''), 'seek'),
+            ('archived duplicate check', ARCHIVED_KEY_QUERY, ('', ''), 'seek'),
+            ('unsent count', UNSENT_COUNT, (), 'seek'),
+            ('unsent page (published)',
+             UNSENT_PAGE_PUBLISHED.format(columns=UNSENT_COLUMNS, table='articles', where=unsent,
+                                          after=UNSENT_AFTER_PUBLISHED),
+             unsent_params + published_cursor + [500], 'ordered'),
+            ('unsent page (undated)',
+             UNSENT_PAGE_UNDATED.format(columns=UNSENT_COLUMNS, table='articles', where=unsent,
+                                        after=UNSENT_AFTER_UNDATED),
+             unsent_params + undated_cursor + [500], 'ordered'),
+            ('batch claim',
+             CLAIM_BATCH_UPDATE.format(utc_now=self.storage.utc_now_sql,
+                                       stale_before=self.storage.utc_minutes_ago_sql), ('', 60), 'seek'),
+            ('batch page (published)',
+             UNSENT_PAGE_PUBLISHED.format(columns=UNSENT_COLUMNS, table='articles', where=batch,
+                                          after=UNSENT_AFTER_PUBLISHED),
+             batch_params + published_cursor + [500], 'seek'),
+            ('batch keyword counts', BATCH_KEYWORD_COUNTS, ('',), 'seek'),
+            ('retention month', RETENTION_MONTH_IDS,
+             (datetime(2000, 1, 1), datetime(2000, 2, 1), self.retention_delete_chunk), 'seek'),
+            ('stats recount', STATS_RECOUNT, (), 'covering'),
+            ('stats by sent flag', STATS_BY_SENT, (), 'covering'),
+            ('stats by keyword', STATS_BY_KEYWORD, (), 'covering'),
+            ('stats by source', STATS_BY_SOURCE, (), 'covering'),
+            ('stats last 7 days', STATS_LAST_DAYS.format(days_ago=self.storage.days_ago_sql), (6,), 'seek'),
+        ]
+
+    def check_query_plans(self, min_rows=PLAN_CHECK_MIN_ROWS):
+        """EXPLAIN the hot queries and log those whose plan regressed (e.g. to a full table scan).
+        
+        Scans estimated below min_rows rows are not regressions (MySQL scans small tables on purpose).
+        Returns [(label, plan, problems)] for every query, or None when the check could not run.
+        """
+        try:
+            report = check_query_plans(self.storage, self.hot_queries(), min_rows)
+        except STORAGE_ERRORS as e:
+            logging.error(f"Error checking query plans: {e}")
+            return None
+        for label, plan, problems in report:
+            if problems:
+                logging.error(f"Query plan regression in '{label}': {', '.join(problems)} [{plan}]")
+        logging.info(f"Checked {len(report)} query plans, "
+                     f"{sum(1 for _, _, problems in report if problems)} regressed")
+        return report
+
     def run_scheduler(self):
         """Run the scheduler for automated operations"""
         logging.info("Starting automated news fetcher scheduler...")
         logging.info(f"Using {len(self.newsapi_keys)} NewsAPI key(s)")
         
-        schedule.every(90).minutes.do(self.fetch_all_news)
+        schedule.every(self.fetch_interval_minutes).minutes.do(self.fetch_all_news)
         schedule.every(30).minutes.do(lambda: self.send_scheduled_email("morning"))
         schedule.every(30).minutes.do(lambda: self.send_scheduled_email("evening"))
+        schedule.every(5).minutes.do(self.mail_queue.flush)
+        schedule.every().day.at("02:30").do(self.run_retention)
         
-        self.fetch_all_news()
+        if self.fetch_is_due():
+            self.fetch_all_news()
+        else:
+            logging.info(f"Last fetch completed at {self.last_fetch_completed:%Y-%m-%d %H:%M:%S}, "
+                         f"skipping startup fetch until the next scheduled cycle")
         
         logging.info("Scheduler started. Press Ctrl+C to stop.")
-        logging.info("News fetching scheduled every 90 minutes")
+        logging.info(f"News fetching scheduled every {self.fetch_interval_minutes} minutes")
         
         try:
             while True:
@@ -1203,6 +3390,9 @@ class NewsFetcher:
                 time.sleep(60)
         except KeyboardInterrupt:
             logging.info("Scheduler stopped by user.")
+        finally:
+            self.flush_priority_alerts()
+            self.mail_queue.close()
 
     def manage_limited_keywords(self):
         """Interactive management of limited keywords"""
@@ -1276,6 +3466,7 @@ def main():
     EMAIL_CONFIG = {
         'smtp_server': os.getenv('SMTP_SERVER'),
         'smtp_port': int(os.getenv('SMTP_PORT')),
+        'smtp_use_tls': os.getenv('SMTP_USE_TLS', 'true').lower() != 'false',
         'sender_email': os.getenv('SENDER_EMAIL'),
         'sender_password': os.getenv('SENDER_PASSWORD'),
         'recipient_email': os.getenv('RECIPIENT_EMAIL'),
@@ -1294,17 +3485,51 @@ def main():
     # END OF CONFIGURATION SECTION
     # =================================================================
     
-    fetcher = NewsFetcher(API_KEYS, MYSQL_CONFIG, EMAIL_CONFIG)
+    # STORAGE_BACKEND=sqlite keeps everything in a local SQLite file (SQLITE_PATH) instead of MySQL
+    storage = create_backend(os.getenv('STORAGE_BACKEND', 'mysql'), MYSQL_CONFIG, os.getenv('SQLITE_PATH'))
+    
+    fetcher = NewsFetcher(API_KEYS, MYSQL_CONFIG, EMAIL_CONFIG, storage=storage)
+    fetcher.max_download_bytes = int(os.getenv('MAX_DOWNLOAD_BYTES', fetcher.max_download_bytes))
+    fetcher.fetch_time_budget = int(os.getenv('FETCH_TIME_BUDGET_MINUTES', 80)) * 60 or None
+    fetcher.fetch_interval_minutes = int(os.getenv('FETCH_INTERVAL_MINUTES', 90))
+    fetcher.state_file = os.getenv('STATE_FILE', 'fetcher_state.json')
+    fetcher.digest_mode = os.getenv('DIGEST_MODE', fetcher.digest_mode)
+    fetcher.digest_max_inline = int(os.getenv('DIGEST_MAX_INLINE', fetcher.digest_max_inline))
+    fetcher.digest_max_bytes = int(os.getenv('DIGEST_MAX_BYTES', fetcher.digest_max_bytes))
+    fetcher.digest_attachment_format = os.getenv('DIGEST_ATTACHMENT_FORMAT', fetcher.digest_attachment_format)
+    fetcher.mail_queue = MailQueue(EMAIL_CONFIG, spool_dir=os.getenv('MAIL_SPOOL_DIR', 'mail_spool'))
+    if os.getenv('PRIORITY_KEYWORDS'):
+        fetcher.priority_keywords = [k.strip() for k in os.getenv('PRIORITY_KEYWORDS').split(',') if k.strip()]
+    fetcher.alert_debounce_seconds = int(os.getenv('ALERT_DEBOUNCE_SECONDS', fetcher.alert_debounce_seconds))
+    fetcher.alert_max_delay_seconds = int(os.getenv('ALERT_MAX_DELAY_SECONDS', fetcher.alert_max_delay_seconds))
+    fetcher.alert_max_attempts = int(os.getenv('ALERT_MAX_ATTEMPTS', fetcher.alert_max_attempts))
+    fetcher.retention_months = int(os.getenv('RETENTION_MONTHS', fetcher.retention_months))
+    fetcher.archive_dir = os.getenv('ARCHIVE_DIR', fetcher.archive_dir)
+    fetcher.trend_signals_in_digest = os.getenv('TREND_SIGNALS_IN_DIGEST', 'false').lower() == 'true'
+    if os.getenv('SUBSCRIPTIONS_FILE'):
+        fetcher.load_subscriptions(os.getenv('SUBSCRIPTIONS_FILE'))
+    fetcher.load_state()
     
     if not fetcher.verify_table_exists():
         print("ERROR: Articles table does not exist in database!")
         print("Please create the table first using the provided SQL schema.")
         return
     
+    fetcher.ensure_schema_migrations()
+    
+    # Opt-in: QUERY_PLAN_CHECK=fail stops here (exit status 1) when a hot query lost its index, e.g. in CI
+    plan_check = os.getenv('QUERY_PLAN_CHECK', 'off').lower()
+    if plan_check != 'off':
+        report = fetcher.check_query_plans(int(os.getenv('QUERY_PLAN_MIN_ROWS', str(PLAN_CHECK_MIN_ROWS))))
+        if plan_check == 'fail' and (report is None or any(problems for _, _, problems in report)):
+            print("ERROR: Query plan check failed (see log)")
+            raise SystemExit(1)
+    
     print("=" * 60)
     print("Enhanced Automated News Fetcher with Heading-Based Duplicates")
     print("=" * 60)
     print(f"Active NewsAPI keys: {len(fetcher.newsapi_keys)}")
+    print(f"Storage: {fetcher.storage.describe()}")
     print("Features:")
     print("- Automatic API key rotation on rate limits")
     print("- Heading-based duplicate detection (not URL)")
@@ -1322,13 +3547,15 @@ def main():
 6. Manage limited keywords
 7. Test scraping for specific source
 8. View API key status
-Enter choice (1-8): """).strip()
+9. Search articles
+Enter choice (1-9): """).strip()
     
     if mode == "1":
         fetcher.run_scheduler()
         
     elif mode == "2":
         articles = fetcher.fetch_all_news()
+        fetcher.flush_priority_alerts()
         logging.info(f"Fetched {len(articles)} articles")
         
     elif mode == "3":
@@ -1353,6 +3580,10 @@ Enter choice (1-8): """).strip()
             print(f"\nArticles by Source:")
             for source, count in stats['source_stats']:
                 print(f"  {source}: {count}")
+            
+            print(f"\nArticles added in the last 7 days:")
+            for stat_date, count in stats['daily_stats']:
+                print(f"  {stat_date}: {count}")
         else:
             print("Unable to fetch database statistics")
             
@@ -1361,14 +3592,23 @@ Enter choice (1-8): """).strip()
         print("1. View unsent articles")
         print("2. Send all unsent articles")
         print("3. Test limited keyword mechanism")
-        
-        choice = input("Enter choice (1-3): ").strip()
+        print("4. Benchmark digest rendering")
+        print("5. Verify statistics table against a full recount")
+        print("6. Convert articles table to monthly partitions")
+        print("7. Archive articles past the retention window now")
+        print("8. Benchmark article search")
+        print("9. Check query plans (EXPLAIN)")
+        print("10. Benchmark unsent article paging")
+        print("11. Resolve digest batches interrupted while sending")
+        print("12. Drop superseded indexes")
+        
+        choice = input("Enter choice (1-12): ").strip()
         
         if choice == "1":
-            unsent_articles = fetcher.get_unsent_articles()
-            if unsent_articles:
-                print(f"\n=== {len(unsent_articles)} Unsent Articles ===")
-                for i, article in enumerate(unsent_articles[:20]):
+            unsent_count = fetcher.count_unsent_articles()
+            if unsent_count:
+                print(f"\n=== {unsent_count} Unsent Articles (showing up to 20) ===")
+                for i, article in enumerate(itertools.islice(fetcher.iter_unsent_articles(chunk_size=20), 20)):
                     print(f"{i+1}. ID: {article['id']}")
                     print(f"   Title: {article['article_heading']}")
                     print(f"   Source: {article['source']}")
@@ -1378,16 +3618,11 @@ Enter choice (1-8): """).strip()
                 print("No unsent articles found")
                 
         elif choice == "2":
-            unsent_articles = fetcher.get_unsent_articles()
-            if unsent_articles:
-                if fetcher.send_email(unsent_articles, "Manual Send"):
-                    article_ids = [article['id'] for article in unsent_articles]
-                    fetcher.update_sent_status(article_ids, True)
-                    print(f"Sent email and marked {len(article_ids)} articles as sent")
-                else:
-                    print("Failed to send email")
+            sent_count = fetcher.send_batch("Manual Send")
+            if sent_count:
+                print(f"Sent email and marked {sent_count} articles as sent")
             else:
-                print("No unsent articles to send")
+                print("No unsent articles sent (none pending or the email failed, see log)")
         
         elif choice == "3":
             print("\nTesting Limited Keyword Mechanism:")
@@ -1400,6 +3635,88 @@ Enter choice (1-8): """).strip()
                 if fetcher.can_use_limited_keyword(test_keyword):
                     fetcher.use_limited_keyword(test_keyword)
                     print(f"After usage - Can use '{test_keyword}': {fetcher.can_use_limited_keyword(test_keyword)}")
+        
+        elif choice == "4":
+            for rows in (1000, 10000):
+                elapsed, size = fetcher.benchmark_digest_render(rows)
+                print(f"{rows} rows: {elapsed * 1000:.1f} ms, {size / 1024:.0f} KiB")
+        
+        elif choice == "5":
+            mismatches = fetcher.verify_stats()
+            if mismatches is None:
+                print("Unable to verify statistics (see log)")
+            elif not mismatches:
+                print("article_stats matches a full recount")
+            else:
+                print(f"{len(mismatches)} mismatched groups (date, keyword, source, sent, stored, actual):")
+                for mismatch in mismatches[:20]:
+                    print(f"  {mismatch}")
+                if input("Rebuild article_stats from a full recount? (y/n): ").strip().lower() == 'y':
+                    fetcher.rebuild_stats()
+        
+        elif choice == "6":
+            print("This rebuilds the articles table: the primary key becomes (id, date_created)")
+            print("and article_link loses its UNIQUE constraint (links are checked on insert).")
+            if input("Partition articles by month now? (y/n): ").strip().lower() == 'y':
+                if fetcher.partition_articles():
+                    print("Articles table is partitioned by month")
+                else:
+                    print("Partitioning failed (see log)")
+        
+        elif choice == "7":
+            if not fetcher.retention_months:
+                print("RETENTION_MONTHS is not set, nothing is archived")
+            else:
+                archived = fetcher.run_retention()
+                print(f"Archived {archived} articles older than {fetcher.retention_months} months "
+                      f"to {fetcher.archive_dir}")
+        
+        elif choice == "8":
+            rows = int(input("Synthetic rows (default 1000000): ").strip() or 1000000)
+            report = fetcher.benchmark_search(rows)
+            print(f"\nSearch index built on {rows} rows in {report['index_seconds']:.1f}s")
+            for label, (median_ms, total) in report['queries'].items():
+                print(f"  {label:<24} {median_ms:8.1f} ms  {total} matches")
+        
+        elif choice == "9":
+            report = fetcher.check_query_plans()
+            if report is None:
+                print("Unable to check query plans (see log)")
+            else:
+                for label, plan, problems in report:
+                    print(f"{'REGRESSED' if problems else 'ok':<9} {label}: {plan}")
+                    for problem in problems:
+                        print(f"          - {problem}")
+        
+        elif choice == "10":
+            rows = int(input("Synthetic unsent rows (default 1000000): ").strip() or 1000000)
+            results = fetcher.benchmark_unsent_paging(rows)
+            print(f"\n{'method':<12} {'rows':>9} {'seconds':>9} {'peak MB':>9} {'slowest page':>14}")
+            for label, result in results.items():
+                print(f"{label:<12} {result['rows']:>9} {result['seconds']:>9.1f} {result['peak_mb']:>9.1f} "
+                      f"{result['slowest_page_ms']:>11.0f} ms")
+        
+        elif choice == "11":
+            stuck = fetcher.batches_in_state('sending')
+            if not stuck:
+                print("No digest batches are stuck in 'sending'")
+            for batch_id, claimed_at, unsent_count in stuck:
+                print(f"\nBatch {batch_id}, claimed {claimed_at}, {unsent_count} unsent articles")
+                print("Check the mail server log or a recipient's inbox for this digest.")
+                answer = input("Was it delivered? (y = mark sent, n = release for the next digest, "
+                               "Enter = skip): ").strip().lower()
+                if answer == 'y':
+                    fetcher.mark_batch_sent(batch_id)
+                elif answer == 'n':
+                    fetcher.release_batch(batch_id)
+        
+        elif choice == "12":
+            print("Superseded indexes: " + ', '.join(f"{table}.{name}" for table, names in SUPERSEDED_INDEXES.items()
+                                                     for name in names))
+            print("Run option 9 first: every hot query should already use the new indexes.")
+            if input("Drop the ones that still exist? (y/n): ").strip().lower() == 'y':
+                dropped = fetcher.drop_superseded_indexes()
+                print(f"Dropped {', '.join(dropped)}" if dropped else "No superseded indexes left")
         else:
             print("Invalid choice")
     
@@ -1447,8 +3764,47 @@ Enter choice (1-8): """).strip()
             print(f"  Failures: {failures}")
             print(f"  Last success: {last_success.strftime('%Y-%m-%d %H:%M:%S') if last_success else 'Never'}")
     
+    elif mode == "9":
+        query = input("Search headings for: ").strip()
+        keywords = [k.strip() for k in input("Keywords (comma separated, blank for all): ").split(',') if k.strip()]
+        sources = [s.strip() for s in input("Sources (comma separated, blank for all): ").split(',') if s.strip()]
+        try:
+            since = input("From date YYYY-MM-DD (blank for any): ").strip()
+            since = datetime.strptime(since, '%Y-%m-%d').date() if since else None
+            until = input("To date YYYY-MM-DD (blank for any): ").strip()
+            until = datetime.strptime(until, '%Y-%m-%d').date() if until else None
+        except ValueError:
+            print("Invalid date")
+            return
+        
+        page = 1
+        while True:
+            try:
+                found = fetcher.search_articles(query, keywords, sources, since, until, page=page)
+            except SearchIndexMissingError as e:
+                print(e)
+                break
+            if found is None:
+                print("Search failed (see log)")
+                break
+            pages = max(1, -(-found['total'] // found['page_size']))
+            print(f"\n=== {found['total']} matches, page {page} of {pages} ===")
+            for i, article in enumerate(found['results'], (page - 1) * found['page_size'] + 1):
+                when = article['published_date'] or article['date_created']
+                print(f"{i}. {article['article_heading']}")
+                print(f"   {article['keyword']} | {article['source']} | {when}")
+                print(f"   {article['article_link']}")
+            
+            step = input("\n[n]ext, [p]revious, or Enter to quit: ").strip().lower()
+            if step == 'n' and page < pages:
+                page += 1
+            elif step == 'p' and page > 1:
+                page -= 1
+            elif step not in ('n', 'p'):
+                break
+    
     else:
-        print("Invalid choice. Please run the program again and choose 1-8.")
+        print("Invalid choice. Please run the program again and choose 1-9.")
 
 if __name__ == "__main__":
     main()
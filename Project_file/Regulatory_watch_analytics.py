@@ -1,5 +1,3 @@
-import mysql.connector
-from mysql.connector import Error
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -8,7 +6,25 @@ import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
 import warnings
 import os
+import time
+import io
+import json
+import hashlib
+import pickle
+import shutil
+import sys
+import itertools
+import csv
+import gzip
+import glob
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from storage_backends import PLAN_CHECK_MIN_ROWS, STORAGE_ERRORS, MySQLBackend, check_query_plans, create_backend
 # Load environment variables from .env file
 load_dotenv()
 warnings.filterwarnings('ignore')
@@ -17,84 +33,995 @@ warnings.filterwarnings('ignore')
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
+# Columns read from the articles table
+ARTICLE_COLUMNS = [
+    'id', 'article_heading', 'article_link', 'keyword', 'source',
+    'published_date', 'is_sent', 'date_created', 'date_updated'
+]
+
+# Buffer dtypes of the chunked loader; other columns are object (or categorical codes in compact mode)
+COLUMN_DTYPES = {
+    'id': 'int64',
+    'is_sent': 'bool',
+    'published_date': 'datetime64[ns]',
+    'date_created': 'datetime64[ns]',
+    'date_updated': 'datetime64[ns]'
+}
+CATEGORY_COLUMNS = ['keyword', 'source']
+
+# Trend engine defaults: trailing baseline window, spike threshold and minimum daily count
+TREND_WINDOW_DAYS = 28
+TREND_MIN_PERIODS = 7
+SPIKE_Z_THRESHOLD = 3.0
+SPIKE_MIN_COUNT = 3
+TREND_DIMENSIONS = ['keyword', 'source']
+TREND_COLUMNS = ['id', 'keyword', 'source', 'published_date', 'date_created']
+
+# Table used by benchmark_loader for synthetic rows
+BENCHMARK_TABLE = 'articles_loader_benchmark'
+
+# Excel worksheet row limit (including the header row)
+EXCEL_MAX_ROWS = 1048576
+
+# Article text columns, only loaded in compact mode when something needs them (e.g. the Raw Data sheet)
+TEXT_COLUMNS = ['article_heading', 'article_link']
+
+# Date parts computed on demand from effective_date in compact mode
+DATE_PARTS = {
+    'date': lambda dates: dates.dt.normalize(),
+    'week': lambda dates: dates.dt.to_period('W'),
+    'month': lambda dates: dates.dt.to_period('M'),
+    'year': lambda dates: dates.dt.year,
+    'day_name': lambda dates: dates.dt.day_name()
+}
+
+# SQL expressions used when aggregations are pushed down to MySQL
+EFFECTIVE_DATE_SQL = "COALESCE(published_date, date_created)"
+EFFECTIVE_DAY_SQL = f"DATE({EFFECTIVE_DATE_SQL})"
+
+# Pushdown cube query, answered from idx_analytics_cover without reading table rows. It is bounded
+# by the MAX(id) read just before, which becomes the watermark for incremental trend refreshes.
+CUBE_SQL = (
+    f"SELECT {EFFECTIVE_DAY_SQL} AS date, source, keyword, is_sent, COUNT(*) AS n "
+    f"FROM articles WHERE id <= %s GROUP BY date, source, keyword, is_sent"
+)
+
+# Render cache fingerprint queries (data_fingerprint), served from idx_date_updated, idx_analytics_cover, idx_source
+FINGERPRINT_TOTALS_SQL = "SELECT MAX(date_updated), COUNT(*) FROM articles"
+FINGERPRINT_KEYWORDS_SQL = "SELECT DISTINCT keyword FROM articles ORDER BY keyword"
+FINGERPRINT_SOURCES_SQL = "SELECT DISTINCT source FROM articles ORDER BY source"
+
+# Dimensions of the shared count cube; week and month are derived from date
+CUBE_DIMENSIONS = ['date', 'source', 'keyword', 'article_type', 'is_sent']
+
+# (period, dimension, article_type) slices read by a complete analysis and the Excel export
+ANALYSIS_SLICES = [
+    (None, 'source', None), (None, 'keyword', None), (None, 'article_type', None),
+    ('date', 'keyword', None), ('week', 'keyword', None), ('month', 'keyword', None),
+    ('date', 'keyword', 'API'), ('week', 'keyword', 'API'), ('month', 'keyword', 'API'),
+    ('date', 'keyword', 'Scraping'), ('week', 'keyword', 'Scraping'), ('month', 'keyword', 'Scraping'),
+    ('date', 'article_type', None), ('week', 'article_type', None), ('month', 'article_type', None),
+    ('date', 'source', None), ('week', 'source', None), ('month', 'source', None)
+]
+
+# Chart methods rendered by a complete analysis, in report order: (method, PNG name, title)
+CHARTS = [
+    ('plot_articles_by_source', 'source_count', 'Articles by Source'),
+    ('plot_articles_by_keyword', 'keyword_count', 'Articles by Keyword'),
+    ('plot_monthly_weekly_averages', 'monthly_weekly_avg', 'Monthly and Weekly Averages'),
+    ('plot_api_keywords_analysis', 'api_keywords', 'API Keywords Analysis'),
+    ('plot_scraping_keywords_analysis', 'scraping_keywords', 'Scraping Keywords Analysis'),
+    ('plot_api_vs_scraping_comparison', 'api_vs_scraping', 'API vs Scraping Comparison'),
+    ('plot_source_wise_keyword_analysis', 'source_keyword_analysis', 'Source-wise and Keyword-wise Analysis')
+]
+
+# Count slices each cached output is drawn from; 'stats' stands for summary_stats()
+CHART_INPUTS = {
+    'plot_articles_by_source': [(None, 'source', None)],
+    'plot_articles_by_keyword': [(None, 'keyword', None)],
+    'plot_monthly_weekly_averages': [('month', 'keyword', None), ('week', 'keyword', None)],
+    'plot_api_keywords_analysis': [(period, 'keyword', 'API') for period in ('date', 'week', 'month')],
+    'plot_scraping_keywords_analysis': [(period, 'keyword', 'Scraping') for period in ('date', 'week', 'month')],
+    'plot_api_vs_scraping_comparison': [(None, 'article_type', None)] + [
+        (period, 'article_type', None) for period in ('date', 'week', 'month')
+    ],
+    'plot_source_wise_keyword_analysis': [(None, 'source', None), (None, 'keyword', None)] + [
+        (period, dimension, None) for dimension in ('source', 'keyword') for period in ('date', 'week', 'month')
+    ]
+}
+SUMMARY_INPUTS = ['stats', (None, 'article_type', None), (None, 'keyword', None), (None, 'source', None)]
+WORKBOOK_INPUTS = ['stats', (None, 'source', None), (None, 'keyword', None),
+                   ('month', 'article_type', None), ('week', 'article_type', None)]
+
+def init_render_worker():
+    """Use the non-interactive Agg backend in chart render processes"""
+    plt.switch_backend('Agg')
+
+def render_chart(cube, method, save_path, dpi):
+    """Render one chart from the shared cube in a worker process.
+    
+    Returns the figure (or None when the chart had no data), the chart's printed
+    output and the render time in seconds.
+    """
+    start = time.perf_counter()
+    analyzer = NewsDataAnalyzer({}, dpi=dpi, headless=True)
+    analyzer.cube = cube
+    
+    plt.close('all')
+    output = io.StringIO()
+    with redirect_stdout(output):
+        getattr(analyzer, method)(save_path)
+    fig = plt.gcf() if plt.get_fignums() else None
+    
+    return fig, output.getvalue(), time.perf_counter() - start
+
+def reset_peak_rss():
+    """Restart the peak RSS measurement (Linux only), returns False where it keeps counting from process start"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB since start or reset_peak_rss (None on Windows)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def format_peak_rss(result):
+    """'peak RSS +X MB over Y MB' for a benchmark result with peak_mb and baseline_mb"""
+    if result['peak_mb'] is None:
+        return "peak RSS n/a"
+    return f"peak RSS +{result['peak_mb']:.1f} MB over {result['baseline_mb']:.1f} MB"
+
 class NewsDataAnalyzer:
-    def __init__(self, mysql_config):
-        """Initialize the analyzer with database configuration"""
+    def __init__(self, mysql_config, cache_dir=None, pushdown=False, compact=False, dpi=300, headless=False,
+                 archive_dir=None, storage=None):
+        """Initialize the analyzer with database configuration.
+        
+        cache_dir enables a local Parquet copy of the articles table that is refreshed
+        incrementally from date_updated, so repeated runs only fetch new or changed rows.
+        pushdown computes every chart's group counts in MySQL instead of loading rows,
+        so memory no longer grows with the article count (no raw data is available).
+        compact loads rows with categorical dtypes, without the heading/link text and with
+        date parts computed on demand instead of stored per row.
+        headless never calls plt.show(); figures stay open for the batch renderer.
+        archive_dir adds the months archived by the fetcher's retention job (gzip CSV files).
+        storage overrides the MySQL backend built from mysql_config (e.g. a SQLiteBackend).
+        """
         self.mysql_config = mysql_config
+        self.storage = storage or MySQLBackend(mysql_config or {})
+        self.cache_dir = cache_dir
+        self.pushdown = pushdown
+        self.compact = compact
+        self.chunk_size = 50000
+        self.dpi = dpi
+        self.headless = headless
+        self.archive_dir = archive_dir
         self.df = None
-        
-    def connect_and_fetch_data(self):
-        """Connect to database and fetch all articles data"""
-        connection = None
+        self.cube = None
+        self.cube_build_seconds = None
+        self.cube_last_id = None
+        self.fingerprint = None
+        self.render_manifest = None
+        self.trend_counts = {}
+        self.trends = {}
+        self.trend_last_id = None
+    
+    def article_columns(self, include_text=False):
+        """Columns to load: all of them, or everything but the text columns in compact mode"""
+        if self.compact and not include_text:
+            return [column for column in ARTICLE_COLUMNS if column not in TEXT_COLUMNS]
+        return ARTICLE_COLUMNS
+    
+    @staticmethod
+    def article_filter(since=None, after_id=None):
+        """WHERE clause and parameters for rows updated at or after since and/or with id above after_id"""
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("date_updated >= %s")
+            params.append(since.to_pydatetime())
+        if after_id is not None:
+            conditions.append("id > %s")
+            params.append(int(after_id))
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
+    
+    def article_query(self, columns=ARTICLE_COLUMNS, table='articles', since=None, after_id=None):
+        """SELECT statement and parameters of the article loader.
+        
+        Changed-row refreshes (since only) are merged by id, so they are left unordered and can be
+        read through idx_date_updated; ordering them by id would make the planner scan the table.
+        """
+        where, params = self.article_filter(since, after_id)
+        order = "" if since is not None and after_id is None else " ORDER BY id"
+        return f"SELECT {', '.join(columns)} FROM {table}{where}{order}", params
+    
+    def fetch_articles(self, connection, since=None, columns=ARTICLE_COLUMNS, table='articles', after_id=None):
+        """Fetch raw article rows, optionally only those updated at or after since (or newer than after_id).
+        
+        Rows are streamed in chunks from an unbuffered cursor into preallocated typed column
+        buffers, so apart from the result only one chunk of Python rows is held at a time.
+        """
+        capacity = self.count_articles(connection, since, table, after_id)
+        buffers = {column: np.empty(capacity, dtype=self.buffer_dtype(column)) for column in columns}
+        categories = {column: {} for column in columns if self.compact and column in CATEGORY_COLUMNS}
+        filled = 0
+        
+        for chunk in self.iter_article_rows(connection, columns, self.chunk_size, since, table, after_id):
+            end = filled + len(chunk)
+            if end > capacity:
+                # Rows inserted since the count; grow the buffers
+                capacity = max(end, capacity * 2)
+                for column in columns:
+                    grown = np.empty(capacity, dtype=buffers[column].dtype)
+                    grown[:filled] = buffers[column][:filled]
+                    buffers[column] = grown
+            
+            for column, values in zip(columns, zip(*chunk)):
+                if column in categories:
+                    lookup = categories[column]
+                    values = [-1 if value is None else lookup.setdefault(value, len(lookup)) for value in values]
+                elif column in COLUMN_DTYPES and COLUMN_DTYPES[column].startswith('datetime'):
+                    values = pd.to_datetime(list(values)).to_numpy()
+                buffers[column][filled:end] = values
+            filled = end
+        
+        data = {}
+        for column in columns:
+            values = buffers[column][:filled]
+            if column in categories:
+                values = pd.Categorical.from_codes(values, categories=list(categories[column]))
+            data[column] = values
+        return pd.DataFrame(data, columns=columns, copy=False)
+    
+    def buffer_dtype(self, column):
+        """dtype of a column buffer in the chunked loader"""
+        if self.compact and column in CATEGORY_COLUMNS:
+            return 'int32'
+        return COLUMN_DTYPES.get(column, object)
+    
+    def fetch_articles_buffered(self, connection, since=None, columns=ARTICLE_COLUMNS, table='articles'):
+        """Previous loader (buffered dict cursor and fetchall), kept as the benchmark baseline"""
+        cursor = connection.cursor(dictionary=True)
         try:
-            connection = mysql.connector.connect(**self.mysql_config)
-            cursor = connection.cursor(dictionary=True)
+            query = f"SELECT {', '.join(columns)} FROM {table}"
+            params = ()
+            if since is not None:
+                query += " WHERE date_updated >= %s"
+                params = (since.to_pydatetime(),)
+            query += " ORDER BY date_created DESC"
             
-            query = """
-            SELECT 
-                id,
-                article_heading,
-                article_link,
-                keyword,
-                source,
-                published_date,
-                is_sent,
-                date_created,
-                date_updated
-            FROM articles
-            ORDER BY date_created DESC
-            """
+            cursor.execute(query, params)
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+        finally:
+            cursor.close()
+    
+    def iter_article_rows(self, connection, columns=ARTICLE_COLUMNS, chunk_size=10000, since=None, table='articles',
+                          after_id=None):
+        """Stream article rows as lists of tuples from an unbuffered (server-side) cursor"""
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(*self.article_query(columns, table, since, after_id))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+    
+    def count_articles(self, connection, since=None, table='articles', after_id=None):
+        """Number of rows in the articles table (restricted like article_filter)"""
+        cursor = connection.cursor()
+        try:
+            where, params = self.article_filter(since, after_id)
+            cursor.execute(f"SELECT COUNT(*) FROM {table}{where}", params)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+    
+    def cache_path(self, columns=ARTICLE_COLUMNS):
+        """Path of the cached articles Parquet file (compact column sets are cached separately)"""
+        name = 'articles.parquet' if columns == ARTICLE_COLUMNS else 'articles_compact.parquet'
+        return os.path.join(self.cache_dir, name)
+    
+    def load_cache(self, columns=ARTICLE_COLUMNS):
+        """Load cached raw article rows, or None when there is no usable cache"""
+        if not self.cache_dir or not os.path.exists(self.cache_path(columns)):
+            return None
+        try:
+            return pd.read_parquet(self.cache_path(columns))
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Ignoring analytics cache ({e})")
+            return None
+    
+    def save_cache(self, raw_df, watermark=None):
+        """Write raw article rows to the cache (atomic replace), then the watermark they are complete up to"""
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.cache_path(list(raw_df.columns))
+            tmp_path = path + '.tmp'
+            raw_df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            self.save_watermark(list(raw_df.columns), watermark)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Could not write analytics cache ({e})")
+    
+    def load_watermark(self, columns=ARTICLE_COLUMNS):
+        """The cache's date_updated watermark as stored by save_cache, or None"""
+        try:
+            with open(self.cache_path(columns) + '.watermark.json', encoding='utf-8') as f:
+                return pd.Timestamp(json.load(f)['date_updated'])
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def save_watermark(self, columns, watermark):
+        """Store the cache watermark next to the cache file (removed when unknown)"""
+        path = self.cache_path(columns) + '.watermark.json'
+        if watermark is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'date_updated': str(watermark)}, f)
+        os.replace(path + '.tmp', path)
+    
+    def max_date_updated(self, connection):
+        """Latest date_updated in the articles table, in the database's own clock and time zone"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT MAX(date_updated) FROM articles")
+            value = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        return pd.Timestamp(value) if value is not None else None
+    
+    @staticmethod
+    def changed_rows(cached, fetched):
+        """Rows of fetched that are new or differ from their cached version.
+        
+        The watermark is inclusive (timestamps have one-second resolution), so every refresh
+        re-reads the rows stamped at the watermark itself; those are usually unchanged.
+        """
+        in_cache = fetched['id'].isin(cached['id'])
+        new, known = fetched[~in_cache], fetched[in_cache]
+        if known.empty:
+            return new
+        before = cached.set_index('id').loc[known['id'], list(fetched.columns.drop('id'))].astype(object)
+        after = known.set_index('id')[before.columns].astype(object)
+        same = ((before == after) | (before.isna() & after.isna())).all(axis=1).to_numpy()
+        return pd.concat([new, known[~same]])
+    
+    def load_raw_articles(self, connection, use_cache=True, columns=ARTICLE_COLUMNS):
+        """Return all raw article rows, merging only new or changed rows into the cache"""
+        cached = self.load_cache(columns) if use_cache else None
+        # Taken from the database before reading rows: anything updated meanwhile is re-read next time
+        next_watermark = self.max_date_updated(connection)
+        
+        if cached is not None and not cached.empty:
+            watermark = self.load_watermark(columns)
+            if watermark is None:
+                watermark = pd.to_datetime(cached['date_updated']).max()
+            fetched = self.fetch_articles(connection, since=watermark, columns=columns)
+            changed = self.changed_rows(cached, fetched)
             
-            cursor.execute(query)
-            data = cursor.fetchall()
+            merged = pd.concat([cached, changed], ignore_index=True)
+            merged = merged.drop_duplicates('id', keep='last')
             
-            self.df = pd.DataFrame(data)
+            # Deletions do not move the watermark, so fall back to a full reload when counts diverge
+            total = self.count_articles(connection)
+            if total == len(merged):
+                print(f"Loaded {len(cached)} cached articles, merged {len(changed)} new/changed since {watermark}")
+                raw_df = merged.sort_values('date_created', ascending=False, ignore_index=True)
+                if len(changed):
+                    self.save_cache(raw_df, next_watermark)
+                elif next_watermark != watermark:
+                    self.save_watermark(columns, next_watermark)
+                return raw_df
             
-            if self.df.empty:
+            print(f"Cache has {len(merged)} articles but the table has {total}, reloading in full")
+        
+        raw_df = self.fetch_articles(connection, columns=columns)
+        self.save_cache(raw_df, next_watermark)
+        return raw_df
+    
+    def archive_files(self):
+        """Archive files written by the fetcher's retention job, oldest month first"""
+        if not self.archive_dir:
+            return []
+        return sorted(glob.glob(os.path.join(self.archive_dir, 'articles_*.csv.gz')))
+    
+    def load_archived_articles(self, columns=ARTICLE_COLUMNS):
+        """Raw article rows from the archive files, typed like fetch_articles output (None without archives)"""
+        paths = self.archive_files()
+        if not paths:
+            return None
+        
+        dates = [column for column in columns if COLUMN_DTYPES.get(column) == 'datetime64[ns]']
+        archived = pd.concat([pd.read_csv(path, usecols=columns, parse_dates=dates) for path in paths],
+                             ignore_index=True)
+        archived['is_sent'] = archived['is_sent'].astype(bool)
+        return archived[columns]
+    
+    def iter_archived_rows(self, chunk_size=10000):
+        """Stream the archive files as lists of tuples shaped like iter_article_rows chunks"""
+        dates = [column for column in ARTICLE_COLUMNS if COLUMN_DTYPES.get(column) == 'datetime64[ns]']
+        for path in self.archive_files():
+            for chunk in pd.read_csv(path, usecols=ARTICLE_COLUMNS, parse_dates=dates, chunksize=chunk_size):
+                chunk = chunk[ARTICLE_COLUMNS].astype(object)
+                chunk['is_sent'] = chunk['is_sent'].astype(bool)
+                yield list(chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+    
+    def archived_cube_counts(self):
+        """Cube counts (date, source, keyword, is_sent, n) of the archive files, read in chunks"""
+        counts = []
+        for path in self.archive_files():
+            for chunk in pd.read_csv(path, usecols=['source', 'keyword', 'is_sent', 'published_date', 'date_created'],
+                                     parse_dates=['published_date', 'date_created'], chunksize=self.chunk_size):
+                chunk['date'] = chunk['published_date'].fillna(chunk['date_created']).dt.normalize()
+                chunk['is_sent'] = chunk['is_sent'].astype(bool)
+                counts.append(chunk.groupby(['date', 'source', 'keyword', 'is_sent']).size().reset_index(name='n'))
+        return pd.concat(counts, ignore_index=True) if counts else None
+    
+    def prepare_dataframe(self, raw_df):
+        """Derive analysis columns (effective date, article type, date parts) from raw rows"""
+        df = raw_df.copy()
+        
+        # Use published_date if available, otherwise use date_created
+        df['effective_date'] = pd.to_datetime(
+            df['published_date'].fillna(df['date_created'])
+        )
+        
+        # Convert other date columns
+        df['date_created'] = pd.to_datetime(df['date_created'])
+        df['date_updated'] = pd.to_datetime(df['date_updated'])
+        
+        # Identify if article is from API or Scraping
+        df['article_type'] = df['source'].apply(
+            lambda x: 'API' if 'NewsAPI' in str(x) else 'Scraping'
+        )
+        
+        # Extract date components
+        df['date'] = df['effective_date'].dt.date
+        df['week'] = df['effective_date'].dt.to_period('W')
+        df['month'] = df['effective_date'].dt.to_period('M')
+        df['year'] = df['effective_date'].dt.year
+        df['day_name'] = df['effective_date'].dt.day_name()
+        
+        return df
+    
+    def prepare_compact_dataframe(self, raw_df):
+        """Compact variant of prepare_dataframe: categoricals, vectorised article type, no stored date parts"""
+        df = raw_df.drop(columns=['published_date', 'date_created', 'date_updated'])
+        
+        df['effective_date'] = pd.to_datetime(raw_df['published_date']).fillna(
+            pd.to_datetime(raw_df['date_created'])
+        )
+        df['source'] = df['source'].astype('category')
+        df['keyword'] = df['keyword'].astype('category')
+        df['is_sent'] = df['is_sent'].astype(bool)
+        df['article_type'] = pd.Categorical(
+            np.where(df['source'].str.contains('NewsAPI', regex=False), 'API', 'Scraping'),
+            categories=['API', 'Scraping']
+        )
+        
+        return df
+    
+    def date_part(self, part, df=None):
+        """A date part column of df (default self.df), computed from effective_date when not stored"""
+        df = self.df if df is None else df
+        if part in df.columns:
+            return df[part]
+        return DATE_PARTS[part](df['effective_date']).rename(part)
+    
+    def run_query(self, query, params=()):
+        """Run an aggregate query and return all result rows"""
+        connection = self.storage.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+        finally:
+            connection.close()
+    
+    def build_cube(self):
+        """Build the shared count cube: articles per date x source x keyword x article type x sent flag.
+        
+        Every chart, the summary report and the Excel export slice this one table, so the
+        article rows are grouped once per data load. In pushdown mode it is one GROUP BY in MySQL
+        plus chunked counts of any archive files.
+        """
+        start = time.perf_counter()
+        
+        if self.pushdown:
+            (last_id,), = self.run_query("SELECT MAX(id) FROM articles")
+            self.cube_last_id = int(last_id or 0)
+            rows = self.run_query(CUBE_SQL, (self.cube_last_id,))
+            cube = pd.DataFrame(rows, columns=['date', 'source', 'keyword', 'is_sent', 'n'])
+            archived = self.archived_cube_counts()
+            if archived is not None:
+                cube = pd.concat([cube, archived], ignore_index=True)
+                cube['date'] = pd.to_datetime(cube['date'])
+                cube['is_sent'] = cube['is_sent'].astype(bool)
+                cube = cube.groupby(['date', 'source', 'keyword', 'is_sent'], as_index=False)['n'].sum()
+            cube['date'] = pd.to_datetime(cube['date']).dt.date
+            cube['article_type'] = np.where(
+                cube['source'].str.contains('NewsAPI', regex=False), 'API', 'Scraping'
+            )
+        else:
+            self.cube_last_id = int(self.df['id'].max()) if len(self.df) else 0
+            keys = [self.date_part('date')] + CUBE_DIMENSIONS[1:]
+            cube = self.df.groupby(keys, observed=True).size().reset_index(name='n')
+            cube['date'] = pd.to_datetime(cube['date']).dt.date
+        
+        dates = pd.to_datetime(cube['date'])
+        cube['week'] = dates.dt.to_period('W')
+        cube['month'] = dates.dt.to_period('M')
+        
+        self.cube = cube
+        self.cube_build_seconds = time.perf_counter() - start
+        return cube
+    
+    def get_cube(self):
+        """Return the count cube, building it on first use after a data load"""
+        if self.cube is None:
+            self.build_cube()
+        return self.cube
+    
+    @staticmethod
+    def aggregate_counts(frame, period, dimension, weights=None):
+        """Group counts of frame rows (or of their weights) by period and dimension"""
+        keys = [dimension] if period is None else [period, dimension]
+        grouped = frame.groupby(keys, observed=True)
+        counts = grouped.size() if weights is None else grouped[weights].sum()
+        if period is None:
+            return counts.sort_values(ascending=False).rename('count')
+        return counts.unstack(fill_value=0)
+    
+    def count_by(self, period, dimension, article_type=None):
+        """Article counts by period ('date', 'week', 'month' or None) and dimension.
+        
+        With a period the result is a wide table (periods x dimension values), without one
+        it is a Series sorted by count. All counts are slices of the shared cube.
+        """
+        cube = self.get_cube()
+        if article_type is not None:
+            cube = cube[cube['article_type'] == article_type]
+        return self.aggregate_counts(cube, period, dimension, weights='n')
+    
+    def summary_stats(self):
+        """Overall totals used by the summary report and Excel export (day resolution)"""
+        cube = self.get_cube()
+        today = datetime.now().date()
+        total = int(cube['n'].sum())
+        sent = int(cube.loc[cube['is_sent'] == True, 'n'].sum())
+        api = int(cube.loc[cube['article_type'] == 'API', 'n'].sum())
+        return {
+            'total': total,
+            'date_min': pd.Timestamp(cube['date'].min()) if total else None,
+            'date_max': pd.Timestamp(cube['date'].max()) if total else None,
+            'sources': cube['source'].nunique(),
+            'keywords': cube['keyword'].nunique(),
+            'sent': sent,
+            'unsent': total - sent,
+            'api': api,
+            'scraping': total - api,
+            'last_7_days': int(cube.loc[cube['date'] >= today - timedelta(days=7), 'n'].sum()),
+            'last_30_days': int(cube.loc[cube['date'] >= today - timedelta(days=30), 'n'].sum())
+        }
+    
+    def benchmark_cube(self, repeats=3):
+        """Compare the aggregations of a complete analysis: per-chart groupby on rows vs one cube"""
+        if self.df is None:
+            print("Benchmark needs loaded rows (not available in pushdown mode).")
+            return None
+        
+        def direct():
+            for period, dimension, article_type in ANALYSIS_SLICES:
+                frame = self.df if article_type is None else self.df[self.df['article_type'] == article_type]
+                if period is not None and period not in frame.columns:
+                    frame = frame.assign(**{period: self.date_part(period, frame)})
+                self.aggregate_counts(frame, period, dimension)
+        
+        def cubed():
+            self.cube = None
+            for period, dimension, article_type in ANALYSIS_SLICES:
+                self.count_by(period, dimension, article_type)
+        
+        results = {}
+        for label, run in (('per-chart groupby', direct), ('shared cube', cubed)):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            results[label] = min(timings)
+        
+        print(f"\n⏱️  Aggregations for a complete analysis ({len(ANALYSIS_SLICES)} slices, {len(self.df)} articles)")
+        for label, seconds in results.items():
+            print(f"{label:>20}: {seconds * 1000:.1f} ms")
+        print(f"{'cube size':>20}: {len(self.cube)} cells")
+        return results
+    
+    def benchmark_memory(self):
+        """Report peak RSS growth of a full (uncached) load with the standard and the compact loader"""
+        compact = self.compact
+        results = {}
+        resettable = True
+        connection = self.storage.connect()
+        try:
+            for label, use_compact in (('standard', False), ('compact', True)):
+                self.compact = use_compact
+                resettable = reset_peak_rss()
+                baseline = peak_rss_mb()
+                start = time.perf_counter()
+                raw_df = self.fetch_articles(connection, columns=self.article_columns())
+                df = self.prepare_compact_dataframe(raw_df) if use_compact else self.prepare_dataframe(raw_df)
+                del raw_df
+                elapsed = time.perf_counter() - start
+                peak = peak_rss_mb()
+                results[label] = {
+                    'rows': len(df),
+                    'seconds': elapsed,
+                    'peak_mb': None if peak is None else peak - baseline,
+                    'baseline_mb': baseline,
+                    'frame_mb': df.memory_usage(deep=True).sum() / 1024 ** 2
+                }
+                del df
+        finally:
+            self.compact = compact
+            connection.close()
+        
+        print(f"\n🧠 Loader memory ({results['standard']['rows']} articles)")
+        for label, result in results.items():
+            print(f"{label:>10}: {format_peak_rss(result)}, DataFrame {result['frame_mb']:.1f} MB, "
+                  f"{result['seconds']:.2f}s")
+        if not resettable:
+            print("Peak RSS cannot be reset on this platform, so later runs include earlier peaks")
+        return results
+    
+    def benchmark_loader(self, synthetic_rows=0):
+        """Peak memory of the fetchall loader vs the chunked loader.
+        
+        With synthetic_rows a temporary table of that many generated articles is used
+        (and dropped afterwards) instead of the real articles table.
+        """
+        connection = self.storage.connect()
+        table = 'articles'
+        results = {}
+        resettable = True
+        try:
+            if synthetic_rows:
+                print(f"Creating {synthetic_rows} synthetic articles in {BENCHMARK_TABLE}...")
+                self.storage.create_synthetic_articles(connection, BENCHMARK_TABLE, synthetic_rows)
+                table = BENCHMARK_TABLE
+            
+            for label, loader in (('fetchall', self.fetch_articles_buffered), ('chunked', self.fetch_articles)):
+                resettable = reset_peak_rss()
+                baseline = peak_rss_mb()
+                start = time.perf_counter()
+                df = loader(connection, table=table)
+                elapsed = time.perf_counter() - start
+                peak = peak_rss_mb()
+                results[label] = {
+                    'rows': len(df),
+                    'seconds': elapsed,
+                    'peak_mb': None if peak is None else peak - baseline,
+                    'baseline_mb': baseline,
+                    'frame_mb': df.memory_usage(deep=True).sum() / 1024 ** 2
+                }
+                del df
+        finally:
+            if synthetic_rows:
+                cursor = connection.cursor()
+                cursor.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+                cursor.close()
+            connection.close()
+        
+        print(f"\n🧠 Loader peak memory ({results['fetchall']['rows']} articles, chunks of {self.chunk_size})")
+        for label, result in results.items():
+            print(f"{label:>10}: {format_peak_rss(result)}, DataFrame {result['frame_mb']:.1f} MB, "
+                  f"{result['seconds']:.2f}s")
+        if not resettable:
+            print("Peak RSS cannot be reset on this platform, so later runs include earlier peaks")
+        return results
+    
+    def connect_and_fetch_data(self, use_cache=True, include_text=False):
+        """Connect to database and fetch all articles data (incrementally when a cache is configured).
+        
+        include_text keeps the heading and link columns in compact mode.
+        """
+        self.cube = None
+        
+        if self.pushdown:
+            try:
+                stats = self.summary_stats()
+            except STORAGE_ERRORS as e:
+                print(f"Error connecting to database: {e}")
+                return False
+            if not stats['total']:
                 print("No data found in database!")
                 return False
+            print(f"Aggregation pushdown: {stats['total']} articles summarised in {self.storage.describe()} "
+                  f"into {len(self.cube)} cube cells in {self.cube_build_seconds:.2f}s")
+            print(f"Date range: {stats['date_min']} to {stats['date_max']}")
+            print(f"API articles: {stats['api']}")
+            print(f"Scraping articles: {stats['scraping']}")
+            return True
+        
+        connection = None
+        try:
+            start = time.perf_counter()
+            connection = self.storage.connect()
+            columns = self.article_columns(include_text)
+            raw_df = self.load_raw_articles(connection, use_cache, columns)
             
-            # Use published_date if available, otherwise use date_created
-            self.df['effective_date'] = pd.to_datetime(
-                self.df['published_date'].fillna(self.df['date_created'])
-            )
-            
-            # Convert other date columns
-            self.df['date_created'] = pd.to_datetime(self.df['date_created'])
-            self.df['date_updated'] = pd.to_datetime(self.df['date_updated'])
+            archived = self.load_archived_articles(columns)
+            if archived is not None:
+                print(f"Loaded {len(archived)} archived articles from {len(self.archive_files())} archive file(s)")
+                raw_df = pd.concat([archived, raw_df], ignore_index=True)
             
-            # Identify if article is from API or Scraping
-            self.df['article_type'] = self.df['source'].apply(
-                lambda x: 'API' if 'NewsAPI' in str(x) else 'Scraping'
-            )
+            if raw_df.empty:
+                self.df = raw_df
+                print("No data found in database!")
+                return False
             
-            # Extract date components
-            self.df['date'] = self.df['effective_date'].dt.date
-            self.df['week'] = self.df['effective_date'].dt.to_period('W')
-            self.df['month'] = self.df['effective_date'].dt.to_period('M')
-            self.df['year'] = self.df['effective_date'].dt.year
-            self.df['day_name'] = self.df['effective_date'].dt.day_name()
+            if self.compact:
+                self.df = self.prepare_compact_dataframe(raw_df)
+            else:
+                self.df = self.prepare_dataframe(raw_df)
             
-            print(f"Successfully loaded {len(self.df)} articles from database")
+            print(f"Successfully loaded {len(self.df)} articles from database in {time.perf_counter() - start:.2f}s")
             print(f"Date range: {self.df['effective_date'].min()} to {self.df['effective_date'].max()}")
             print(f"API articles: {len(self.df[self.df['article_type']=='API'])}")
             print(f"Scraping articles: {len(self.df[self.df['article_type']=='Scraping'])}")
             
             return True
             
-        except Error as e:
+        except STORAGE_ERRORS as e:
             print(f"Error connecting to database: {e}")
             return False
         finally:
             if connection and connection.is_connected():
-                cursor.close()
                 connection.close()
     
+    def data_fingerprint(self):
+        """Cheap fingerprint of the articles table: max(date_updated), row count, keyword and source sets"""
+        (max_updated, total), = self.run_query(FINGERPRINT_TOTALS_SQL)
+        keywords = [row[0] for row in self.run_query(FINGERPRINT_KEYWORDS_SQL)]
+        sources = [row[0] for row in self.run_query(FINGERPRINT_SOURCES_SQL)]
+        archives = [os.path.basename(path) for path in self.archive_files()]
+        payload = json.dumps([str(max_updated), int(total), keywords, sources, archives])
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+    
+    def hot_queries(self):
+        """The analytics queries as (label, query, params, expected access) for check_query_plans"""
+        return [
+            ('pushdown cube', CUBE_SQL, (2 ** 31 - 1,), 'covering'),
+            ('fingerprint totals', FINGERPRINT_TOTALS_SQL, (), 'covering'),
+            ('fingerprint keywords', FINGERPRINT_KEYWORDS_SQL, (), 'covering'),
+            ('fingerprint sources', FINGERPRINT_SOURCES_SQL, (), 'covering'),
+            ('incremental refresh', *self.article_query(since=pd.Timestamp.now()), 'seek'),
+            ('trend refresh', *self.article_query(TREND_COLUMNS, after_id=0), 'seek'),
+        ]
+    
+    def check_query_plans(self, show_all=True, min_rows=PLAN_CHECK_MIN_ROWS):
+        """EXPLAIN the analytics queries and print their plans (only regressed ones unless show_all).
+        
+        Scans estimated below min_rows rows are not regressions. Returns the number of regressed
+        queries, or None when the check could not run.
+        """
+        try:
+            report = check_query_plans(self.storage, self.hot_queries(), min_rows)
+        except STORAGE_ERRORS as e:
+            print(f"Error checking query plans: {e}")
+            return None
+        for label, plan, problems in report:
+            if not (show_all or problems):
+                continue
+            print(f"{'REGRESSED' if problems else 'ok':<9} {label}: {plan}")
+            for problem in problems:
+                print(f"          - {problem}")
+        return sum(1 for _, _, problems in report if problems)
+    
+    def render_cache_dir(self):
+        """Directory holding cached charts, summary text and workbooks"""
+        return os.path.join(self.cache_dir, 'render')
+    
+    def begin_render_cache(self):
+        """Fingerprint the table and load the render cache manifest; False when caching is unavailable"""
+        if not self.cache_dir:
+            return False
+        try:
+            self.fingerprint = self.data_fingerprint()
+        except STORAGE_ERRORS as e:
+            print(f"Render cache disabled ({e})")
+            return False
+        
+        self.render_manifest = {}
+        path = os.path.join(self.render_cache_dir(), 'manifest.json')
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.render_manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring render cache manifest ({e})")
+        return True
+    
+    def save_render_manifest(self):
+        """Write the render cache manifest (atomic replace)"""
+        if self.render_manifest is None:
+            return
+        os.makedirs(self.render_cache_dir(), exist_ok=True)
+        path = os.path.join(self.render_cache_dir(), 'manifest.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.render_manifest, f, indent=2, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+    
+    def slice_key(self, inputs, params=()):
+        """Hash of the count slices (and parameters) an output is drawn from"""
+        digest = hashlib.sha256(repr(list(params)).encode())
+        for item in inputs:
+            if item == 'stats':
+                digest.update(repr(sorted(self.summary_stats().items())).encode())
+            else:
+                digest.update(repr(item).encode())
+                digest.update(self.count_by(*item).to_csv().encode())
+        return digest.hexdigest()
+    
+    def render_cache_entry(self, section, name, inputs, params=(), requires=()):
+        """Cached entry for an output whose inputs are unchanged, or None.
+        
+        An entry is valid while the data fingerprint is unchanged; once data is loaded it
+        also stays valid if the count slices it was drawn from are identical.
+        """
+        if self.render_manifest is None:
+            return None
+        entry = self.render_manifest.get(section, {}).get(name)
+        if entry is None or entry['params'] != list(params):
+            return None
+        if any(field not in entry or (entry[field] and not os.path.exists(entry[field])) for field in requires):
+            return None
+        
+        if entry['fingerprint'] == self.fingerprint:
+            return entry
+        if (self.df is not None or self.cube is not None) and entry['key'] == self.slice_key(inputs, params):
+            entry['fingerprint'] = self.fingerprint
+            return entry
+        return None
+    
+    def store_render_cache(self, section, name, inputs, params=(), **values):
+        """Record a freshly produced output, keeping artifacts already cached for the same inputs"""
+        if self.render_manifest is None:
+            return
+        key = self.slice_key(inputs, params)
+        entries = self.render_manifest.setdefault(section, {})
+        entry = entries.get(name)
+        if entry is None or entry['key'] != key or entry['params'] != list(params):
+            entry = entries[name] = {}
+        entry.update(fingerprint=self.fingerprint, key=key, params=list(params), **values)
+    
+    def chart_requirements(self, save_path, pdf_path):
+        """Cached artifacts a chart needs: a PNG when saving plots, a pickled figure for the PDF"""
+        return (['png'] if save_path else []) + (['figure'] if pdf_path else [])
+    
+    def report_cached(self, save_path, pdf_path):
+        """True when the summary and every chart can be served from cache without loading data"""
+        if self.render_manifest is None:
+            return False
+        if self.render_cache_entry('summary', 'report', SUMMARY_INPUTS, [str(datetime.now().date())]) is None:
+            return False
+        requires = self.chart_requirements(save_path, pdf_path)
+        return all(
+            self.render_cache_entry('charts', method, CHART_INPUTS[method], [self.dpi], requires)
+            for method, name, title in CHARTS
+        )
+    
+    def draw_chart(self, method, name, save_path=None):
+        """Draw one chart, or copy its PNG from the render cache when its inputs are unchanged"""
+        if not save_path or self.render_manifest is None:
+            getattr(self, method)(save_path)
+            return
+        
+        entry = self.render_cache_entry('charts', method, CHART_INPUTS[method], [self.dpi], ['png'])
+        if entry is None:
+            prefix = os.path.join(self.render_cache_dir(), 'chart')
+            os.makedirs(self.render_cache_dir(), exist_ok=True)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                getattr(self, method)(prefix)
+            png = f"{prefix}_{name}.png"
+            entry = {'png': png if os.path.exists(png) else None, 'output': output.getvalue()}
+            self.store_render_cache('charts', method, CHART_INPUTS[method], [self.dpi], **entry)
+        else:
+            print("(served from cache)")
+        
+        print(entry['output'], end='')
+        if entry['png']:
+            shutil.copyfile(entry['png'], f"{save_path}_{name}.png")
+    
+    def finish_figure(self, save_path, name):
+        """Save the current figure as PNG and show it (unless headless)"""
+        if save_path:
+            plt.savefig(f"{save_path}_{name}.png", dpi=self.dpi, bbox_inches='tight')
+        if not self.headless:
+            plt.show()
+    
+    def render_charts(self, pdf_path, save_path=None, workers=None):
+        """Render all charts headless in a process pool and write them into one multi-page PDF.
+        
+        Charts whose inputs are unchanged are taken from the render cache instead.
+        """
+        workers = workers or os.cpu_count()
+        plt.switch_backend('Agg')
+        start = time.perf_counter()
+        requires = self.chart_requirements(save_path, pdf_path)
+        cache_dir = self.render_cache_dir() if self.render_manifest is not None else None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker) as pool:
+            jobs = []
+            for method, name, title in CHARTS:
+                entry = self.render_cache_entry('charts', method, CHART_INPUTS[method], [self.dpi], requires)
+                if entry is None:
+                    prefix = os.path.join(cache_dir, 'chart') if cache_dir and save_path else save_path
+                    entry = pool.submit(render_chart, self.get_cube(), method, prefix, self.dpi)
+                jobs.append((method, name, title, entry))
+            
+            timings = {}
+            with PdfPages(pdf_path) as pdf:
+                for method, name, title, job in jobs:
+                    if isinstance(job, dict):
+                        fig = None
+                        if job['figure']:
+                            with open(job['figure'], 'rb') as f:
+                                fig = pickle.load(f)
+                        output, seconds = job['output'], None
+                        png = job.get('png')
+                    else:
+                        fig, output, seconds = job.result()
+                        png = None
+                        if cache_dir:
+                            png = os.path.join(cache_dir, f"chart_{name}.png") if save_path else None
+                            figure = os.path.join(cache_dir, f"chart_{name}.fig.pkl") if fig is not None else None
+                            if figure:
+                                with open(figure, 'wb') as f:
+                                    pickle.dump(fig, f)
+                            values = {'figure': figure, 'output': output}
+                            if save_path:
+                                values['png'] = png if os.path.exists(png) else None
+                                png = values['png']
+                            self.store_render_cache('charts', method, CHART_INPUTS[method], [self.dpi], **values)
+                    
+                    print(output, end='')
+                    if png and save_path:
+                        shutil.copyfile(png, f"{save_path}_{name}.png")
+                    if fig is not None:
+                        pdf.savefig(fig, bbox_inches='tight')
+                        plt.close(fig)
+                    timings[title] = seconds
+        
+        print(f"\n⏱️  Chart render times ({len(CHARTS)} charts, {workers} workers)")
+        for title, seconds in timings.items():
+            print(f"{title:>40}: {'cached' if seconds is None else f'{seconds:.2f}s'}")
+        print(f"{'Wall clock':>40}: {time.perf_counter() - start:.2f}s")
+        print(f"\n📄 Charts written to {pdf_path}")
+        return timings
+    
     def plot_articles_by_source(self, save_path=None):
         """1. Count of Articles from sources"""
         plt.figure(figsize=(14, 8))
         
-        source_counts = self.df['source'].value_counts().head(15)
+        source_counts = self.count_by(None, 'source').head(15)
         
         colors = plt.cm.Set3(range(len(source_counts)))
         bars = plt.barh(range(len(source_counts)), source_counts.values, color=colors)
@@ -110,9 +1037,7 @@ class NewsDataAnalyzer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(f"{save_path}_source_count.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'source_count')
         
         print("\n=== Articles by Source ===")
         print(source_counts)
@@ -122,7 +1047,7 @@ class NewsDataAnalyzer:
         fig, axes = plt.subplots(1, 2, figsize=(16, 6))
         
         # Bar chart
-        keyword_counts = self.df['keyword'].value_counts()
+        keyword_counts = self.count_by(None, 'keyword')
         colors = plt.cm.tab20(range(len(keyword_counts)))
         
         axes[0].barh(range(len(keyword_counts)), keyword_counts.values, color=colors)
@@ -164,9 +1089,7 @@ class NewsDataAnalyzer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(f"{save_path}_keyword_count.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'keyword_count')
         
         print("\n=== Articles by Keyword ===")
         print(keyword_counts)
@@ -176,7 +1099,7 @@ class NewsDataAnalyzer:
         fig, axes = plt.subplots(2, 1, figsize=(16, 12))
         
         # Monthly averages by keyword
-        monthly_keyword = self.df.groupby(['month', 'keyword']).size().unstack(fill_value=0)
+        monthly_keyword = self.count_by('month', 'keyword')
         
         monthly_keyword.plot(kind='bar', ax=axes[0], width=0.8)
         axes[0].set_xlabel('Month', fontsize=11, fontweight='bold')
@@ -187,7 +1110,7 @@ class NewsDataAnalyzer:
         axes[0].tick_params(axis='x', rotation=45)
         
         # Weekly averages by keyword (last 12 weeks)
-        weekly_keyword = self.df.groupby(['week', 'keyword']).size().unstack(fill_value=0)
+        weekly_keyword = self.count_by('week', 'keyword')
         weekly_keyword_recent = weekly_keyword.tail(12)
         
         weekly_keyword_recent.plot(kind='bar', ax=axes[1], width=0.8)
@@ -200,9 +1123,7 @@ class NewsDataAnalyzer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(f"{save_path}_monthly_weekly_avg.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'monthly_weekly_avg')
         
         print("\n=== Monthly Keyword Statistics ===")
         print(monthly_keyword)
@@ -211,16 +1132,15 @@ class NewsDataAnalyzer:
     
     def plot_api_keywords_analysis(self, save_path=None):
         """4. API related charts - keywords extracted from API"""
-        api_df = self.df[self.df['article_type'] == 'API'].copy()
+        daily_api = self.count_by('date', 'keyword', article_type='API')
         
-        if api_df.empty:
+        if daily_api.empty:
             print("No API articles found!")
             return
         
         fig, axes = plt.subplots(3, 1, figsize=(16, 14))
         
         # Daily basis
-        daily_api = api_df.groupby(['date', 'keyword']).size().unstack(fill_value=0)
         daily_api_recent = daily_api.tail(30)
         
         daily_api_recent.plot(kind='line', ax=axes[0], marker='o', markersize=4, linewidth=2)
@@ -232,7 +1152,7 @@ class NewsDataAnalyzer:
         axes[0].tick_params(axis='x', rotation=45)
         
         # Weekly basis
-        weekly_api = api_df.groupby(['week', 'keyword']).size().unstack(fill_value=0)
+        weekly_api = self.count_by('week', 'keyword', article_type='API')
         weekly_api_recent = weekly_api.tail(12)
         
         weekly_api_recent.plot(kind='bar', ax=axes[1], width=0.8)
@@ -244,7 +1164,7 @@ class NewsDataAnalyzer:
         axes[1].tick_params(axis='x', rotation=45)
         
         # Monthly basis
-        monthly_api = api_df.groupby(['month', 'keyword']).size().unstack(fill_value=0)
+        monthly_api = self.count_by('month', 'keyword', article_type='API')
         
         monthly_api.plot(kind='bar', ax=axes[2], width=0.8)
         axes[2].set_xlabel('Month', fontsize=11, fontweight='bold')
@@ -256,25 +1176,22 @@ class NewsDataAnalyzer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(f"{save_path}_api_keywords.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'api_keywords')
         
         print("\n=== API Articles - Daily Keywords (Last 30 days) ===")
         print(daily_api_recent)
     
     def plot_scraping_keywords_analysis(self, save_path=None):
         """5. Scraping related charts - keywords extracted through scraping"""
-        scraping_df = self.df[self.df['article_type'] == 'Scraping'].copy()
+        daily_scraping = self.count_by('date', 'keyword', article_type='Scraping')
         
-        if scraping_df.empty:
+        if daily_scraping.empty:
             print("No Scraping articles found!")
             return
         
         fig, axes = plt.subplots(3, 1, figsize=(16, 14))
         
         # Daily basis
-        daily_scraping = scraping_df.groupby(['date', 'keyword']).size().unstack(fill_value=0)
         daily_scraping_recent = daily_scraping.tail(30)
         
         daily_scraping_recent.plot(kind='line', ax=axes[0], marker='s', markersize=4, linewidth=2)
@@ -286,7 +1203,7 @@ class NewsDataAnalyzer:
         axes[0].tick_params(axis='x', rotation=45)
         
         # Weekly basis
-        weekly_scraping = scraping_df.groupby(['week', 'keyword']).size().unstack(fill_value=0)
+        weekly_scraping = self.count_by('week', 'keyword', article_type='Scraping')
         weekly_scraping_recent = weekly_scraping.tail(12)
         
         weekly_scraping_recent.plot(kind='bar', ax=axes[1], width=0.8)
@@ -298,7 +1215,7 @@ class NewsDataAnalyzer:
         axes[1].tick_params(axis='x', rotation=45)
         
         # Monthly basis
-        monthly_scraping = scraping_df.groupby(['month', 'keyword']).size().unstack(fill_value=0)
+        monthly_scraping = self.count_by('month', 'keyword', article_type='Scraping')
         
         monthly_scraping.plot(kind='bar', ax=axes[2], width=0.8)
         axes[2].set_xlabel('Month', fontsize=11, fontweight='bold')
@@ -310,9 +1227,7 @@ class NewsDataAnalyzer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(f"{save_path}_scraping_keywords.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'scraping_keywords')
         
         print("\n=== Scraping Articles - Daily Keywords (Last 30 days) ===")
         print(daily_scraping_recent)
@@ -322,7 +1237,7 @@ class NewsDataAnalyzer:
         fig, axes = plt.subplots(3, 1, figsize=(16, 14))
         
         # Daily basis
-        daily_comparison = self.df.groupby(['date', 'article_type']).size().unstack(fill_value=0)
+        daily_comparison = self.count_by('date', 'article_type')
         daily_comparison_recent = daily_comparison.tail(30)
         
         daily_comparison_recent.plot(kind='line', ax=axes[0], marker='o', markersize=5, linewidth=2.5)
@@ -340,7 +1255,7 @@ class NewsDataAnalyzer:
                              alpha=0.3, label='_nolegend_')
         
         # Weekly basis
-        weekly_comparison = self.df.groupby(['week', 'article_type']).size().unstack(fill_value=0)
+        weekly_comparison = self.count_by('week', 'article_type')
         weekly_comparison_recent = weekly_comparison.tail(12)
         
         x = np.arange(len(weekly_comparison_recent))
@@ -370,7 +1285,7 @@ class NewsDataAnalyzer:
                                ha='center', va='bottom', fontsize=8, fontweight='bold')
         
         # Monthly basis
-        monthly_comparison = self.df.groupby(['month', 'article_type']).size().unstack(fill_value=0)
+        monthly_comparison = self.count_by('month', 'article_type')
         
         x = np.arange(len(monthly_comparison))
         width = 0.35
@@ -400,13 +1315,12 @@ class NewsDataAnalyzer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(f"{save_path}_api_vs_scraping.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'api_vs_scraping')
         
+        type_counts = self.count_by(None, 'article_type')
         print("\n=== API vs Scraping - Summary ===")
-        print(f"Total API articles: {len(self.df[self.df['article_type']=='API'])}")
-        print(f"Total Scraping articles: {len(self.df[self.df['article_type']=='Scraping'])}")
+        print(f"Total API articles: {type_counts.get('API', 0)}")
+        print(f"Total Scraping articles: {type_counts.get('Scraping', 0)}")
         print("\n=== Monthly Comparison ===")
         print(monthly_comparison)
     
@@ -414,8 +1328,12 @@ class NewsDataAnalyzer:
         """7. Source wise count of articles and type of articles (based on keywords)"""
         
         # Get top 10 sources for better visualization
-        top_sources = self.df['source'].value_counts().head(10).index
-        source_filtered_df = self.df[self.df['source'].isin(top_sources)].copy()
+        top_sources = self.count_by(None, 'source').head(10).index
+        
+        def top_source_counts(period):
+            counts = self.count_by(period, 'source')
+            counts = counts[[s for s in top_sources if s in counts.columns]]
+            return counts[counts.sum(axis=1) > 0]
         
         fig = plt.figure(figsize=(20, 16))
         gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
@@ -423,7 +1341,7 @@ class NewsDataAnalyzer:
         # ============ DAILY BASIS ============
         # Daily - Source wise count
         ax1 = fig.add_subplot(gs[0, 0])
-        daily_source = source_filtered_df.groupby(['date', 'source']).size().unstack(fill_value=0)
+        daily_source = top_source_counts('date')
         daily_source_recent = daily_source.tail(30)
         
         daily_source_recent.plot(kind='line', ax=ax1, marker='o', markersize=3, linewidth=1.5, alpha=0.7)
@@ -436,12 +1354,12 @@ class NewsDataAnalyzer:
         
         # Daily - Keyword wise count
         ax2 = fig.add_subplot(gs[0, 1])
-        daily_keyword = self.df.groupby(['date', 'keyword']).size().unstack(fill_value=0)
+        daily_keyword = self.count_by('date', 'keyword')
         daily_keyword_recent = daily_keyword.tail(30)
         
         # Plot only top 10 keywords for clarity
-        top_keywords = self.df['keyword'].value_counts().head(10).index
-        daily_keyword_top = daily_keyword_recent[top_keywords]
+        top_keywords = self.count_by(None, 'keyword').head(10).index
+        daily_keyword_top = daily_keyword_recent[[k for k in top_keywords if k in daily_keyword_recent.columns]]
         
         daily_keyword_top.plot(kind='line', ax=ax2, marker='s', markersize=3, linewidth=1.5, alpha=0.7)
         ax2.set_xlabel('Date', fontsize=10, fontweight='bold')
@@ -454,7 +1372,7 @@ class NewsDataAnalyzer:
         # ============ WEEKLY BASIS ============
         # Weekly - Source wise count
         ax3 = fig.add_subplot(gs[1, 0])
-        weekly_source = source_filtered_df.groupby(['week', 'source']).size().unstack(fill_value=0)
+        weekly_source = top_source_counts('week')
         weekly_source_recent = weekly_source.tail(12)
         
         weekly_source_recent.plot(kind='bar', ax=ax3, width=0.8, stacked=True, alpha=0.8)
@@ -467,7 +1385,7 @@ class NewsDataAnalyzer:
         
         # Weekly - Keyword wise count
         ax4 = fig.add_subplot(gs[1, 1])
-        weekly_keyword = self.df.groupby(['week', 'keyword']).size().unstack(fill_value=0)
+        weekly_keyword = self.count_by('week', 'keyword')
         weekly_keyword_recent = weekly_keyword.tail(12)
         
         # Show top 10 keywords
@@ -484,7 +1402,7 @@ class NewsDataAnalyzer:
         # ============ MONTHLY BASIS ============
         # Monthly - Source wise count
         ax5 = fig.add_subplot(gs[2, 0])
-        monthly_source = source_filtered_df.groupby(['month', 'source']).size().unstack(fill_value=0)
+        monthly_source = top_source_counts('month')
         
         monthly_source.plot(kind='bar', ax=ax5, width=0.8, stacked=True, alpha=0.8)
         ax5.set_xlabel('Month', fontsize=10, fontweight='bold')
@@ -496,7 +1414,7 @@ class NewsDataAnalyzer:
         
         # Monthly - Keyword wise count
         ax6 = fig.add_subplot(gs[2, 1])
-        monthly_keyword = self.df.groupby(['month', 'keyword']).size().unstack(fill_value=0)
+        monthly_keyword = self.count_by('month', 'keyword')
         
         # Show top 10 keywords
         monthly_keyword_top = monthly_keyword[[k for k in top_keywords if k in monthly_keyword.columns]]
@@ -512,9 +1430,7 @@ class NewsDataAnalyzer:
         plt.suptitle('Source-wise and Keyword-wise Article Distribution Analysis', 
                      fontsize=16, fontweight='bold', y=0.995)
         
-        if save_path:
-            plt.savefig(f"{save_path}_source_keyword_analysis.png", dpi=300, bbox_inches='tight')
-        plt.show()
+        self.finish_figure(save_path, 'source_keyword_analysis')
         
         print("\n=== Source-wise Daily Distribution (Last 30 days - Top 10 Sources) ===")
         print(daily_source_recent)
@@ -526,102 +1442,393 @@ class NewsDataAnalyzer:
         print(monthly_keyword_top)
     
     def generate_summary_report(self):
-        """Generate a comprehensive summary report"""
+        """Generate a comprehensive summary report (served from the render cache when unchanged)"""
+        params = [str(datetime.now().date())]
+        entry = self.render_cache_entry('summary', 'report', SUMMARY_INPUTS, params)
+        if entry is None:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.print_summary_report()
+            entry = {'text': output.getvalue()}
+            self.store_render_cache('summary', 'report', SUMMARY_INPUTS, params, **entry)
+        print(entry['text'], end='')
+    
+    def print_summary_report(self):
+        """Print the summary report from the count cube"""
         print("\n" + "="*80)
         print("NEWS ARTICLES DATA ANALYSIS - SUMMARY REPORT")
         print("="*80)
         
+        stats = self.summary_stats()
+        
         print(f"\n📊 OVERALL STATISTICS")
         print(f"{'─'*80}")
-        print(f"Total Articles: {len(self.df)}")
-        print(f"Date Range: {self.df['effective_date'].min().date()} to {self.df['effective_date'].max().date()}")
-        print(f"Total Sources: {self.df['source'].nunique()}")
-        print(f"Total Keywords: {self.df['keyword'].nunique()}")
-        print(f"Sent Articles: {len(self.df[self.df['is_sent']==True])}")
-        print(f"Unsent Articles: {len(self.df[self.df['is_sent']==False])}")
+        print(f"Total Articles: {stats['total']}")
+        print(f"Date Range: {stats['date_min'].date()} to {stats['date_max'].date()}")
+        print(f"Total Sources: {stats['sources']}")
+        print(f"Total Keywords: {stats['keywords']}")
+        print(f"Sent Articles: {stats['sent']}")
+        print(f"Unsent Articles: {stats['unsent']}")
         
         print(f"\n📈 ARTICLE TYPE BREAKDOWN")
         print(f"{'─'*80}")
-        type_counts = self.df['article_type'].value_counts()
+        type_counts = self.count_by(None, 'article_type')
         for article_type, count in type_counts.items():
-            percentage = (count / len(self.df)) * 100
+            percentage = (count / stats['total']) * 100
             print(f"{article_type}: {count} ({percentage:.1f}%)")
         
         print(f"\n🔑 TOP 5 KEYWORDS")
         print(f"{'─'*80}")
-        top_keywords = self.df['keyword'].value_counts().head(5)
+        top_keywords = self.count_by(None, 'keyword').head(5)
         for i, (keyword, count) in enumerate(top_keywords.items(), 1):
             print(f"{i}. {keyword}: {count} articles")
         
         print(f"\n📰 TOP 5 SOURCES")
         print(f"{'─'*80}")
-        top_sources = self.df['source'].value_counts().head(5)
+        top_sources = self.count_by(None, 'source').head(5)
         for i, (source, count) in enumerate(top_sources.items(), 1):
             print(f"{i}. {source}: {count} articles")
         
         print(f"\n📅 RECENT ACTIVITY")
         print(f"{'─'*80}")
-        last_7_days = self.df[self.df['effective_date'] >= (datetime.now() - timedelta(days=7))]
-        print(f"Articles in last 7 days: {len(last_7_days)}")
-        print(f"Daily average (last 7 days): {len(last_7_days)/7:.1f}")
+        print(f"Articles in last 7 days: {stats['last_7_days']}")
+        print(f"Daily average (last 7 days): {stats['last_7_days']/7:.1f}")
         
-        last_30_days = self.df[self.df['effective_date'] >= (datetime.now() - timedelta(days=30))]
-        print(f"Articles in last 30 days: {len(last_30_days)}")
-        print(f"Daily average (last 30 days): {len(last_30_days)/30:.1f}")
+        print(f"Articles in last 30 days: {stats['last_30_days']}")
+        print(f"Daily average (last 30 days): {stats['last_30_days']/30:.1f}")
         
         print(f"\n{'='*80}")
     
-    def run_complete_analysis(self, save_plots=False, save_path="news_analysis"):
-        """Run all analysis and generate all plots"""
+    @staticmethod
+    def trend_stats(counts, window=TREND_WINDOW_DAYS):
+        """Rolling baseline, ratio and z-score for a daily count matrix (dates x series), all series at once.
+        
+        The baseline covers the window days before each date, so a spike is not part of its own
+        baseline. The standard deviation is floored at one article/day to keep sparse series quiet.
+        """
+        history = counts.shift(1).rolling(window, min_periods=TREND_MIN_PERIODS)
+        baseline = history.mean()
+        spread = np.maximum(history.std(), 1.0)
+        return {
+            'count': counts,
+            'baseline': baseline,
+            'ratio': counts / baseline.where(baseline > 0),
+            'z': (counts - baseline) / spread
+        }
+    
+    def daily_series(self, dimension):
+        """Daily article counts per dimension value, with zero-filled gaps (dates x values)"""
+        counts = self.count_by('date', dimension)
+        counts.index = pd.to_datetime(counts.index)
+        return counts.asfreq('D', fill_value=0)
+    
+    def build_trends(self, dimensions=TREND_DIMENSIONS):
+        """Compute rolling rates and spike z-scores per keyword and per source over the whole history"""
+        for dimension in dimensions:
+            self.trend_counts[dimension] = self.daily_series(dimension)
+            self.trends[dimension] = self.trend_stats(self.trend_counts[dimension])
+        # Highest article id counted by the cube (MAX(id) in pushdown mode, where no rows are loaded)
+        self.trend_last_id = self.cube_last_id
+        return self.trends
+    
+    def update_trends(self, rows):
+        """Fold newly arrived articles into the trend state, recomputing only the affected tail.
+        
+        rows needs id, keyword, source and published_date/date_created (or effective_date).
+        """
+        if rows.empty:
+            return self.trends
+        if 'effective_date' in rows.columns:
+            dates = pd.to_datetime(rows['effective_date'])
+        else:
+            dates = pd.to_datetime(rows['published_date']).fillna(pd.to_datetime(rows['date_created']))
+        dates = dates.dt.normalize()
+        
+        for dimension in self.trend_counts:
+            new_counts = rows.groupby([dates, rows[dimension]], observed=True).size().unstack(fill_value=0)
+            counts = self.trend_counts[dimension]
+            index = pd.date_range(min(counts.index.min(), new_counts.index.min()),
+                                  max(counts.index.max(), new_counts.index.max()), freq='D')
+            columns = counts.columns.union(new_counts.columns)
+            counts = counts.reindex(index=index, columns=columns, fill_value=0).add(
+                new_counts.reindex(index=index, columns=columns, fill_value=0)
+            )
+            self.trend_counts[dimension] = counts
+            
+            if len(columns) > len(self.trends[dimension]['count'].columns):
+                # A new keyword/source has no earlier state to extend
+                self.trends[dimension] = self.trend_stats(counts)
+                continue
+            
+            # Only dates from the first new day onwards change; recompute them from a window-sized lead-in
+            first = new_counts.index.min()
+            tail = self.trend_stats(counts.loc[first - pd.Timedelta(days=TREND_WINDOW_DAYS):])
+            previous = self.trends[dimension]
+            self.trends[dimension] = {
+                name: pd.concat([
+                    previous[name].loc[:first - pd.Timedelta(days=1)],
+                    frame.loc[first:]
+                ])
+                for name, frame in tail.items()
+            }
+        
+        self.trend_last_id = max(self.trend_last_id or 0, int(rows['id'].max()))
+        return self.trends
+    
+    def refresh_trends(self):
+        """Fetch articles added since the trend state was built and fold them in"""
+        if self.trend_last_id is None:
+            raise RuntimeError("refresh_trends() needs trends from build_trends() to extend")
+        connection = self.storage.connect()
+        try:
+            rows = self.fetch_articles(connection, columns=TREND_COLUMNS, after_id=self.trend_last_id)
+        finally:
+            connection.close()
+        return self.update_trends(rows)
+    
+    def spikes(self, dimension='keyword', threshold=SPIKE_Z_THRESHOLD, min_count=SPIKE_MIN_COUNT, since=None):
+        """Days on which a dimension value spiked above its rolling baseline, strongest first"""
+        trend = self.trends[dimension]
+        frames = {name: frame.stack() for name, frame in trend.items()}
+        table = pd.DataFrame(frames)
+        table.index.names = ['date', dimension]
+        table = table[(table['z'] >= threshold) & (table['count'] >= min_count)]
+        if since is not None:
+            table = table[table.index.get_level_values('date') >= pd.Timestamp(since)]
+        return table.sort_values('z', ascending=False)
+    
+    def trend_signals(self, date=None, threshold=SPIKE_Z_THRESHOLD, min_count=SPIKE_MIN_COUNT):
+        """One-line spike signals for a day (default: the latest day), e.g. for a digest or alert"""
+        signals = []
+        for dimension in self.trends:
+            counts = self.trends[dimension]['count']
+            day = pd.Timestamp(date) if date is not None else counts.index.max()
+            table = self.spikes(dimension, threshold, min_count, since=day)
+            for (spike_day, value), row in table.iterrows():
+                if spike_day != day:
+                    continue
+                change = f"{row['ratio']:.1f}x" if pd.notna(row['ratio']) else "up from nothing"
+                signals.append(
+                    f"{value} coverage {change} on {day.date()} ({int(row['count'])} articles vs "
+                    f"{row['baseline']:.1f}/day over {TREND_WINDOW_DAYS} days, z={row['z']:.1f})"
+                )
+        return signals
+    
+    def print_trend_report(self, days=30):
+        """Print recent keyword/source spikes and the latest day's signals"""
+        start = time.perf_counter()
+        self.build_trends()
+        elapsed = time.perf_counter() - start
+        
+        print("\n" + "="*80)
+        print("TREND AND SPIKE REPORT")
+        print("="*80)
+        for dimension in self.trends:
+            counts = self.trends[dimension]['count']
+            since = counts.index.max() - pd.Timedelta(days=days - 1)
+            recent = self.spikes(dimension, since=since)
+            print(f"\n📈 {dimension.upper()} SPIKES (last {days} days, z >= {SPIKE_Z_THRESHOLD})")
+            print(f"{'─'*80}")
+            if recent.empty:
+                print("No spikes")
+            else:
+                print(recent.head(20).round(2))
+        
+        print(f"\n🚨 LATEST SIGNALS")
+        print(f"{'─'*80}")
+        for signal in self.trend_signals() or ["No spikes on the latest day"]:
+            print(signal)
+        
+        days_covered = len(next(iter(self.trend_counts.values())))
+        print(f"\nTrends computed over {days_covered} days in {elapsed * 1000:.1f} ms")
+        print(f"{'='*80}")
+    
+    def run_complete_analysis(self, save_plots=False, save_path="news_analysis", pdf_path=None, workers=None):
+        """Run all analysis and generate all plots.
+        
+        With pdf_path the charts are rendered headless in parallel into that PDF instead.
+        """
         print("\n🚀 Starting Complete Data Analysis...\n")
+        start = time.perf_counter()
         
-        if not self.connect_and_fetch_data():
+        use_cache = (save_plots or pdf_path) and self.begin_render_cache()
+        if use_cache and self.report_cached(save_path if save_plots else None, pdf_path):
+            print(f"♻️  Articles unchanged since the last run (fingerprint {self.fingerprint}), serving report from cache")
+        elif not self.connect_and_fetch_data():
             print("Failed to load data. Exiting...")
             return
+        else:
+            self.get_cube()
+            print(f"Aggregate cube: {len(self.cube)} cells built in {self.cube_build_seconds:.3f}s")
         
         # Generate summary report first
         self.generate_summary_report()
         
         print("\n📊 Generating visualizations...")
         
-        # Generate all plots
-        print("\n1️⃣  Generating: Articles by Source...")
-        self.plot_articles_by_source(save_path if save_plots else None)
-        
-        print("\n2️⃣  Generating: Articles by Keyword...")
-        self.plot_articles_by_keyword(save_path if save_plots else None)
+        if pdf_path:
+            self.render_charts(pdf_path, save_path if save_plots else None, workers)
+        else:
+            # Generate all plots
+            for number, (method, name, title) in enumerate(CHARTS, 1):
+                print(f"\n{number}\ufe0f\u20e3  Generating: {title}...")
+                self.draw_chart(method, name, save_path if save_plots else None)
         
-        print("\n3️⃣  Generating: Monthly and Weekly Averages...")
-        self.plot_monthly_weekly_averages(save_path if save_plots else None)
+        if use_cache:
+            self.save_render_manifest()
         
-        print("\n4️⃣  Generating: API Keywords Analysis...")
-        self.plot_api_keywords_analysis(save_path if save_plots else None)
+        print(f"\n✅ Analysis Complete! ({time.perf_counter() - start:.2f}s)")
         
-        print("\n5️⃣  Generating: Scraping Keywords Analysis...")
-        self.plot_scraping_keywords_analysis(save_path if save_plots else None)
+        if save_plots:
+            print(f"\n💾 All plots have been saved with prefix: {save_path}_*.png")
+    
+    def write_xlsx_stream(self, filename, chunks):
+        """Write streamed rows to xlsx in constant-memory mode, starting a new sheet at Excel's row limit"""
+        import xlsxwriter
+        
+        workbook = xlsxwriter.Workbook(filename, {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        header_format = workbook.add_format({'bold': True})
+        sheets = 0
+        row = EXCEL_MAX_ROWS
+        total = 0
         
-        print("\n6️⃣  Generating: API vs Scraping Comparison...")
-        self.plot_api_vs_scraping_comparison(save_path if save_plots else None)
+        try:
+            for chunk in chunks:
+                for values in chunk:
+                    if row == EXCEL_MAX_ROWS:
+                        sheets += 1
+                        sheet = workbook.add_worksheet('Raw Data' if sheets == 1 else f'Raw Data {sheets}')
+                        sheet.write_row(0, 0, ARTICLE_COLUMNS, header_format)
+                        row = 1
+                    sheet.write_row(row, 0, values)
+                    row += 1
+                total += len(chunk)
+            if sheets == 0:
+                workbook.add_worksheet('Raw Data').write_row(0, 0, ARTICLE_COLUMNS, header_format)
+                sheets = 1
+        finally:
+            workbook.close()
         
-        print("\n7️⃣  Generating: Source-wise and Keyword-wise Analysis...")
-        self.plot_source_wise_keyword_analysis(save_path if save_plots else None)
+        print(f"Wrote {sheets} sheet(s)")
+        return total
+    
+    def write_parquet_stream(self, filename, chunks):
+        """Write streamed rows to Parquet, one row group per chunk"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        timestamp = pa.timestamp('us')
+        schema = pa.schema([
+            ('id', pa.int64()), ('article_heading', pa.string()), ('article_link', pa.string()),
+            ('keyword', pa.string()), ('source', pa.string()), ('published_date', timestamp),
+            ('is_sent', pa.bool_()), ('date_created', timestamp), ('date_updated', timestamp)
+        ])
+        total = 0
+        
+        with pq.ParquetWriter(filename, schema) as writer:
+            for chunk in chunks:
+                values = list(zip(*chunk))
+                is_sent = ARTICLE_COLUMNS.index('is_sent')
+                values[is_sent] = [None if v is None else bool(v) for v in values[is_sent]]
+                arrays = [pa.array(column, type=field.type) for column, field in zip(values, schema)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                total += len(chunk)
+        
+        return total
+    
+    def write_csv_gz_stream(self, filename, chunks):
+        """Write streamed rows to a gzip-compressed CSV"""
+        total = 0
+        with gzip.open(filename, 'wt', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(ARTICLE_COLUMNS)
+            for chunk in chunks:
+                writer.writerows(chunk)
+                total += len(chunk)
+        return total
+    
+    def export_raw_data(self, filename, chunk_size=10000, include_archives=True):
+        """Stream every article row straight from MySQL into .xlsx, .parquet or .csv.gz.
+        
+        Rows are never collected in memory, so this works far past the size (and, for
+        xlsx, the row limit) of the in-memory Raw Data sheet. With include_archives the
+        months moved out by the retention job are streamed first, oldest month first.
+        """
+        if filename.endswith('.parquet'):
+            writer = self.write_parquet_stream
+        elif filename.endswith('.csv.gz'):
+            writer = self.write_csv_gz_stream
+        else:
+            writer = self.write_xlsx_stream
         
-        print("\n✅ Analysis Complete!")
+        archives = self.archive_files() if include_archives else []
+        print(f"\n📤 Streaming raw articles to {filename}"
+              + (f" (including {len(archives)} archived months)" if archives else ""))
+        connection = None
+        resettable = reset_peak_rss()
+        baseline = peak_rss_mb()
+        try:
+            start = time.perf_counter()
+            connection = self.storage.connect()
+            chunks = self.iter_article_rows(connection, chunk_size=chunk_size)
+            if archives:
+                chunks = itertools.chain(self.iter_archived_rows(chunk_size), chunks)
+            total = writer(filename, chunks)
+            elapsed = time.perf_counter() - start
+            peak = peak_rss_mb()
+        except STORAGE_ERRORS as e:
+            print(f"Error connecting to database: {e}")
+            return None
+        except ImportError as e:
+            print(f"Export format unavailable ({e})")
+            return None
+        finally:
+            if connection and connection.is_connected():
+                connection.close()
         
-        if save_plots:
-            print(f"\n💾 All plots have been saved with prefix: {save_path}_*.png")
+        print(f"✅ Exported {total} articles in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/sec)")
+        if peak is not None:
+            print(f"Peak RSS {'during the export' if resettable else 'since start'}: {peak:.1f} MB "
+                  f"({baseline:.1f} MB before it)")
+        return total
+    
+    def workbook_params(self):
+        """Workbook cache parameters: a Raw Data sheet ties the workbook to the exact data fingerprint"""
+        with_raw = not self.pushdown
+        return [with_raw, self.fingerprint if with_raw else None]
+    
+    def serve_cached_workbook(self, filename):
+        """Copy the cached Excel workbook to filename when its inputs are unchanged"""
+        entry = self.render_cache_entry('excel', 'workbook', WORKBOOK_INPUTS, self.workbook_params(), ['path'])
+        if entry is None or not entry['path']:
+            return False
+        shutil.copyfile(entry['path'], filename)
+        print(f"♻️  Articles unchanged since the last export, {filename} served from cache")
+        return True
     
     def export_data_to_excel(self, filename="news_articles_analysis.xlsx"):
         """Export analyzed data to Excel with multiple sheets"""
-        if self.df is None:
+        if self.df is None and not self.pushdown:
             print("No data loaded. Please run connect_and_fetch_data() first.")
             return
         
+        if self.serve_cached_workbook(filename):
+            return
+        
         print(f"\n📤 Exporting data to Excel: {filename}")
         
         with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Raw data
-            self.df.to_excel(writer, sheet_name='Raw Data', index=False)
+            # Raw data (not available in pushdown mode, which never loads rows)
+            if self.df is not None and len(self.df) < EXCEL_MAX_ROWS:
+                self.df.to_excel(writer, sheet_name='Raw Data', index=False)
+            elif self.df is not None:
+                print("Too many articles for one Raw Data sheet, skipping it (use the streaming raw export)")
+            
+            stats = self.summary_stats()
             
             # Summary statistics
             summary_data = {
@@ -637,37 +1844,44 @@ class NewsDataAnalyzer:
                     'Date Range End'
                 ],
                 'Value': [
-                    len(self.df),
-                    len(self.df[self.df['article_type']=='API']),
-                    len(self.df[self.df['article_type']=='Scraping']),
-                    self.df['source'].nunique(),
-                    self.df['keyword'].nunique(),
-                    len(self.df[self.df['is_sent']==True]),
-                    len(self.df[self.df['is_sent']==False]),
-                    str(self.df['effective_date'].min().date()),
-                    str(self.df['effective_date'].max().date())
+                    stats['total'],
+                    stats['api'],
+                    stats['scraping'],
+                    stats['sources'],
+                    stats['keywords'],
+                    stats['sent'],
+                    stats['unsent'],
+                    str(stats['date_min'].date()),
+                    str(stats['date_max'].date())
                 ]
             }
             pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
             
             # Articles by source
-            source_counts = self.df['source'].value_counts().reset_index()
+            source_counts = self.count_by(None, 'source').reset_index()
             source_counts.columns = ['Source', 'Count']
             source_counts.to_excel(writer, sheet_name='By Source', index=False)
             
             # Articles by keyword
-            keyword_counts = self.df['keyword'].value_counts().reset_index()
+            keyword_counts = self.count_by(None, 'keyword').reset_index()
             keyword_counts.columns = ['Keyword', 'Count']
             keyword_counts.to_excel(writer, sheet_name='By Keyword', index=False)
             
             # Monthly breakdown
-            monthly_breakdown = self.df.groupby(['month', 'article_type']).size().unstack(fill_value=0)
+            monthly_breakdown = self.count_by('month', 'article_type')
             monthly_breakdown.to_excel(writer, sheet_name='Monthly Breakdown')
             
             # Weekly breakdown
-            weekly_breakdown = self.df.groupby(['week', 'article_type']).size().unstack(fill_value=0)
+            weekly_breakdown = self.count_by('week', 'article_type')
             weekly_breakdown.tail(12).to_excel(writer, sheet_name='Weekly Breakdown (Recent)')
         
+        if self.render_manifest is not None:
+            os.makedirs(self.render_cache_dir(), exist_ok=True)
+            cached_path = os.path.join(self.render_cache_dir(), 'workbook.xlsx')
+            shutil.copyfile(filename, cached_path)
+            self.store_render_cache('excel', 'workbook', WORKBOOK_INPUTS, self.workbook_params(), path=cached_path)
+            self.save_render_manifest()
+        
         print(f"✅ Data exported successfully to {filename}")
 
 
@@ -689,10 +1903,29 @@ def main():
     # END OF CONFIGURATION SECTION
     # =================================================================
     
-    analyzer = NewsDataAnalyzer(MYSQL_CONFIG)
+    analyzer = NewsDataAnalyzer(
+        MYSQL_CONFIG,
+        cache_dir=os.getenv('ANALYTICS_CACHE_DIR', 'analytics_cache'),
+        pushdown=os.getenv('ANALYTICS_PUSHDOWN', 'false').lower() == 'true',
+        compact=os.getenv('ANALYTICS_COMPACT', 'false').lower() == 'true',
+        dpi=int(os.getenv('ANALYTICS_DPI', '300')),
+        archive_dir=os.getenv('ARCHIVE_DIR'),
+        storage=create_backend(os.getenv('STORAGE_BACKEND', 'mysql'), MYSQL_CONFIG, os.getenv('SQLITE_PATH'))
+    )
+    analyzer.chunk_size = int(os.getenv('ANALYTICS_CHUNK_SIZE', '50000'))
+    
+    # Opt-in: QUERY_PLAN_CHECK=fail exits with status 1 when an analytics query lost its index (see the fetcher)
+    plan_check = os.getenv('QUERY_PLAN_CHECK', 'off').lower()
+    if plan_check != 'off':
+        regressions = analyzer.check_query_plans(
+            show_all=False, min_rows=int(os.getenv('QUERY_PLAN_MIN_ROWS', str(PLAN_CHECK_MIN_ROWS))))
+        if plan_check == 'fail' and (regressions is None or regressions):
+            print("ERROR: Query plan check failed")
+            sys.exit(1)
     
     print("=" * 80)
     print("NEWS ARTICLES DATA ANALYSIS TOOL")
+    print(f"Storage: {analyzer.storage.describe()}")
     print("=" * 80)
     
     print("""
@@ -709,8 +1942,15 @@ Choose an option:
 9. Generate Summary Report Only
 10. Export Data to Excel
 11. Run Analysis and Save All Plots
+12. Benchmark Aggregations (Per-chart groupby vs Shared Cube)
+13. Benchmark Loader Memory (Standard vs Compact)
+14. Headless Batch Render (All Charts into one PDF, parallel)
+15. Stream Raw Data Export (.xlsx / .parquet / .csv.gz)
+16. Benchmark Loader Memory (fetchall vs Chunked)
+17. Trend and Spike Report (Keywords & Sources)
+18. Check Query Plans (EXPLAIN)
 
-Enter your choice (1-11): """)
+Enter your choice (1-18): """)
     
     choice = input().strip()
     
@@ -750,12 +1990,13 @@ Enter your choice (1-11): """)
             analyzer.generate_summary_report()
     
     elif choice == "10":
-        if analyzer.connect_and_fetch_data():
-            filename = input("Enter filename for Excel export (default: news_articles_analysis.xlsx): ").strip()
-            if not filename:
-                filename = "news_articles_analysis.xlsx"
-            if not filename.endswith('.xlsx'):
-                filename += '.xlsx'
+        filename = input("Enter filename for Excel export (default: news_articles_analysis.xlsx): ").strip()
+        if not filename:
+            filename = "news_articles_analysis.xlsx"
+        if not filename.endswith('.xlsx'):
+            filename += '.xlsx'
+        analyzer.begin_render_cache()
+        if not analyzer.serve_cached_workbook(filename) and analyzer.connect_and_fetch_data(include_text=True):
             analyzer.export_data_to_excel(filename)
     
     elif choice == "11":
@@ -764,8 +2005,52 @@ Enter your choice (1-11): """)
             save_prefix = "news_analysis"
         analyzer.run_complete_analysis(save_plots=True, save_path=save_prefix)
     
+    elif choice == "12":
+        if analyzer.connect_and_fetch_data():
+            analyzer.benchmark_cube()
+    
+    elif choice == "13":
+        try:
+            analyzer.benchmark_memory()
+        except STORAGE_ERRORS as e:
+            print(f"Error connecting to database: {e}")
+    
+    elif choice == "14":
+        pdf_path = input("Enter PDF filename (default: news_analysis.pdf): ").strip()
+        if not pdf_path:
+            pdf_path = "news_analysis.pdf"
+        if not pdf_path.endswith('.pdf'):
+            pdf_path += '.pdf'
+        workers = os.getenv('ANALYTICS_RENDER_WORKERS')
+        analyzer.run_complete_analysis(pdf_path=pdf_path, workers=int(workers) if workers else None)
+    
+    elif choice == "15":
+        filename = input("Enter filename (.xlsx, .parquet or .csv.gz; default: news_articles_raw.xlsx): ").strip()
+        if not filename:
+            filename = "news_articles_raw.xlsx"
+        if not filename.endswith(('.xlsx', '.parquet', '.csv.gz')):
+            filename += '.xlsx'
+        include_archives = True
+        if analyzer.archive_files():
+            include_archives = input("Include archived months? (Y/n): ").strip().lower() != 'n'
+        analyzer.export_raw_data(filename, include_archives=include_archives)
+    
+    elif choice == "16":
+        rows = input("Synthetic rows to generate (blank = use the articles table): ").strip()
+        try:
+            analyzer.benchmark_loader(int(rows) if rows else 0)
+        except STORAGE_ERRORS as e:
+            print(f"Error connecting to database: {e}")
+    
+    elif choice == "17":
+        if analyzer.connect_and_fetch_data():
+            analyzer.print_trend_report()
+    
+    elif choice == "18":
+        analyzer.check_query_plans()
+    
     else:
-        print("Invalid choice. Please run the program again and select 1-11.")
+        print("Invalid choice. Please run the program again and select 1-18.")
 
 
 if __name__ == "__main__":
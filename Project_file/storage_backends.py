@@ -0,0 +1,523 @@
+"""Storage backends shared by the news fetcher and the analytics script.
+
+MySQLBackend is the production store (schema in database_schema.sql). SQLiteBackend keeps
+the same tables and indexes in a local WAL-mode database file, for single-node deployments,
+CI and performance runs without a MySQL server.
+
+Both hand out DB-API connections whose cursors take %s placeholders and accept the
+dictionary/buffered cursor options used by the scripts, so queries are written once; the
+few statements that differ between the engines come from the backend.
+"""
+import re
+import sqlite3
+from datetime import date, datetime
+
+import mysql.connector
+from mysql.connector import Error
+
+# Exceptions raised by either backend
+STORAGE_ERRORS = (Error, sqlite3.Error)
+
+# Complete SQLite schema, equivalent to database_schema.sql (TIMESTAMP columns use local time
+# like MySQL's session time zone; NOCASE matches the case-insensitive utf8mb4_unicode_ci columns)
+SQLITE_ARTICLES_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_heading VARCHAR(500) NOT NULL COLLATE NOCASE,
+    article_link VARCHAR(1000) NOT NULL UNIQUE COLLATE NOCASE,
+    keyword VARCHAR(100) NOT NULL COLLATE NOCASE,
+    source VARCHAR(200) NOT NULL COLLATE NOCASE,
+    published_date DATETIME,
+    date_created TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+    date_updated TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+    is_sent BOOLEAN NOT NULL DEFAULT FALSE,
+    send_batch_id CHAR(36) NULL,
+    send_batch_claimed_at DATETIME NULL
+)
+"""
+
+SQLITE_SCHEMA = SQLITE_ARTICLES_DDL.format(table='articles') + """;
+CREATE INDEX IF NOT EXISTS idx_article_heading ON articles (article_heading);
+CREATE INDEX IF NOT EXISTS idx_source ON articles (source);
+CREATE INDEX IF NOT EXISTS idx_unsent_order ON articles (is_sent, published_date, date_created);
+CREATE INDEX IF NOT EXISTS idx_send_batch ON articles (send_batch_id);
+CREATE INDEX IF NOT EXISTS idx_sent_batch_claimed ON articles (is_sent, send_batch_id, send_batch_claimed_at);
+CREATE INDEX IF NOT EXISTS idx_stats_cover ON articles (date_created, keyword, source, is_sent);
+CREATE INDEX IF NOT EXISTS idx_date_updated ON articles (date_updated);
+CREATE INDEX IF NOT EXISTS idx_analytics_cover ON articles (keyword, source, published_date, date_created, is_sent);
+DROP INDEX IF EXISTS idx_keyword;
+DROP INDEX IF EXISTS idx_is_sent;
+DROP INDEX IF EXISTS idx_published_date;
+DROP INDEX IF EXISTS idx_date_created;
+DROP INDEX IF EXISTS idx_sent_published;
+
+-- MySQL's ON UPDATE CURRENT_TIMESTAMP (the analytics cache refreshes from date_updated)
+CREATE TRIGGER IF NOT EXISTS articles_date_updated AFTER UPDATE ON articles
+FOR EACH ROW WHEN NEW.date_updated = OLD.date_updated
+BEGIN
+    UPDATE articles SET date_updated = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS article_stats (
+    stat_date DATE NOT NULL,
+    keyword VARCHAR(100) NOT NULL COLLATE NOCASE,
+    source VARCHAR(200) NOT NULL COLLATE NOCASE,
+    is_sent BOOLEAN NOT NULL,
+    article_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (stat_date, keyword, source, is_sent)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_stats_keyword ON article_stats (keyword, article_count);
+CREATE INDEX IF NOT EXISTS idx_stats_source ON article_stats (source, article_count);
+CREATE INDEX IF NOT EXISTS idx_stats_sent ON article_stats (is_sent, article_count);
+
+CREATE TABLE IF NOT EXISTS archived_article_keys (
+    key_hash CHAR(64) NOT NULL PRIMARY KEY,
+    archive_month CHAR(7) NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_archive_month ON archived_article_keys (archive_month);
+
+CREATE TABLE IF NOT EXISTS digest_batches (
+    batch_id CHAR(36) NOT NULL PRIMARY KEY,
+    state VARCHAR(10) NOT NULL,
+    claimed_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_batch_state ON digest_batches (state, claimed_at);
+"""
+
+# Full-text index on article_heading (MySQL FULLTEXT with the ngram parser; SQLite uses an FTS5
+# trigram table named <table>_fts kept in step by triggers). Both match terms anywhere in a word.
+SEARCH_INDEX = 'ft_article_heading'
+
+# Synthetic benchmark articles: headline = action x subject, so searches have realistic selectivity
+SYNTHETIC_ACTIONS = [
+    'Anti-dumping duty extended on', 'SEBI tightens disclosure norms for', 'GST council revises rates on',
+    'Customs notification amends tariff for', 'RBI issues guidelines on', 'Patent office clarifies rules for',
+    'FDI policy eased for', 'Copyright board reviews claims over'
+]
+SYNTHETIC_SUBJECTS = [
+    'steel imports', 'solar glass', 'semiconductor units', 'listed companies', 'e-commerce platforms',
+    'pharmaceutical APIs', 'textile exports', 'digital lending apps', 'electric vehicles', 'mutual funds'
+]
+SYNTHETIC_KEYWORDS = ['GST', 'SEBI', 'RBI', 'FDI', 'Patent', 'Copyright']
+SYNTHETIC_SOURCES = ['NewsAPI - Economic Times', 'LiveMint', 'MoneyControl', 'NewsAPI - Mint']
+
+# Query plan checks ignore scans the optimizer estimates below this many rows (small tables)
+PLAN_CHECK_MIN_ROWS = 10000
+
+
+def sql_list(values):
+    """Quoted, comma-separated SQL string literals"""
+    return ', '.join("'" + value.replace("'", "''") + "'" for value in values)
+
+
+def plan_regressions(steps, expect, min_rows=PLAN_CHECK_MIN_ROWS):
+    """Problems with a query plan (steps from a backend's explain) given the expected access.
+
+    expect is 'seek' (index lookups or ranges only), 'ordered' (a seek returning rows in index
+    order, no sort) or 'covering' (may read a whole index, but never the table rows). Steps the
+    optimizer estimates at fewer than min_rows rows are not flagged: MySQL rightly scans small
+    tables instead of using an index. SQLite gives no estimate, so its steps are always checked.
+    """
+    problems = []
+    for step in steps:
+        if step['rows'] is not None and step['rows'] < min_rows:
+            continue
+        where = f"{step['table']}" + (f" via {step['index']}" if step['index'] else "")
+        if step['access'] == 'table':
+            problems.append(f"full table scan of {where}")
+        elif step['access'] == 'index' and expect != 'covering':
+            problems.append(f"full index scan of {where}")
+        elif step['access'] == 'sort' and expect == 'ordered':
+            problems.append(f"sorts {step['table']} rows instead of reading them in index order")
+        elif step['access'] != 'sort' and expect == 'covering' and not step['covering']:
+            problems.append(f"reads {step['table']} rows, not covered by {step['index'] or 'an index'}")
+    return problems
+
+
+def describe_plan(steps):
+    """One-line summary of plan steps for reports"""
+    return '; '.join(
+        f"{step['access']} {step['table']}" + (f" via {step['index']}" if step['index'] else "")
+        + (" (covering)" if step['covering'] else "")
+        for step in steps
+    ) or "no table access"
+
+
+def check_query_plans(storage, queries, min_rows=PLAN_CHECK_MIN_ROWS):
+    """EXPLAIN each (label, query, params, expect) and return [(label, plan summary, problems)]"""
+    connection = storage.connect()
+    try:
+        cursor = connection.cursor()
+        report = []
+        for label, query, params, expect in queries:
+            steps = storage.explain(cursor, query, params)
+            report.append((label, describe_plan(steps), plan_regressions(steps, expect, min_rows)))
+        cursor.close()
+        return report
+    finally:
+        connection.close()
+
+
+def parse_timestamp(value):
+    """SQLite converter for DATETIME/TIMESTAMP columns"""
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('DATETIME', parse_timestamp)
+sqlite3.register_converter('TIMESTAMP', parse_timestamp)
+sqlite3.register_converter('BOOLEAN', lambda value: bool(int(value)))
+
+
+class MySQLBackend:
+    """Articles stored in MySQL (InnoDB), the production backend"""
+    name = 'mysql'
+    creates_schema = False
+    supports_partitions = True
+    today_sql = "CURDATE()"
+    days_ago_sql = "CURDATE() - INTERVAL %s DAY"
+    utc_now_sql = "UTC_TIMESTAMP()"
+    utc_minutes_ago_sql = "UTC_TIMESTAMP() - INTERVAL %s MINUTE"
+    insert_ignore = "INSERT IGNORE"
+    for_update = " FOR UPDATE"
+    search_min_term = 2  # ngram_token_size
+
+    def __init__(self, config):
+        self.config = config
+
+    def describe(self):
+        """Short description for logs and banners"""
+        return f"MySQL {self.config.get('host')}/{self.config.get('database')}"
+
+    def connect(self):
+        """Open a new connection"""
+        return mysql.connector.connect(**self.config)
+
+    def begin_write(self, cursor):
+        """Start a write transaction before locking reads (InnoDB locks rows with FOR UPDATE instead)"""
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SHOW TABLES LIKE %s", (table,))
+        return cursor.fetchone() is not None
+
+    def column_names(self, cursor, table):
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return {row[0] for row in cursor.fetchall()}
+
+    def partition_names(self, cursor, table):
+        cursor.execute("""
+            SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        """, (table,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def index_names(self, cursor, table):
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return {row[0] for row in cursor.fetchall()}
+
+    def explain(self, cursor, query, params=()):
+        """Plan steps of a query: dicts of table, access ('seek', 'index', 'table' or 'sort'), index, covering
+        and rows (the optimizer's row estimate)"""
+        cursor.execute("EXPLAIN " + query, params)
+        columns = [column[0] for column in cursor.description]
+        steps = []
+        for row in cursor.fetchall():
+            row = dict(zip(columns, row))
+            if not row['table']:
+                continue  # e.g. "Select tables optimized away"
+            extra = (row['Extra'] or '').split('; ')
+            covering = any(item == 'Using index' or item.startswith('Using index for group-by') for item in extra)
+            steps.append({'table': row['table'], 'access': {'ALL': 'table', 'index': 'index'}.get(row['type'], 'seek'),
+                          'index': row['key'], 'covering': covering, 'rows': row['rows']})
+            if 'Using filesort' in extra:
+                steps.append({'table': row['table'], 'access': 'sort', 'index': None, 'covering': False,
+                              'rows': row['rows']})
+        return steps
+
+    def upsert_increment(self, table, keys, column):
+        """INSERT adding to column when a row with the same keys already exists"""
+        columns = keys + [column]
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+                f"ON DUPLICATE KEY UPDATE {column} = {column} + VALUES({column})")
+
+    def has_search_index(self, cursor, table='articles'):
+        return SEARCH_INDEX in self.index_names(cursor, table)
+
+    def ensure_search_index(self, connection, table='articles'):
+        """Add the FULLTEXT ngram index on article_heading if missing (a one-off table rebuild).
+
+        Returns False for partitioned tables, which InnoDB cannot give a FULLTEXT index.
+        """
+        cursor = connection.cursor()
+        try:
+            if self.partition_names(cursor, table):
+                return False
+            if SEARCH_INDEX not in self.index_names(cursor, table):
+                cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {SEARCH_INDEX} (article_heading) "
+                               "WITH PARSER ngram")
+            return True
+        finally:
+            cursor.close()
+
+    def fulltext_clauses(self, table, terms):
+        """(join, match condition, match params, score expression, score params) requiring every term"""
+        text = ' '.join(f'+"{term}"' for term in terms)
+        match = "MATCH(a.article_heading) AGAINST (%s IN BOOLEAN MODE)"
+        return "", match, [text], match, [text]
+
+    def drop_table(self, cursor, table):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def create_synthetic_articles(self, connection, table, rows):
+        """(Re)create table with the articles schema and fill it with rows generated articles (MySQL 8)"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE TABLE {table} LIKE articles")
+            cursor.execute(f"""
+                INSERT INTO {table} (article_heading, article_link, keyword, source, published_date, is_sent)
+                WITH RECURSIVE seq (n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < 999)
+                SELECT CONCAT(ELT(1 + t.n % 8, {sql_list(SYNTHETIC_ACTIONS)}), ' ',
+                              ELT(1 + t.n DIV 8 % 10, {sql_list(SYNTHETIC_SUBJECTS)}), ' (', t.n, ')'),
+                       CONCAT('https://example.com/benchmark/article-', t.n),
+                       ELT(1 + t.n % 6, {sql_list(SYNTHETIC_KEYWORDS)}),
+                       ELT(1 + t.n % 4, {sql_list(SYNTHETIC_SOURCES)}),
+                       IF(t.n % 5 = 0, NULL, NOW() - INTERVAL t.n MINUTE),
+                       t.n % 2 = 0
+                FROM (SELECT a.n * 1000000 + b.n * 1000 + c.n AS n FROM seq a, seq b, seq c) t
+                WHERE t.n < %s
+            """, (rows,))
+            connection.commit()
+        finally:
+            cursor.close()
+
+
+class SQLiteCursor:
+    """DB-API cursor taking %s placeholders, optionally returning rows as dicts"""
+
+    def __init__(self, cursor, dictionary=False):
+        self.cursor = cursor
+        self.dictionary = dictionary
+
+    def execute(self, query, params=()):
+        self.cursor.execute(query.replace('%s', '?'), tuple(params))
+
+    def executemany(self, query, seq_params):
+        self.cursor.executemany(query.replace('%s', '?'), [tuple(params) for params in seq_params])
+
+    def as_row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return dict(zip([column[0] for column in self.cursor.description], row))
+
+    def fetchone(self):
+        return self.as_row(self.cursor.fetchone())
+
+    def fetchmany(self, size):
+        return [self.as_row(row) for row in self.cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self.as_row(row) for row in self.cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def close(self):
+        self.cursor.close()
+
+
+class SQLiteConnection:
+    """sqlite3 connection with the parts of the mysql.connector connection API the scripts use"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.closed = False
+
+    def cursor(self, dictionary=False, buffered=None):
+        # sqlite3 cursors always step through the result lazily, buffered has no effect
+        return SQLiteCursor(self.connection.cursor(), dictionary)
+
+    @property
+    def in_transaction(self):
+        return self.connection.in_transaction
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.connection.close()
+        self.closed = True
+
+
+class SQLiteBackend:
+    """Articles stored in a local SQLite database file (WAL journal, schema created on first use).
+
+    WAL lets the analytics script read while the fetcher writes; writers are serialised by
+    SQLite and wait up to busy_timeout seconds for each other.
+    """
+    name = 'sqlite'
+    creates_schema = True
+    supports_partitions = False
+    today_sql = "DATE('now', 'localtime')"
+    days_ago_sql = "DATE('now', 'localtime', '-' || %s || ' days')"
+    utc_now_sql = "datetime('now')"
+    utc_minutes_ago_sql = "datetime('now', '-' || %s || ' minutes')"
+    insert_ignore = "INSERT OR IGNORE"
+    for_update = ""
+    search_min_term = 3  # trigram tokenizer
+
+    def __init__(self, path, busy_timeout=30):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.schema_ready = False
+
+    def describe(self):
+        """Short description for logs and banners"""
+        return f"SQLite {self.path}"
+
+    def connect(self):
+        """Open a new connection, creating the schema the first time"""
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        if not self.schema_ready:
+            connection.executescript(SQLITE_SCHEMA)
+            self.schema_ready = True
+        return SQLiteConnection(connection)
+
+    def begin_write(self, cursor):
+        """Take the database write lock now, so rows read before an UPDATE cannot change under it"""
+        if not cursor.cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+        return cursor.fetchone() is not None
+
+    def column_names(self, cursor, table):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in cursor.fetchall()}
+
+    def partition_names(self, cursor, table):
+        return []
+
+    def index_names(self, cursor, table):
+        cursor.execute(f"PRAGMA index_list({table})")
+        return {row[1] for row in cursor.fetchall()}
+
+    def explain(self, cursor, query, params=()):
+        """Plan steps of a query: dicts of table, access ('seek', 'index', 'table' or 'sort'), index, covering
+        and rows (always None, SQLite's plan has no row estimates)"""
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        steps = []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            match = re.match(r"(SCAN|SEARCH) (\S+)(?: USING (COVERING )?INDEX (\S+)"
+                             r"| USING ((?:INTEGER )?PRIMARY KEY)| (VIRTUAL TABLE))?", detail)
+            if detail.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in detail:
+                steps.append({'table': steps[-1]['table'] if steps else None, 'access': 'sort',
+                              'index': None, 'covering': False, 'rows': None})
+            elif match and match.group(2) != 'CONSTANT':
+                verb, table, covering, index, rowid, virtual = match.groups()
+                access = 'seek' if verb == 'SEARCH' or virtual else 'index' if index else 'table'
+                steps.append({'table': table, 'access': access, 'index': index or rowid,
+                              'covering': bool(covering or rowid), 'rows': None})
+        return steps
+
+    def upsert_increment(self, table, keys, column):
+        """INSERT adding to column when a row with the same keys already exists"""
+        columns = keys + [column]
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {column} = {column} + excluded.{column}")
+
+    def has_search_index(self, cursor, table='articles'):
+        return self.table_exists(cursor, f"{table}_fts")
+
+    def ensure_search_index(self, connection, table='articles'):
+        """Create the FTS5 trigram index <table>_fts and its sync triggers if missing, then fill it"""
+        fts = f"{table}_fts"
+        cursor = connection.cursor()
+        try:
+            if self.table_exists(cursor, fts):
+                return True
+            cursor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                           f"article_heading, content='{table}', content_rowid='id', tokenize='trigram')")
+            cursor.execute(f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+                           f"INSERT INTO {fts} (rowid, article_heading) VALUES (new.id, new.article_heading); END")
+            cursor.execute(f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+                           f"INSERT INTO {fts} ({fts}, rowid, article_heading) "
+                           f"VALUES ('delete', old.id, old.article_heading); END")
+            cursor.execute(f"CREATE TRIGGER {fts}_update AFTER UPDATE OF article_heading ON {table} BEGIN "
+                           f"INSERT INTO {fts} ({fts}, rowid, article_heading) "
+                           f"VALUES ('delete', old.id, old.article_heading); "
+                           f"INSERT INTO {fts} (rowid, article_heading) VALUES (new.id, new.article_heading); END")
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+            connection.commit()
+            return True
+        finally:
+            cursor.close()
+
+    def fulltext_clauses(self, table, terms):
+        """(join, match condition, match params, score expression, score params) requiring every term"""
+        fts = f"{table}_fts"
+        text = ' AND '.join(f'"{term}"' for term in terms)
+        return f" JOIN {fts} ON {fts}.rowid = a.id", f"{fts} MATCH %s", [text], f"-bm25({fts})", []
+
+    def drop_table(self, cursor, table):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def create_synthetic_articles(self, connection, table, rows):
+        """(Re)create table with the articles schema and fill it with rows generated articles"""
+        actions, subjects, keywords, sources = (
+            ' '.join(f"WHEN {i} THEN '{value}'" for i, value in enumerate(values))
+            for values in (SYNTHETIC_ACTIONS, SYNTHETIC_SUBJECTS, SYNTHETIC_KEYWORDS, SYNTHETIC_SOURCES)
+        )
+        cursor = connection.cursor()
+        try:
+            self.drop_table(cursor, table)
+            cursor.execute(SQLITE_ARTICLES_DDL.format(table=table))
+            cursor.execute(f"""
+                INSERT INTO {table} (article_heading, article_link, keyword, source, published_date, is_sent)
+                WITH RECURSIVE seq (n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < %s - 1)
+                SELECT (CASE n % 8 {actions} END) || ' ' || (CASE n / 8 % 10 {subjects} END) || ' (' || n || ')',
+                       'https://example.com/benchmark/article-' || n,
+                       CASE n % 6 {keywords} END,
+                       CASE n % 4 {sources} END,
+                       CASE WHEN n % 5 = 0 THEN NULL ELSE datetime('now', 'localtime', '-' || n || ' minutes') END,
+                       n % 2 = 0
+                FROM seq
+            """, (rows,))
+            connection.commit()
+        finally:
+            cursor.close()
+
+
+def create_backend(kind, mysql_config=None, sqlite_path=None):
+    """Backend for a STORAGE_BACKEND setting ('mysql' or 'sqlite')"""
+    if (kind or 'mysql').lower() == 'sqlite':
+        return SQLiteBackend(sqlite_path or 'regulatory_watch.db')
+    return MySQLBackend(mysql_config or {})
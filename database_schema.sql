@@ -5,6 +5,8 @@
 --              with duplicate prevention and email tracking
 -- Version: 2.0
 -- Last Updated: 2024
+-- SQLite: STORAGE_BACKEND=sqlite creates the equivalent tables and indexes
+--         itself (SQLITE_SCHEMA in Project_file/storage_backends.py)
 -- ===================================================================
 
 -- Create database with UTF-8 support for international characters
@@ -38,19 +40,107 @@ CREATE TABLE articles (
     
     -- Email Tracking
     is_sent BOOLEAN DEFAULT FALSE COMMENT 'Whether this article has been sent via email',
+    send_batch_id CHAR(36) NULL COMMENT 'Digest batch that claimed this article for sending',
+    send_batch_claimed_at DATETIME NULL COMMENT 'When the digest batch claimed this article (UTC)',
     
-    -- Indexes for Performance
-    INDEX idx_keyword (keyword) COMMENT 'Fast lookup by keyword',
-    INDEX idx_source (source) COMMENT 'Fast lookup by source',
-    INDEX idx_is_sent (is_sent) COMMENT 'Fast lookup of unsent articles',
-    INDEX idx_published_date (published_date) COMMENT 'Fast sorting by publication date',
-    INDEX idx_date_created (date_created) COMMENT 'Fast sorting by creation date',
+    -- Indexes designed around the hot queries; both scripts EXPLAIN these queries on startup
+    -- (QUERY_PLAN_CHECK) and report any that fall back to a full scan
+    INDEX idx_article_heading (article_heading) COMMENT 'Duplicate check by heading before every insert',
+    INDEX idx_source (source) COMMENT 'Fast lookup and distinct list of sources',
+    INDEX idx_unsent_order (is_sent, published_date, date_created) COMMENT 'Unsent articles newest first without a sort, unsent count',
+    INDEX idx_send_batch (send_batch_id) COMMENT 'Fast lookup and marking of a digest batch',
+    INDEX idx_sent_batch_claimed (is_sent, send_batch_id, send_batch_claimed_at) COMMENT 'Optimized for claiming unsent articles into a batch',
+    INDEX idx_stats_cover (date_created, keyword, source, is_sent) COMMENT 'Covering index for the article_stats recount, retention month ranges',
+    INDEX idx_date_updated (date_updated) COMMENT 'Analytics change detection and incremental refresh',
+    INDEX idx_analytics_cover (keyword, source, published_date, date_created, is_sent) COMMENT 'Covering index for analytics GROUP BY aggregations',
     
-    -- Composite Index for Common Queries
-    INDEX idx_sent_published (is_sent, published_date DESC) COMMENT 'Optimized for fetching unsent articles ordered by date'
+    -- Full-text heading search (the fetcher adds it with its startup migrations if missing)
+    FULLTEXT INDEX ft_article_heading (article_heading) WITH PARSER ngram COMMENT 'Heading search, matches terms anywhere in a word'
     
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Main table storing all news articles';
 
+-- ===================================================================
+-- PRECOMPUTED STATISTICS TABLE
+-- ===================================================================
+-- Article counts per day x keyword x source x sent flag. The fetcher keeps it in step
+-- with articles inside the same transactions (inserts and is_sent updates), so database
+-- statistics read a few hundred groups instead of scanning every article.
+-- ===================================================================
+
+DROP TABLE IF EXISTS article_stats;
+
+CREATE TABLE article_stats (
+    stat_date DATE NOT NULL COMMENT 'Date the articles were stored (DATE(date_created))',
+    keyword VARCHAR(100) NOT NULL COMMENT 'Keyword that matched the articles',
+    source VARCHAR(200) NOT NULL COMMENT 'Source name',
+    is_sent BOOLEAN NOT NULL COMMENT 'Sent flag of the counted articles',
+    article_count INT NOT NULL DEFAULT 0 COMMENT 'Number of articles in this group',
+    
+    PRIMARY KEY (stat_date, keyword, source, is_sent),
+    INDEX idx_stats_keyword (keyword, article_count) COMMENT 'Covering index for totals by keyword',
+    INDEX idx_stats_source (source, article_count) COMMENT 'Covering index for totals by source',
+    INDEX idx_stats_sent (is_sent, article_count) COMMENT 'Covering index for sent/unsent totals'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Incrementally maintained article counts';
+
+-- ===================================================================
+-- ARCHIVED ARTICLE KEYS
+-- ===================================================================
+-- Months older than RETENTION_MONTHS are written to gzip CSV files in ARCHIVE_DIR and
+-- removed from articles by the fetcher's retention job. The SHA-256 of each archived
+-- heading ('heading:<title>') and link ('link:<url>') stays here so duplicate detection
+-- still sees archived articles.
+-- ===================================================================
+
+DROP TABLE IF EXISTS archived_article_keys;
+
+CREATE TABLE archived_article_keys (
+    key_hash CHAR(64) NOT NULL PRIMARY KEY COMMENT 'SHA-256 of an archived heading or link',
+    archive_month CHAR(7) NOT NULL COMMENT 'Month (YYYY-MM) the article was archived from',
+    
+    INDEX idx_archive_month (archive_month)
+) ENGINE=InnoDB DEFAULT CHARSET=ascii COMMENT='Heading and link hashes of archived articles';
+
+-- ===================================================================
+-- DIGEST BATCHES
+-- ===================================================================
+-- Delivery state of each digest batch: claimed -> sending -> delivered -> sent, or
+-- released. Only stale 'claimed' batches are reclaimed automatically; a batch left in
+-- 'sending' may already be in recipients' inboxes, so manual operation 11 resolves it.
+
+DROP TABLE IF EXISTS digest_batches;
+
+CREATE TABLE digest_batches (
+    batch_id CHAR(36) NOT NULL PRIMARY KEY COMMENT 'Value stamped on articles.send_batch_id',
+    state VARCHAR(10) NOT NULL COMMENT 'claimed, sending, delivered, sent or released',
+    claimed_at DATETIME NOT NULL COMMENT 'UTC time the batch was claimed',
+    updated_at DATETIME NOT NULL COMMENT 'UTC time of the last state change',
+    
+    INDEX idx_batch_state (state, claimed_at)
+) ENGINE=InnoDB DEFAULT CHARSET=ascii COMMENT='Delivery state of digest batches';
+
+-- ===================================================================
+-- MONTHLY PARTITIONS (Optional - recommended for large tables)
+-- ===================================================================
+-- With articles partitioned by month on date_created the retention job drops a whole
+-- partition instead of deleting rows. MySQL requires the partitioning column in every
+-- unique key, so the primary key becomes (id, date_created) and article_link is indexed
+-- but no longer UNIQUE (the fetcher checks links before inserting). The fetcher's manual
+-- operation 6 applies this to an existing table and its daily job adds partitions ahead.
+-- InnoDB cannot partition a table with a FULLTEXT index, so ft_article_heading is dropped
+-- first and heading search falls back to LIKE on a partitioned table.
+-- ===================================================================
+
+-- ALTER TABLE articles DROP INDEX ft_article_heading;
+-- ALTER TABLE articles
+--     MODIFY date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+--     DROP PRIMARY KEY, ADD PRIMARY KEY (id, date_created),
+--     DROP INDEX article_link, ADD INDEX idx_article_link (article_link(255));
+-- ALTER TABLE articles PARTITION BY RANGE (UNIX_TIMESTAMP(date_created)) (
+--     PARTITION p202501 VALUES LESS THAN (UNIX_TIMESTAMP('2025-02-01 00:00:00')),
+--     PARTITION p202502 VALUES LESS THAN (UNIX_TIMESTAMP('2025-03-01 00:00:00')),
+--     PARTITION pmax VALUES LESS THAN MAXVALUE
+-- );
+
 -- ===================================================================
 -- SAMPLE DATA (Optional - for testing)
 -- ===================================================================
@@ -80,8 +170,69 @@ CREATE TABLE articles (
 -- Mark specific articles as sent
 -- UPDATE articles SET is_sent = TRUE WHERE id IN (1, 2, 3);
 
--- Delete articles older than 90 days (cleanup)
--- DELETE FROM articles WHERE date_created < DATE_SUB(NOW(), INTERVAL 90 DAY);
+-- Claim unsent articles into a digest batch, then mark the batch once emailed
+-- UPDATE articles SET send_batch_id = 'batch-uuid', send_batch_claimed_at = UTC_TIMESTAMP()
+--     WHERE is_sent = FALSE AND send_batch_id IS NULL;
+-- UPDATE articles SET is_sent = TRUE WHERE send_batch_id = 'batch-uuid' AND is_sent = FALSE;
+
+-- Digest batches stopped mid-send (resolve each: mark its articles sent, or release them)
+-- SELECT batch_id, claimed_at FROM digest_batches WHERE state = 'sending' ORDER BY claimed_at;
+
+-- Upgrade an existing table created before digest batches (the fetcher also does this on startup)
+-- ALTER TABLE articles ADD COLUMN send_batch_id CHAR(36) NULL, ADD COLUMN send_batch_claimed_at DATETIME NULL;
+-- CREATE INDEX idx_send_batch ON articles (send_batch_id);
+-- CREATE INDEX idx_sent_batch_claimed ON articles (is_sent, send_batch_id, send_batch_claimed_at);
+
+-- Daily article counts by source, keyword and sent flag (analytics pushdown cube, served from idx_analytics_cover)
+-- SELECT DATE(COALESCE(published_date, date_created)) AS date, source, keyword, is_sent, COUNT(*) AS n
+--     FROM articles GROUP BY date, source, keyword, is_sent;
+-- CREATE INDEX idx_analytics_cover ON articles (keyword, source, published_date, date_created, is_sent);
+
+-- Upgrade the indexes of an existing installation (the fetcher adds missing ones on startup)
+-- CREATE INDEX idx_article_heading ON articles (article_heading);
+-- CREATE INDEX idx_unsent_order ON articles (is_sent, published_date, date_created);
+-- CREATE INDEX idx_stats_cover ON articles (date_created, keyword, source, is_sent);
+-- CREATE INDEX idx_date_updated ON articles (date_updated);
+-- CREATE INDEX idx_stats_keyword ON article_stats (keyword, article_count);
+-- CREATE INDEX idx_stats_source ON article_stats (source, article_count);
+-- CREATE INDEX idx_stats_sent ON article_stats (is_sent, article_count);
+-- Then, once EXPLAIN shows the hot queries on the new indexes (fetcher manual operations 9 and 12):
+-- DROP INDEX idx_keyword ON articles;          -- leading column of idx_analytics_cover
+-- DROP INDEX idx_is_sent ON articles;          -- leading column of idx_unsent_order
+-- DROP INDEX idx_published_date ON articles;   -- no query filters on published_date alone
+-- DROP INDEX idx_date_created ON articles;     -- leading column of idx_stats_cover
+-- DROP INDEX idx_sent_published ON articles;   -- replaced by idx_unsent_order
+
+-- Check a hot query still uses its index (key column; type ALL means a full table scan)
+-- EXPLAIN SELECT article_heading, article_link FROM articles WHERE article_heading = 'x' OR article_link = 'y' LIMIT 1;
+
+-- Statistics from the precomputed table (O(groups) instead of O(rows))
+-- SELECT keyword, SUM(article_count) FROM article_stats GROUP BY keyword;
+-- SELECT is_sent, SUM(article_count) FROM article_stats GROUP BY is_sent;
+
+-- Rebuild article_stats from a full recount (the fetcher's manual operation 5 verifies it)
+-- DELETE FROM article_stats;
+-- INSERT INTO article_stats (stat_date, keyword, source, is_sent, article_count)
+--     SELECT DATE(date_created), keyword, source, is_sent, COUNT(*) FROM articles
+--     GROUP BY DATE(date_created), keyword, source, is_sent;
+
+-- Retention is handled by the fetcher (RETENTION_MONTHS): each expired month is archived to
+-- ARCHIVE_DIR, then its partition is dropped (or its rows deleted in small chunks) and its
+-- article_stats groups removed. Manually, on a partitioned table:
+-- ALTER TABLE articles REORGANIZE PARTITION pmax INTO (
+--     PARTITION p202601 VALUES LESS THAN (UNIX_TIMESTAMP('2026-02-01 00:00:00')),
+--     PARTITION pmax VALUES LESS THAN MAXVALUE);
+-- ALTER TABLE articles DROP PARTITION p202501;
+-- DELETE FROM article_stats WHERE stat_date < '2025-02-01';
+
+-- Search headings containing every term, best matches first (fetcher mode 9; archived months are not searched)
+-- SELECT id, article_heading, MATCH(article_heading) AGAINST ('+"sebi" +"disclosure"' IN BOOLEAN MODE) AS score
+--     FROM articles WHERE MATCH(article_heading) AGAINST ('+"sebi" +"disclosure"' IN BOOLEAN MODE)
+--     ORDER BY score DESC, COALESCE(published_date, date_created) DESC LIMIT 20 OFFSET 0;
+-- ALTER TABLE articles ADD FULLTEXT INDEX ft_article_heading (article_heading) WITH PARSER ngram;
+
+-- Was this heading archived? (same hash the fetcher uses)
+-- SELECT archive_month FROM archived_article_keys WHERE key_hash = SHA2(CONCAT('heading:', 'GST Council announces new reforms'), 256);
 
 -- ===================================================================
 -- BACKUP RECOMMENDATION
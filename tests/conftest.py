@@ -0,0 +1,64 @@
+"""Shared fixtures: the fetcher and analytics modules against a throwaway SQLite database.
+
+Run from the repository root with: python -m pytest -q tests
+"""
+import importlib.util
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Project_file')
+sys.path.insert(0, PROJECT_DIR)
+
+import storage_backends  # noqa: E402
+
+# The fetcher's file name has a space, so it cannot be imported by name
+spec = importlib.util.spec_from_file_location('regulatory_watch', os.path.join(PROJECT_DIR, 'Regulatory Watch.py'))
+regulatory_watch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(regulatory_watch)
+
+EMAIL_CONFIG = {
+    'smtp_server': '127.0.0.1',
+    'smtp_port': 25,
+    'sender_email': 'watch@example.com',
+    'sender_password': '',
+    'recipient_email': 'desk@example.com',
+    'cc_email': ['legal@example.com'],
+}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return storage_backends.SQLiteBackend(str(tmp_path / 'articles.db'))
+
+
+@pytest.fixture
+def fetcher(storage):
+    fetcher = regulatory_watch.NewsFetcher(['test-newsapi-key'], {}, dict(EMAIL_CONFIG), storage=storage)
+    fetcher.verify_table_exists()
+    fetcher.ensure_schema_migrations()
+    return fetcher
+
+
+def make_articles(count, prefix='item', keyword='GST', start=None, undated_every=3):
+    """Articles with one published_date shared by each pair (ties) and every undated_every-th undated"""
+    start = start or datetime.now().replace(microsecond=0)
+    return [{
+        'title': f'{keyword} {prefix} {i}',
+        'url': f'https://example.com/{prefix}/{i}',
+        'keyword': keyword,
+        'source': 'Example Times' if i % 2 else 'Example Mint',
+        'published_date': None if i % undated_every == 0 else start - timedelta(hours=i // 2)
+    } for i in range(count)]
+
+
+def unsent_ids(storage):
+    connection = storage.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT id FROM articles WHERE is_sent = FALSE")
+        return sorted(row[0] for row in cursor.fetchall())
+    finally:
+        connection.close()
@@ -0,0 +1,94 @@
+from conftest import make_articles, unsent_ids
+
+
+def age_claims(storage, hours=2):
+    """Backdate every claim as if the batches were left over from an earlier run"""
+    connection = storage.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"UPDATE articles SET send_batch_claimed_at = datetime('now', '-{hours} hours') "
+                       f"WHERE send_batch_id IS NOT NULL")
+        cursor.execute(f"UPDATE digest_batches SET claimed_at = datetime('now', '-{hours} hours')")
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def batch_states(storage):
+    connection = storage.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT batch_id, state FROM digest_batches")
+        return dict(cursor.fetchall())
+    finally:
+        connection.close()
+
+
+def test_claim_and_mark_batch_are_idempotent(fetcher, storage):
+    fetcher.save_to_database(make_articles(30))
+    batch_id, claimed = fetcher.claim_unsent_batch()
+    assert batch_id and claimed == 30
+
+    # A second claim while the first batch is live takes nothing
+    assert fetcher.claim_unsent_batch() == (None, 0)
+
+    assert fetcher.mark_batch_sent(batch_id)
+    assert fetcher.mark_batch_sent(batch_id)
+    assert unsent_ids(storage) == []
+    assert fetcher.verify_stats() == []
+    assert batch_states(storage) == {batch_id: 'sent'}
+
+    # Releasing a fully sent batch leaves it sent
+    fetcher.release_batch(batch_id)
+    assert unsent_ids(storage) == []
+    assert batch_states(storage) == {batch_id: 'sent'}
+    assert fetcher.claim_unsent_batch() == (None, 0)
+
+
+def test_batch_delivered_but_not_marked_is_never_resent(fetcher, storage, monkeypatch):
+    fetcher.save_to_database(make_articles(12))
+    deliveries = []
+    monkeypatch.setattr(fetcher, 'send_email',
+                        lambda articles, label, article_count=None: deliveries.append([a['id'] for a in articles]) or True)
+
+    # The database goes away between the SMTP send and marking the batch
+    mark_batch_sent = fetcher.mark_batch_sent
+    monkeypatch.setattr(fetcher, 'mark_batch_sent', lambda batch_id, max_retries=3: False)
+    assert fetcher.send_batch('Digest') == 12
+    assert len(deliveries) == 1 and len(unsent_ids(storage)) == 12
+
+    # Well past the stale window the rows are still not claimable by a new batch
+    age_claims(storage)
+    assert fetcher.claim_unsent_batch() == (None, 0)
+
+    # The next run finishes the delivered batch instead of emailing it again
+    monkeypatch.setattr(fetcher, 'mark_batch_sent', mark_batch_sent)
+    assert fetcher.send_batch('Digest') == 0
+    assert len(deliveries) == 1
+    assert unsent_ids(storage) == []
+    assert list(batch_states(storage).values()) == ['sent']
+
+
+def test_stale_sending_batch_waits_for_an_operator(fetcher, storage):
+    fetcher.save_to_database(make_articles(10))
+    batch_id, _ = fetcher.claim_unsent_batch()
+    fetcher.set_batch_state(batch_id, 'sending')
+    age_claims(storage)
+
+    assert fetcher.claim_unsent_batch() == (None, 0)
+    assert [row[0] for row in fetcher.batches_in_state('sending')] == [batch_id]
+
+    # Manual operation 11 answering "not delivered" hands the rows to the next digest
+    fetcher.release_batch(batch_id)
+    assert batch_states(storage)[batch_id] == 'released'
+    assert fetcher.claim_unsent_batch()[1] == 10
+
+
+def test_stale_claimed_batch_is_reclaimed(fetcher, storage):
+    fetcher.save_to_database(make_articles(10))
+    stale_id, _ = fetcher.claim_unsent_batch()
+    age_claims(storage)
+
+    batch_id, claimed = fetcher.claim_unsent_batch()
+    assert batch_id != stale_id and claimed == 10
+    assert batch_states(storage) == {stale_id: 'released', batch_id: 'claimed'}
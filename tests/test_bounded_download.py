@@ -0,0 +1,58 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from conftest import regulatory_watch
+
+PAGE = b'<html><body>' + b''.join(b'<p>Regulatory update %d</p>' % i for i in range(2000)) + b'</body></html>'
+# 64 MB of zeros gzip to about 64 KB, a 1000x ratio
+BOMB = gzip.compress(b'\0' * (64 * 1024 * 1024), compresslevel=9)
+
+
+class Handler(BaseHTTPRequestHandler):
+    bodies = {'/page': (PAGE, None), '/page.gz': (gzip.compress(PAGE), 'gzip'), '/bomb': (BOMB, 'gzip')}
+
+    def do_GET(self):
+        body, encoding = self.bodies[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+@pytest.mark.parametrize('path', ['/page', '/page.gz'])
+def test_pages_under_the_cap_download_whole(fetcher, server, path):
+    with requests.Session() as session:
+        assert fetcher.download_bounded(session, server + path, 'page') == PAGE
+
+
+def test_oversized_body_is_rejected(fetcher, server):
+    with requests.Session() as session, pytest.raises(regulatory_watch.DownloadTooLargeError):
+        fetcher.download_bounded(session, server + '/page', 'page', max_bytes=len(PAGE) // 2)
+
+
+def test_decompression_bomb_is_rejected_before_the_cap(fetcher, server):
+    yielded = []
+    with requests.get(server + '/bomb', stream=True, timeout=10) as response:
+        with pytest.raises(regulatory_watch.DownloadTooLargeError, match='compression ratio'):
+            for chunk in fetcher.iter_bounded_content(response, fetcher.max_download_bytes, 'bomb'):
+                yielded.append(len(chunk))
+    # Rejected within a couple of chunks, long before the 5 MB size cap
+    assert sum(yielded) <= 2 * 16384
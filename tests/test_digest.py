@@ -0,0 +1,48 @@
+import csv
+import gzip
+import io
+import re
+
+import pytest
+
+from conftest import make_articles
+
+
+@pytest.fixture
+def articles(fetcher):
+    fetcher.save_to_database(make_articles(60))
+    return list(fetcher.iter_unsent_articles())
+
+
+@pytest.mark.parametrize('max_bytes', [2000, 6000, 50000])
+def test_split_digest_parts_stay_under_the_cap(fetcher, articles, max_bytes):
+    fetcher.digest_mode = 'split'
+    fetcher.digest_max_bytes = max_bytes
+
+    messages = fetcher.build_digest_messages(iter(articles), 'Morning Report', len(articles))
+    assert all(len(msg.as_bytes()) <= max_bytes for msg in messages)
+
+    links = []
+    for part_number, msg in enumerate(messages, 1):
+        assert f"Part {part_number} of {len(messages)}" in msg['Subject']
+        html = msg.get_payload()[0].get_payload(decode=True).decode('utf-8')
+        links += re.findall(r'href="([^"]+)"', html)
+    assert links == [article['article_link'] for article in articles]
+    assert (len(messages) == 1) == (max_bytes == 50000)
+
+
+def test_attachment_digest_inlines_the_top_articles_and_attaches_the_rest(fetcher, articles):
+    fetcher.digest_mode = 'attach'
+    fetcher.digest_max_inline = 5
+
+    [msg] = fetcher.build_digest_messages(iter(articles), 'Evening Report', len(articles))
+    html_part, attachment = msg.get_payload()
+    html = html_part.get_payload(decode=True).decode('utf-8')
+    inline_links = re.findall(r'href="([^"]+)"', html)
+    assert len(inline_links) == 5
+
+    assert attachment.get_filename().endswith('.csv.gz')
+    with gzip.open(io.BytesIO(attachment.get_payload(decode=True)), 'rt', encoding='utf-8') as f:
+        attached_links = [row['article_link'] for row in csv.DictReader(f)]
+    assert len(attached_links) == len(articles) - 5
+    assert sorted(inline_links + attached_links) == sorted(article['article_link'] for article in articles)
@@ -0,0 +1,120 @@
+import email
+import logging
+import os
+import socketserver
+import threading
+import time
+from email.mime.text import MIMEText
+
+import pytest
+
+from conftest import EMAIL_CONFIG, make_articles, regulatory_watch
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: envelopes and bodies are appended to server.messages"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost test SMTP')
+        envelope = None
+        for line in self.rfile:
+            verb = line[:4].decode('ascii').upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                if self.server.reject:
+                    self.reply('451 try again later')
+                    continue
+                envelope = {'sender': line.decode().split(':', 1)[1].strip(' <>\r\n'), 'recipients': []}
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                envelope['recipients'].append(line.decode().split(':', 1)[1].strip(' <>\r\n'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 end with .')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                envelope['message'] = email.message_from_bytes(data)
+                self.server.messages.append(envelope)
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    server.reject = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mail_queue(smtp_server, tmp_path):
+    config = dict(EMAIL_CONFIG, smtp_port=smtp_server.server_address[1], smtp_use_tls=False)
+    queue = regulatory_watch.MailQueue(config, spool_dir=str(tmp_path / 'spool'), max_attempts=2, base_backoff=0)
+    yield queue
+    queue.close()
+
+
+def message(subject):
+    msg = MIMEText(f'<p>{subject}</p>', 'html')
+    msg['Subject'] = subject
+    return msg
+
+
+def test_spooled_messages_are_delivered_over_one_session(mail_queue, smtp_server):
+    for i in range(3):
+        mail_queue.enqueue(message(f'Digest {i}'), ['desk@example.com', 'legal@example.com'])
+    assert len(mail_queue.pending()) == 3 and smtp_server.messages == []
+
+    assert mail_queue.flush() == (3, 0, 0)
+    assert mail_queue.pending() == []
+    assert [m['message']['Subject'] for m in smtp_server.messages] == ['Digest 0', 'Digest 1', 'Digest 2']
+    assert all(m['recipients'] == ['desk@example.com', 'legal@example.com'] for m in smtp_server.messages)
+
+
+def test_rejected_messages_are_retried_then_moved_to_failed(mail_queue, smtp_server):
+    smtp_server.reject = True
+    mail_queue.enqueue(message('Digest'), ['desk@example.com'])
+
+    assert mail_queue.flush() == (0, 1, 0)
+    assert len(mail_queue.pending()) == 1
+    assert mail_queue.flush() == (0, 0, 1)
+    assert mail_queue.pending() == []
+    assert len(os.listdir(os.path.join(mail_queue.spool_dir, 'failed'))) == 2
+
+
+def test_priority_alert_latency_is_logged_when_the_spool_delivers_it(fetcher, mail_queue, smtp_server, caplog):
+    fetcher.mail_queue = mail_queue
+    alerts = make_articles(2, keyword='SEBI', undated_every=100)
+    for alert in alerts:
+        alert.update(article_heading=alert['title'], article_link=alert['url'], id=None,
+                     inserted_at=time.time() - 30, discovered_at=time.time() - 90)
+    fetcher.pending_alerts = alerts
+
+    smtp_server.reject = True
+    with caplog.at_level(logging.INFO):
+        assert fetcher.flush_priority_alerts()
+    assert len(mail_queue.pending()) == 1
+    assert not [r for r in caplog.records if r.getMessage().startswith('Delivered')]
+    # Handed to the spool, so the fetcher does not keep its own retry
+    assert fetcher.pending_alerts == []
+
+    smtp_server.reject = False
+    with caplog.at_level(logging.INFO):
+        assert mail_queue.flush() == (1, 0, 0)
+    [delivered] = [r.getMessage() for r in caplog.records if r.getMessage().startswith('Delivered')]
+    assert 'Priority Alert: SEBI' in delivered
+    assert 'insert-to-delivery max 30s' in delivered and 'discovery-to-delivery max 90s' in delivered
+    assert smtp_server.messages[0]['recipients'] == ['desk@example.com', 'legal@example.com']
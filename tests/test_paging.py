@@ -0,0 +1,65 @@
+import io
+
+import pyarrow.parquet as pq
+
+from conftest import make_articles, unsent_ids
+
+
+def test_keyset_pagination_yields_every_unsent_row_once(fetcher, storage):
+    fetcher.save_to_database(make_articles(103))
+    batch_id, _ = fetcher.claim_unsent_batch()
+    fetcher.mark_batch_sent(batch_id)
+    fetcher.save_to_database(make_articles(97, prefix='fresh'))
+
+    ids = [article['id'] for article in fetcher.iter_unsent_articles(chunk_size=7)]
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == unsent_ids(storage)
+    assert len(ids) == 97
+
+
+def test_subscriber_digests_stream_each_keyword_filter(fetcher, monkeypatch):
+    fetcher.save_to_database(make_articles(20, prefix='tax', keyword='GST')
+                             + make_articles(15, prefix='ip', keyword='Patent')
+                             + make_articles(10, prefix='markets', keyword='SEBI'))
+    fetcher.subscriptions = {
+        'Tax': {'recipients': ['tax@example.com'], 'keywords': {'gst'}},
+        'Legal': {'recipients': ['legal@example.com', 'ip@example.com'], 'keywords': {'patent', 'trademark'}},
+        'Everything': {'recipients': ['all@example.com'], 'keywords': {'*'}},
+    }
+    batch_id, _ = fetcher.claim_unsent_batch()
+
+    digests = {}
+
+    def build_digest_messages(articles, label, article_count, recipients):
+        assert not isinstance(articles, list)
+        digests[label] = (article_count, [article['keyword'] for article in articles], recipients)
+        return []
+
+    monkeypatch.setattr(fetcher, 'build_digest_messages', build_digest_messages)
+    monkeypatch.setattr(fetcher, 'deliver_messages', lambda messages: None)
+    assert fetcher.send_subscriber_digests(batch_id, 'Digest')
+
+    assert digests['Digest - Tax'][:2] == (20, ['GST'] * 20)
+    assert digests['Digest - Legal'] == (15, ['Patent'] * 15, ('legal@example.com', ['ip@example.com']))
+    assert digests['Digest - Everything'][0] == 45
+    assert len(digests['Digest - Everything'][1]) == 45
+    # The wildcard subscriber covers everything, so nothing goes to the default recipient
+    assert 'Digest' not in digests
+
+    del fetcher.subscriptions['Everything']
+    fetcher.email_config = {'recipient_email': 'desk@example.com', 'cc_email': []}
+    digests.clear()
+    assert fetcher.send_subscriber_digests(batch_id, 'Digest')
+    assert digests['Digest'] == (10, ['SEBI'] * 10, ('desk@example.com', []))
+
+
+def test_parquet_attachment_is_written_in_row_groups(fetcher):
+    fetcher.save_to_database(make_articles(25))
+    fetcher.digest_attachment_format = 'parquet'
+
+    filename, payload, row_count = fetcher.write_digest_attachment(fetcher.iter_unsent_articles(chunk_size=4),
+                                                                   'Evening Report')
+    assert filename.startswith('evening_report_') and filename.endswith('.parquet')
+    table = pq.read_table(io.BytesIO(payload))
+    assert row_count == table.num_rows == 25
+    assert sorted(table.column('id').to_pylist()) == unsent_ids(fetcher.storage)
@@ -0,0 +1,8 @@
+from conftest import make_articles
+
+
+def test_hot_queries_keep_their_index_plans(fetcher):
+    fetcher.save_to_database(make_articles(50))
+    report = fetcher.check_query_plans()
+    assert report and [(label, problems) for label, _, problems in report if problems] == []
+
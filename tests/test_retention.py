@@ -0,0 +1,48 @@
+import csv
+import glob
+import gzip
+import os
+from datetime import datetime
+
+import Regulatory_watch_analytics as analytics
+from conftest import make_articles, unsent_ids
+
+
+def backdate(storage, prefix, created):
+    connection = storage.connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("UPDATE articles SET date_created = %s WHERE article_link LIKE %s",
+                       (created, f'https://example.com/{prefix}/%'))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def test_retention_archives_old_months_and_keeps_them_visible(fetcher, storage, tmp_path):
+    old_articles = make_articles(30, prefix='old', start=datetime(2024, 1, 20))
+    fetcher.save_to_database(old_articles)
+    backdate(storage, 'old', datetime(2024, 1, 20, 12, 0))
+    fetcher.save_to_database(make_articles(10, prefix='recent'))
+    assert fetcher.rebuild_stats()
+    recent_ids = unsent_ids(storage)[30:]
+
+    fetcher.retention_months = 3
+    fetcher.archive_dir = str(tmp_path / 'archive')
+    assert fetcher.run_retention() == 30
+    assert unsent_ids(storage) == recent_ids
+    assert fetcher.verify_stats() == []
+
+    [path] = glob.glob(os.path.join(fetcher.archive_dir, 'articles_2024_01_*.csv.gz'))
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        archived = list(csv.DictReader(f))
+    assert sorted(row['article_link'] for row in archived) == sorted(a['url'] for a in old_articles)
+
+    # A second run finds nothing left, and archived articles are still recognised as duplicates
+    assert fetcher.run_retention() == 0
+    fetcher.save_to_database(old_articles[:5] + make_articles(3, prefix='new'))
+    assert len(unsent_ids(storage)) == 13
+
+    analyzer = analytics.NewsDataAnalyzer({}, storage=storage, archive_dir=fetcher.archive_dir)
+    assert analyzer.connect_and_fetch_data()
+    assert len(analyzer.df) == 43
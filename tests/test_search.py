@@ -0,0 +1,39 @@
+import pytest
+
+from conftest import EMAIL_CONFIG, make_articles, regulatory_watch
+
+
+def test_search_matches_every_term_with_filters(fetcher):
+    fetcher.save_to_database(make_articles(30, prefix='duty', keyword='Anti-dumping')
+                             + make_articles(30, prefix='rates', keyword='GST'))
+
+    found = fetcher.search_articles('rates gst', page_size=7)
+    assert found['total'] == 30
+    assert len(found['results']) == 7
+    assert all('rates' in article['article_heading'] for article in found['results'])
+
+    # Pages cover every match exactly once
+    ids = [a['id'] for page in range(1, 6) for a in fetcher.search_articles('rates', page=page, page_size=7)['results']]
+    assert len(ids) == len(set(ids)) == 30
+
+    assert fetcher.search_articles('duty', keywords=['GST'])['total'] == 0
+    assert fetcher.search_articles('duty', sources=['Times'])['total'] == 15
+    # Terms shorter than the trigram size fall back to LIKE
+    assert fetcher.search_articles('ra')['total'] == 30
+
+
+def test_search_fails_fast_without_creating_the_index(storage):
+    fetcher = regulatory_watch.NewsFetcher(['test-newsapi-key'], {}, dict(EMAIL_CONFIG), storage=storage)
+    fetcher.verify_table_exists()
+    fetcher.save_to_database(make_articles(5))
+
+    with pytest.raises(regulatory_watch.SearchIndexMissingError, match='create_search_index'):
+        fetcher.search_articles('GST')
+    connection = storage.connect()
+    try:
+        assert not storage.has_search_index(connection.cursor())
+    finally:
+        connection.close()
+
+    assert fetcher.create_search_index()
+    assert fetcher.search_articles('GST')['total'] == 5
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from conftest import regulatory_watch
+
+
+class FakeSitemapResponse:
+    """Just enough of a streamed requests.Response for parse_news_sitemap"""
+
+    def __init__(self, body):
+        self.body = body.encode('utf-8')
+        self.headers = {}
+        self.raw = None
+        self.chunks_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1024):
+        for start in range(0, len(self.body), 256):
+            self.chunks_read += 1
+            yield self.body[start:start + 256]
+
+    def close(self):
+        pass
+
+
+def sitemap(entries):
+    urls = ''.join(
+        f'<url><loc>{url}</loc><news:news><news:publication_date>{published}</news:publication_date>'
+        f'<news:title>{title}</news:title></news:news></url>'
+        for url, title, published in entries
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">' + urls + '</urlset>')
+
+
+def test_sitemap_stops_at_the_last_seen_entry(fetcher, monkeypatch):
+    # Newest first, W3C dates with a +05:30 offset as Indian publishers send them
+    entries = [(f'https://example.com/news/{i}', f'GST council update {i}',
+                f'2024-05-01T{20 - i:02d}:00:00+05:30') for i in range(12)]
+    response = FakeSitemapResponse(sitemap(entries))
+    monkeypatch.setattr(regulatory_watch.requests, 'get', lambda *args, **kwargs: response)
+
+    # Entry 5 was published at 15:00 IST, i.e. 09:30 UTC
+    since = fetcher.parse_article_date('2024-05-01T15:00:00+05:30', 'Example')
+    assert since == datetime(2024, 5, 1, 9, 30)
+
+    articles, newest = fetcher.parse_news_sitemap('https://example.com/sitemap.xml', 'Example', since=since)
+    assert [article['url'] for article in articles] == [url for url, _, _ in entries[:5]]
+    assert all(article['keyword'] == 'GST' for article in articles)
+    assert newest == datetime(2024, 5, 1, 14, 30)
+    assert response.chunks_read < len(response.body) // 256
@@ -0,0 +1,15 @@
+from conftest import make_articles
+
+
+def test_article_stats_match_a_full_recount(fetcher):
+    fetcher.save_to_database(make_articles(60))
+    assert fetcher.verify_stats() == []
+
+    batch_id, claimed = fetcher.claim_unsent_batch()
+    assert claimed == 60
+    assert fetcher.mark_batch_sent(batch_id)
+    fetcher.save_to_database(make_articles(25, prefix='later'))
+    assert fetcher.verify_stats() == []
+
+    assert fetcher.rebuild_stats()
+    assert fetcher.verify_stats() == []
@@ -0,0 +1,35 @@
+from conftest import make_articles, unsent_ids
+
+
+def test_articles_of_subscribers_without_recipients_go_to_the_default_recipient(fetcher, storage, monkeypatch):
+    fetcher.save_to_database(make_articles(8, prefix='ip', keyword='Patent'))
+    fetcher.subscriptions = {
+        'Legal': {'recipients': [], 'keywords': {'patent'}},
+        'Everything': {'recipients': [], 'keywords': {'*'}},
+    }
+    delivered = []
+    monkeypatch.setattr(fetcher, 'deliver_messages', delivered.extend)
+
+    assert fetcher.send_batch('Digest') == 8
+    [msg] = delivered
+    assert msg['To'] == 'desk@example.com'
+    assert unsent_ids(storage) == []
+
+
+def test_nothing_delivered_leaves_the_batch_unsent(fetcher, storage, monkeypatch):
+    fetcher.save_to_database(make_articles(5))
+    fetcher.subscriptions = {'Tax': {'recipients': ['tax@example.com'], 'keywords': {'gst'}}}
+    batch_id, _ = fetcher.claim_unsent_batch()
+    fetcher.mark_batch_sent(batch_id)
+    assert not fetcher.send_subscriber_digests(batch_id, 'Digest')
+
+    fetcher.save_to_database(make_articles(5, prefix='fresh'))
+
+    def deliver_messages(messages):
+        raise OSError('connection refused')
+
+    monkeypatch.setattr(fetcher, 'deliver_messages', deliver_messages)
+    assert fetcher.send_batch('Digest') == 0
+    assert len(unsent_ids(storage)) == 5
+    # Released, so the next digest claims the same articles
+    assert fetcher.claim_unsent_batch()[1] == 5
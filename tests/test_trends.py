@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import Regulatory_watch_analytics as analytics
+from conftest import make_articles
+
+
+def trend_totals(analyzer):
+    return {dimension: counts.sum().to_dict() for dimension, counts in analyzer.trend_counts.items()}
+
+
+@pytest.mark.parametrize('pushdown', [False, True])
+def test_incremental_trends_match_a_full_rebuild(fetcher, storage, pushdown):
+    fetcher.save_to_database(make_articles(200, start=datetime.now() - timedelta(days=2)))
+    analyzer = analytics.NewsDataAnalyzer({}, storage=storage, pushdown=pushdown)
+    analyzer.connect_and_fetch_data()
+    analyzer.build_trends()
+
+    # Nothing new: a refresh must not count any row twice
+    before = trend_totals(analyzer)
+    analyzer.refresh_trends()
+    assert trend_totals(analyzer) == before
+
+    fetcher.save_to_database(make_articles(40, prefix='spike', keyword='SEBI'))
+    analyzer.refresh_trends()
+
+    full = analytics.NewsDataAnalyzer({}, storage=storage, pushdown=pushdown)
+    full.connect_and_fetch_data()
+    full.build_trends()
+    assert trend_totals(analyzer) == trend_totals(full)
+    for dimension in full.trends:
+        for name, frame in full.trends[dimension].items():
+            incremental = analyzer.trends[dimension][name].reindex_like(frame)
+            assert (incremental.fillna(0) - frame.fillna(0)).abs().max().max() < 1e-9, (dimension, name)